@@ -1,10 +1,13 @@
 import logging
 import numpy as np
-from killerbee import KillerBee
-import time
+from radio import open_killerbee
+from capture import PacketCapture
+from log_queue import PacketLog
 from datetime import datetime, timedelta
-import matplotlib.pyplot as plt
 import csv
+from fading import NakagamiSampler
+from capacity import calculate_capacity, capacity_lookup
+from plot_render import draw_markers, draw_spans, plot_series
 
 # Žurnāla konfigurācija
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
@@ -17,10 +20,6 @@ HEADERS_TO_DETECT = [b"\x01\x01"]  # DoS uzbrukuma galvene
 NO_DOS_TIMEOUT = 0.2  # Laiks līdz trokšņa noteikšanai (sekundēs)
 
 # Konstantes
-NOISE_FLOOR = -95  # Trokšņa līmenis dBm
-C_THEORETICAL = 250  # Teorētiskā caurlaidspēja (kbit/s)
-OVERHEAD = 0.4  # Papildu slodze (40%)
-MAX_SNR = 40  # Maksimālais SNR (normalizācijai)
 M = 0.8  # Nakagami formas parametrs
 OMEGA = 0.3  # Vidējā jauda
 
@@ -32,28 +31,13 @@ real_capacity = []
 modified_capacity = []
 dos_flags = []  # DoS uzbrukumu marķieri
 jamming_intervals = []  # Trokšņu periodi [(start_time, end_time)]
+last_dos_time = None
 
 
-def nakagami_fading(m, omega, size=1):
-    # Nakagami sadalījuma vērtību ģenerēšana
-    return np.random.gamma(shape=m, scale=omega / m, size=size)
-
-
-def apply_nakagami_rssi(base_rssi, m, omega):
-    # Nakagami sadalījuma pielietošana RSSI vērtībai
-    fading = nakagami_fading(m=m, omega=omega, size=1)[0]
-    return base_rssi + 10 * np.log10(fading)
-
-
-def calculate_capacity(rssi):
-    # Caurlaidspējas aprēķins
-    snr_db = rssi - NOISE_FLOOR
-    if snr_db < 0:
-        return 0
-    P_success = max(0.1, min(1.0, snr_db / MAX_SNR))
-    Duty_Cycle = max(0.1, min(0.8, snr_db / MAX_SNR))
-    capacity = C_THEORETICAL * (1 - OVERHEAD) * P_success * Duty_Cycle
-    return capacity
+# Nakagami sadalījuma vērtības no iepriekš izlozēta bufera
+FADING = NakagamiSampler(m=M, omega=OMEGA)
+# Per-packet ziņojumi tiek apkopoti periodiskos kopsavilkumos; trokšņa atklāšana tiek žurnalēta pilnībā
+DOS_LOG = PacketLog(__name__, "DoS uzbrukuma paketes", unit="paketes, RSSI")
 
 
 def detect_jamming(last_dos_time, current_time):
@@ -62,8 +46,41 @@ def detect_jamming(last_dos_time, current_time):
     if last_dos_time and (current_time - last_dos_time).total_seconds() > NO_DOS_TIMEOUT:
         start_time = last_dos_time + timedelta(seconds=NO_DOS_TIMEOUT)
         end_time = current_time
+        if jamming_intervals and jamming_intervals[-1][0] == start_time:
+            # Tas pats troksnis turpinās – pagarinām intervālu
+            jamming_intervals[-1] = (start_time, end_time)
+            return
         jamming_intervals.append((start_time, end_time))
-        logging.warning(f"Jamming Detected: {start_time} - {end_time}")
+        logging.warning("Jamming Detected: %s - %s", start_time, end_time)
+
+
+def analyze_batch(times, frames, now):
+    # Kadru kopas analīze (analīzes pavedienā); fadings un caurlaidspēja – visai kopai vienlaikus
+    global last_dos_time
+    kept = [(timestamp, packet.get("bytes", b""), packet["rssi"]) for timestamp, packet in zip(times, frames)
+            if packet.get("rssi", None) is not None and packet["rssi"] <= 0]  # Izslēdzam pozitīvās RSSI vērtības
+    if kept:
+        batch_times = [datetime.fromtimestamp(timestamp) for timestamp, _, _ in kept]
+        rssi = np.asarray([value for _, _, value in kept])
+        mod_rssi = FADING.apply(rssi)
+        flags = np.asarray([payload[:2] in HEADERS_TO_DETECT for _, payload, _ in kept], dtype=int)
+
+        timestamps.extend(batch_times)
+        original_rssi.extend(rssi.tolist())
+        modified_rssi.extend(mod_rssi.tolist())
+        real_capacity.extend(np.asarray(capacity_lookup(rssi)).tolist())  # Veseli dBm – O(1) tabulā
+        modified_capacity.extend(calculate_capacity(mod_rssi).tolist())
+        dos_flags.extend(flags.tolist())
+
+        # DoS uzbrukumu apstrāde: trokšņa pārbaude pirms katras DoS paketes
+        dos = np.flatnonzero(flags)
+        DOS_LOG.add(len(dos), rssi[dos])
+        for i in dos:
+            detect_jamming(last_dos_time, batch_times[i])
+            last_dos_time = batch_times[i]
+
+    # Pārbaude uz troksni
+    detect_jamming(last_dos_time, datetime.fromtimestamp(now))
 
 
 def save_to_csv(filename):
@@ -83,61 +100,35 @@ def save_to_csv(filename):
     logging.info(f"Dati saglabāti failā: {filename}")
 
 
-def sniff_and_analyze(device, channel, duration):
+def sniff_and_analyze(device, channel, duration, plot=True):
     # Snifferis un datu analīze
     try:
-        kb = KillerBee(device=device)
+        kb = open_killerbee(device)
         kb.set_channel(channel)
         logging.info(f"Sākts monitorings uz kanāla {channel} ar ierīci {device}.")
     except Exception as e:
         logging.error(f"Kļūda ierīces inicializācijā: {e}")
         return
 
-    start_time = time.time()
-    last_dos_time = None
-
-    while time.time() - start_time < duration:
+    # Uztveršanas pavediens tikai nolasa kadrus gredzenā; analīze – šeit, pa kopām
+    capture = PacketCapture(kb).start(duration)
+    for times, frames, now in capture.batches():
         try:
-            packet = kb.pnext()
-            current_time = datetime.now()
-            if packet:
-                payload = packet.get("bytes", b"")
-                rssi = packet.get("rssi", None)
-                if rssi is None or rssi > 0:  # Izslēdzam pozitīvās RSSI vērtības
-                    continue
-
-                timestamps.append(current_time)
-                original_rssi.append(rssi)
-                mod_rssi = apply_nakagami_rssi(rssi, M, OMEGA)
-                modified_rssi.append(mod_rssi)
-
-                capacity = calculate_capacity(rssi)
-                modified_cap = calculate_capacity(mod_rssi)
-
-                real_capacity.append(capacity)
-                modified_capacity.append(modified_cap)
-
-                # DoS uzbrukumu apstrāde
-                if payload[:2] in HEADERS_TO_DETECT:
-                    dos_flags.append(1)
-                    logging.info(f"DoS uzbrukums: RSSI={rssi} dBm")
-                    last_dos_time = current_time
-                else:
-                    dos_flags.append(0)
-
-            # Pārbaude uz troksni
-            detect_jamming(last_dos_time, current_time)
-
+            analyze_batch(times, frames, now)
         except Exception as e:
             logging.error(f"Kļūda paketes apstrādē: {e}")
 
     kb.close()
+    DOS_LOG.close()
+    logging.info(capture.summary())
     save_to_csv("dos_analysis_data_with_flags.csv")
     logging.info("Monitorings pabeigts.")
-    plot_results()
+    if plot:
+        plot_results()
 
 
 def plot_results():
+    import matplotlib.pyplot as plt  # Ielādēts tikai, kad tiek zīmēti grafiki
     # Grafiku izveide un saglabāšana
     if not timestamps:
         logging.warning("Nav datu grafika izveidei.")
@@ -152,29 +143,26 @@ def plot_results():
     mean_modified_capacity = np.mean(modified_capacity) if modified_capacity else 0
 
     # RSSI grafiks
+    # Līknes tiek samazinātas līdz asu platumam pikseļos; marķieri un intervāli – pa vienai kolekcijai
     plt.figure(figsize=(12, 6))
-    plt.plot(times_seconds, original_rssi, label="Oriģinālais RSSI", color="blue")
-    plt.plot(times_seconds, modified_rssi, label="Modificētais RSSI", color="orange")
-    plt.scatter(
-        [times_seconds[i] for i, flag in enumerate(dos_flags) if flag == 1],
-        [original_rssi[i] for i, flag in enumerate(dos_flags) if flag == 1],
+    ax = plt.gca()
+    plot_series(ax, times_seconds, original_rssi, label="Oriģinālais RSSI", color="blue")
+    plot_series(ax, times_seconds, modified_rssi, label="Modificētais RSSI", color="orange")
+    dos = np.asarray(dos_flags[:len(times_seconds)]) == 1
+    draw_markers(
+        ax,
+        np.asarray(times_seconds)[dos],
+        np.asarray(original_rssi[:len(dos)])[dos],
         label="DoS uzbrukums",
         color="red",
         marker='x',
         s=50
     )
 
-    # Trokšņa apgabals ar vienreizēju marķieri
-    if jamming_intervals:
-        jamming_logged = False
-        for start, end in jamming_intervals:
-            start_sec = (start - timestamps[0]).total_seconds()
-            end_sec = (end - timestamps[0]).total_seconds()
-            if not jamming_logged:
-                plt.axvspan(start_sec, end_sec, color="purple", alpha=0.3, label="Pretpasākuma ierīce")
-                jamming_logged = True
-            else:
-                plt.axvspan(start_sec, end_sec, color="purple", alpha=0.3)
+    # Trokšņa apgabali, apvienoti vienā kolekcijā ar vienu leģendas ierakstu
+    draw_spans(ax, [((start - timestamps[0]).total_seconds(), (end - timestamps[0]).total_seconds())
+                    for start, end in jamming_intervals],
+               color="purple", alpha=0.3, label="Pretpasākuma ierīce")
 
     plt.axhline(y=mean_original_rssi, color="green", linestyle="--", label=f"Vidējais oriģinālais RSSI: {mean_original_rssi:.2f} dBm")
     plt.axhline(y=mean_modified_rssi, color="cyan", linestyle="--", label=f"Vidējais modificētais RSSI: {mean_modified_rssi:.2f} dBm")
@@ -189,8 +177,9 @@ def plot_results():
 
     # Caurlaidspējas grafiks
     plt.figure(figsize=(12, 6))
-    plt.plot(times_seconds, real_capacity, label="Reālā caurlaidspēja", color="blue")
-    plt.plot(times_seconds, modified_capacity, label="Modificētā caurlaidspēja", color="orange")
+    ax = plt.gca()
+    plot_series(ax, times_seconds, real_capacity, label="Reālā caurlaidspēja", color="blue")
+    plot_series(ax, times_seconds, modified_capacity, label="Modificētā caurlaidspēja", color="orange")
     plt.axhline(y=mean_real_capacity, color="green", linestyle="--", label=f"Vidējā reālā caurlaidspēja: {mean_real_capacity:.2f} kbit/s")
     plt.axhline(y=mean_modified_capacity, color="cyan", linestyle="--", label=f"Vidējā modificētā caurlaidspēja: {mean_modified_capacity:.2f} kbit/s")
     plt.xlabel("Laiks (sekundes)")
@@ -1,9 +1,12 @@
 import logging
 import numpy as np
-from killerbee import KillerBee
+from radio import open_killerbee
 from datetime import datetime, timedelta
-import matplotlib.pyplot as plt
-import time
+from capture import PacketCapture
+from fading import NakagamiSampler
+from capacity import calculate_capacity, capacity_lookup
+from log_queue import PacketLog
+from plot_render import draw_markers, draw_spans, plot_series
 
 # Žurnāla konfigurācija
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
@@ -35,15 +38,11 @@ jamming_periods = []
 last_injection_time = None
 
 
-def nakagami_fading(m, omega, size=1):
-    # Nakagami sadalījuma vērtību ģenerēšana
-    return np.random.gamma(shape=m, scale=omega / m, size=size)
-
-
-def apply_nakagami_rssi(base_rssi, m, omega):
-    # Nakagami sadalījuma pielietošana RSSI vērtībai
-    fading = nakagami_fading(m=m, omega=omega, size=1)[0]
-    return base_rssi + 10 * np.log10(fading)
+# Nakagami sadalījuma vērtības no iepriekš izlozēta bufera
+FADING = NakagamiSampler(m=M, omega=OMEGA)
+# Per-packet ziņojumi tiek apkopoti periodiskos kopsavilkumos; slāpēšanas atklāšana tiek žurnalēta pilnībā
+INJECTOR_LOG = PacketLog(__name__, "Injektora paketes", unit="paketes, RSSI")
+PACKET_LOG = PacketLog(__name__, "Paketes", unit="paketes, RSSI")
 
 
 def decode_rssi(encoded_rssi):
@@ -51,18 +50,6 @@ def decode_rssi(encoded_rssi):
     return encoded_rssi - 256 if encoded_rssi > 127 else encoded_rssi
 
 
-def calculate_capacity_extended(rssi, c_theoretical=250, overhead=0.4, noise_floor=-95, max_snr=40):
-    # Caurlaidspējas aprēķins
-    snr_db = rssi - noise_floor
-    if snr_db < 0:
-        return 0
-
-    P_success = max(0.1, min(1.0, snr_db / max_snr))
-    Duty_Cycle = max(0.1, min(0.8, snr_db / max_snr))
-    capacity = c_theoretical * (1 - overhead) * P_success * Duty_Cycle
-    return capacity
-
-
 def detect_jamming_v2(current_time):
     # Aizsardzības noteikšana, pamatojoties uz intervāliem starp injekcijām
     global last_injection_time, jamming_periods
@@ -74,69 +61,83 @@ def detect_jamming_v2(current_time):
             start_time = last_injection_time
             end_time = current_time
             jamming_periods.append((start_time, end_time))
-            logging.warning(f"Jamming Detected: {start_time} - {end_time}")
+            logging.warning("Jamming Detected: %s - %s", start_time, end_time)
     last_injection_time = current_time  # Atjauninām laiku, kad veikta pēdējā injekcija
 
 
-def process_packet(packet):
-    # Pakešu apstrāde
-    global timestamps, original_rssi, modified_rssi, real_capacity, theoretical_capacity, injection_points, last_injection_time
-    
-    current_time = datetime.now()
+def classify_packet(packet, current_time):
+    # Viena kadra RSSI (injektora paketēm – no satura); None, ja kadrs netiek analizēts
     payload = packet.get("bytes", b"")
 
     if payload.startswith(EXPECTED_HEADER):
         encoded_rssi = payload[len(EXPECTED_HEADER)]
         rssi = decode_rssi(encoded_rssi)
         injection_points.append((len(timestamps), rssi))
-        logging.info(f"Injector: RSSI={rssi} dBm")
+        INJECTOR_LOG("Injector: RSSI=%s dBm", rssi, value=rssi)
         detect_jamming_v2(current_time)
     else:
         rssi = packet.get("rssi", None)
         if rssi is None:
             logging.warning("Packet without RSSI value. Skiped.")
-            return
-        logging.info(f"Packet: RSSI={rssi} dBm")
+            return None
+        PACKET_LOG("Packet: RSSI=%s dBm", rssi, value=rssi)
 
     if rssi >= 0:
-        logging.warning(f"Excluded packet with positive RSSI: {rssi}")
-        return
+        logging.warning("Excluded packet with positive RSSI: %s", rssi)
+        return None
+    return rssi
+
 
-    nakagami_rssi = apply_nakagami_rssi(rssi, M, OMEGA)
-    real_cap = calculate_capacity_extended(rssi)
-    theoretical_cap = calculate_capacity_extended(nakagami_rssi)
+def process_batch(times, frames):
+    # Kadru kopas apstrāde (analīzes pavedienā): klasifikācija pa kadriem, fadings un caurlaidspēja – visai kopai
+    kept_rssi = []
+    for timestamp, packet in zip(times, frames):
+        current_time = datetime.fromtimestamp(timestamp)
+        try:
+            rssi = classify_packet(packet, current_time)
+        except Exception as e:
+            logging.error(f"Packet error: {e}")
+            continue
+        if rssi is not None:
+            # Laiks tiek pievienots uzreiz, lai injekcijas punkta indekss atbilstu šai rindai
+            timestamps.append(current_time.strftime("%Y-%m-%d %H:%M:%S"))
+            kept_rssi.append(rssi)
+    if not kept_rssi:
+        return
 
-    timestamps.append(current_time.strftime("%Y-%m-%d %H:%M:%S"))
-    original_rssi.append(rssi)
-    modified_rssi.append(nakagami_rssi)
-    real_capacity.append(real_cap)
-    theoretical_capacity.append(theoretical_cap)
+    rssi = np.asarray(kept_rssi)
+    nakagami_rssi = FADING.apply(rssi)
+    original_rssi.extend(kept_rssi)
+    modified_rssi.extend(nakagami_rssi.tolist())
+    real_capacity.extend(np.asarray(capacity_lookup(rssi)).tolist())  # Veseli dBm – O(1) tabulā
+    theoretical_capacity.extend(calculate_capacity(nakagami_rssi).tolist())
 
 
-def sniff_and_analyze(device, channel, duration):
+def sniff_and_analyze(device, channel, duration, plot=True):
     # Uzraudzība CC2531 un RSSI paketes apstrāde
     try:
-        kb = KillerBee(device=device)
+        kb = open_killerbee(device)
         kb.set_channel(channel)
         logging.info(f"Monitoring on channel {channel} started for {duration} seconds.")
     except Exception as e:
         logging.error(f"Device error: {e}")
         return
 
-    start_time = time.time()
-    while time.time() - start_time < duration:
-        try:
-            packet = kb.pnext()
-            if packet:
-                process_packet(packet)
-        except Exception as e:
-            logging.error(f"Packet error: {e}")
+    # Uztveršanas pavediens tikai nolasa kadrus gredzenā; analīze – šeit, pa kopām
+    capture = PacketCapture(kb).start(duration)
+    for times, frames, _ in capture.batches():
+        process_batch(times, frames)
     kb.close()
+    INJECTOR_LOG.close()
+    PACKET_LOG.close()
+    logging.info(capture.summary())
     logging.info("Monitoring is over.")
-    plot_results()
+    if plot:
+        plot_results()
 
 
 def plot_results():
+    import matplotlib.pyplot as plt  # Ielādēts tikai, kad tiek zīmēti grafiki
     # Grafiku izveidošana
     if not timestamps:
         logging.warning("Nav datu grafiku izveidei.")
@@ -146,10 +147,13 @@ def plot_results():
     seconds = [(t - times_dt[0]).total_seconds() for t in times_dt]
 
     # RSSI grafiks
+    # Līknes tiek samazinātas līdz asu platumam pikseļos; marķieri un intervāli – pa vienai kolekcijai
     plt.figure(figsize=(14, 8))
-    plt.plot(seconds, original_rssi, label="Oriģinālais RSSI", linestyle="-", color="blue")
-    plt.plot(seconds, modified_rssi, label="Modificetais RSSI (Nakagami)", linestyle="--", color="orange")
-    plt.scatter(
+    ax = plt.gca()
+    plot_series(ax, seconds, original_rssi, label="Oriģinālais RSSI", linestyle="-", color="blue")
+    plot_series(ax, seconds, modified_rssi, label="Modificetais RSSI (Nakagami)", linestyle="--", color="orange")
+    draw_markers(
+        ax,
         [seconds[idx] for idx, _ in injection_points],
         [-90] * len(injection_points),
         color="red",
@@ -157,10 +161,9 @@ def plot_results():
         label="Injekcija (RSSI -90)",
         s=50
     )
-    for start, end in jamming_periods:
-        start_sec = (start - times_dt[0]).total_seconds()
-        end_sec = (end - times_dt[0]).total_seconds()
-        plt.axvspan(start_sec, end_sec, color="purple", alpha=0.3, label="Injekcijas slāpēšana")
+    draw_spans(ax, [((start - times_dt[0]).total_seconds(), (end - times_dt[0]).total_seconds())
+                    for start, end in jamming_periods],
+               color="purple", alpha=0.3, label="Injekcijas slāpēšana")
 
     plt.xlabel("Laiks (sec)", fontsize=12)
     plt.ylabel("RSSI (dBm)", fontsize=12)
@@ -173,8 +176,9 @@ def plot_results():
 
     # Caurlaidspējas grafiks
     plt.figure(figsize=(14, 8))
-    plt.plot(seconds, real_capacity, label="Oriģināla caurlaidspēja (kbit/s)", linestyle="-", color="blue")
-    plt.plot(seconds, theoretical_capacity, label="Modificeta caurlaidspēja (kbit/s)", linestyle="--", color="orange")
+    ax = plt.gca()
+    plot_series(ax, seconds, real_capacity, label="Oriģināla caurlaidspēja (kbit/s)", linestyle="-", color="blue")
+    plot_series(ax, seconds, theoretical_capacity, label="Modificeta caurlaidspēja (kbit/s)", linestyle="--", color="orange")
     plt.xlabel("Laiks (sec)", fontsize=12)
     plt.ylabel("Caurlaidspēja (kbit/s)", fontsize=12)
     plt.title("Caurlaidspējas analīze", fontsize=14)
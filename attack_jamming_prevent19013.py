@@ -3,8 +3,8 @@ import logging
 import time
 import random
 import numpy as np
-from killerbee import KillerBee
-from SoapySDR import Device, SOAPY_SDR_TX
+from radio import AdaptiveReceiver, open_killerbee
+from log_queue import LazyHex, flush_packet_logs, packet_log
 
 # Logging iestatījumi
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
@@ -26,6 +26,7 @@ jamming_count = 0  # Paketēs, kas noversti bloķēšanas procesā
 detected_packets = 0  # Atrasto paketes skaits
 
 def open_hackrf():
+    from SoapySDR import Device  # Ielādēts tikai, kad tiek izmantots HackRF
     try:
         sdr = Device(dict(driver="hackrf"))
         logging.info("HackRF veiksmīgi inicializēts.")
@@ -35,6 +36,7 @@ def open_hackrf():
         return None
 
 def jam_zigbee_channel(sdr, freq, duration):
+    from SoapySDR import SOAPY_SDR_TX  # Ielādēts tikai, kad tiek izmantots HackRF
     global jamming_count
     try:
         sdr.setSampleRate(SOAPY_SDR_TX, 0, SAMPLE_RATE)
@@ -62,37 +64,48 @@ def jam_zigbee_channel(sdr, freq, duration):
     except Exception as e:
         logging.error(f"Kļuda: {e}")
 
-def sniff_cc2531():
+def sniff_cc2531(jam=True):
     global detected_packets
     try:
-        kb = KillerBee(device=CC2531_INTERFACE)
+        kb = open_killerbee(CC2531_INTERFACE)
         kb.set_channel(ZIGBEE_CHANNEL)
         logging.info(f"Zigbee sniffers CC2531: {ZIGBEE_CHANNEL}.")
+        sniffed_log = packet_log(__name__, "Sniffers: paketes")  # Kopsavilkums; uzbrukuma atklāšana – pilnībā
+        # Bez traucēšanas (tikai atklāšana) uzbrukuma paketes nāk bez pauzes – arī tās kopsavilkumā
+        attack_log = packet_log(__name__, "Atklātās uzbrukuma paketes", level=logging.WARNING)
 
+        receiver = AdaptiveReceiver(kb, stop=stop_signal)  # Dīkstāvē gaida, nevis griežas ciklā
         while not stop_signal.is_set():
-            packet = kb.pnext()
+            packet = receiver.pnext()
             if packet:
                 detected_packets += 1
                 header = packet.get("bytes", b"")[:len(JAM_HEADER)]
-                logging.info(f"Sniffers: Paketes galvene: {header.hex()}")
+                sniffed_log("Sniffers: Paketes galvene: %s", LazyHex(header))
 
                 if header.startswith(JAM_HEADER):
+                    if not jam:
+                        attack_log("Atklāts uzbrukuma pakets!")
+                        continue
                     logging.warning("Atklāts uzbrukuma pakets! Aktivizējam traucējumus.")
                     sdr = open_hackrf()
                     if sdr:
                         jam_zigbee_channel(sdr, ZIGBEE_CHANNEL_FREQ, JAMMING_DURATION)
+            elif receiver.finished:
+                break  # Ieraksta beigas
     except Exception as e:
         logging.error(f"Sniffera kļuda: {e}")
     finally:
+        flush_packet_logs()
         logging.info("Sniffers CC2531 aptūrets.")
 
-def main(runtime):
+def main(runtime, jam=True):
+    # jam=False – tikai atklāšana (bez HackRF)
     start_time = time.time()
-    sniff_thread = threading.Thread(target=sniff_cc2531)
+    sniff_thread = threading.Thread(target=sniff_cc2531, args=(jam,))
     sniff_thread.start()
 
-    while time.time() - start_time < runtime:
-        time.sleep(1)
+    while time.time() - start_time < runtime and sniff_thread.is_alive():
+        sniff_thread.join(1)
 
     stop_signal.set()
     sniff_thread.join()
@@ -0,0 +1,224 @@
+import time
+import numpy as np
+from multiprocessing import Lock, RawArray, RawValue, resource_tracker, shared_memory
+from packets import PACKET_DTYPE
+
+# Publicēšanas/abonēšanas kanāls koplietojamajā atmiņā: ražotājs katru pakešu kopu ieraksta vienreiz
+# gredzena buferī, un katrs abonents (savācējs, aizsargs, citi detektori) to nolasa ar savu kursoru.
+# Abonentu skaits neietekmē ražotāja izmaksas. Gredzens ir ierobežots; kas notiek, ja lēnākais
+# abonents atpaliek par `capacity` ierakstiem, nosaka politika:
+#   'drop-oldest' – ražotājs pārraksta vecākos ierakstus, abonents tos uzskaita kā `lost`;
+#   'drop-newest' – ražotājs ieraksta tikai to, kas ietilpst, pārējo uzskaita kā `dropped`;
+#   'block'       – ražotājs gaida, līdz lēnākais abonents atbrīvo vietu (backpressure), bet ne ilgāk par
+#                   `block_timeout` sekundēm vienai kopai; pēc tam neietilpstošo daļu uzskaita kā `dropped`.
+#                   Tā abonents, kas beidza darbu bez Subscription.close(), neaptur ražotājus uz visiem laikiem.
+
+DEFAULT_CAPACITY = 1 << 16  # Ierakstu skaits gredzenā
+MAX_SUBSCRIBERS = 8
+POLICIES = ('drop-oldest', 'drop-newest', 'block')
+DEFAULT_BLOCK_TIMEOUT = 5.0  # Sekundes; ilgākā 'block' gaidīšana vienai kopai
+INACTIVE = -1
+
+
+class BroadcastChannel:
+    def __init__(self, capacity=DEFAULT_CAPACITY, dtype=PACKET_DTYPE, policy='drop-oldest', poll_interval=0.001,
+                 block_timeout=DEFAULT_BLOCK_TIMEOUT):
+        if policy not in POLICIES:
+            raise ValueError(f"Nezināma politika: {policy} (pieejamas: {', '.join(POLICIES)})")
+        self.dtype = np.dtype(dtype)
+        self.capacity = capacity
+        self.policy = policy
+        self.poll_interval = poll_interval
+        self.block_timeout = block_timeout
+        # Rakstītāji serializējas ar slēdzeni; lasītāji kursorus nolasa bez tās (arī kamēr 'block' ražotājs gaida)
+        self._lock = Lock()
+        self._cursor = RawValue('q', 0)  # Publicēto ierakstu skaits; tiek palielināts tikai pēc ierakstīšanas
+        self._reserved = RawValue('q', 0)  # Rezervēto ierakstu skaits; tiek palielināts pirms ierakstīšanas
+        self._produced = RawValue('q', 0)  # Visi ražotāju nodotie ieraksti (arī nomestie)
+        self._dropped = RawValue('q', 0)   # Ražotāja pusē nomestie ieraksti ('drop-newest')
+        self._readers = RawArray('q', [INACTIVE] * MAX_SUBSCRIBERS)  # Abonentu kursori politikām
+        self._reader_count = RawValue('i', 0)
+        self._shm = shared_memory.SharedMemory(create=True, size=self.dtype.itemsize * capacity)
+        self._owner = True
+        self._attach()
+
+    def _attach(self):
+        self._ring = np.ndarray((self.capacity,), dtype=self.dtype, buffer=self._shm.buf)
+
+    def __getstate__(self):
+        # Nodošanai uz 'spawn' procesiem: pievienojamies tam pašam atmiņas segmentam pēc nosaukuma
+        return {'dtype': self.dtype, 'capacity': self.capacity, 'policy': self.policy,
+                'poll_interval': self.poll_interval, 'block_timeout': self.block_timeout, 'lock': self._lock, 'cursor': self._cursor, 'reserved': self._reserved,
+                'produced': self._produced, 'dropped': self._dropped, 'readers': self._readers,
+                'reader_count': self._reader_count, 'name': self._shm.name}
+
+    def __setstate__(self, state):
+        self.dtype = state['dtype']
+        self.capacity = state['capacity']
+        self.policy = state['policy']
+        self.poll_interval = state['poll_interval']
+        self.block_timeout = state['block_timeout']
+        self._lock = state['lock']
+        self._cursor = state['cursor']
+        self._reserved = state['reserved']
+        self._produced = state['produced']
+        self._dropped = state['dropped']
+        self._readers = state['readers']
+        self._reader_count = state['reader_count']
+        self._shm = shared_memory.SharedMemory(name=state['name'])
+        # Segments pieder izveidotājam; bērnprocess to nedrīkst dzēst, beidzot darbu
+        resource_tracker.unregister(self._shm._name, "shared_memory")
+        self._owner = False
+        self._attach()
+
+    def _free_space(self, seq):
+        # Vieta līdz lēnākā aktīvā abonenta kursoram
+        active = [position for position in self._readers[:self._reader_count.value] if position != INACTIVE]
+        return self.capacity - (seq - min(active)) if active else self.capacity
+
+    def publish(self, batch):
+        # Ieraksta kopu vienreiz visiem abonentiem; kursors tiek pārvietots tikai pēc ierakstīšanas
+        n = len(batch)
+        if n == 0:
+            return
+        with self._lock:
+            self._produced.value += n
+            if self.policy == 'block':
+                # Lielāku kopu par gredzenu ieraksta pa daļām, katru reizi gaidot vietu (ne ilgāk par block_timeout)
+                deadline = time.time() + self.block_timeout
+                while len(batch) > 0:
+                    free = self._free_space(self._cursor.value)
+                    if free <= 0:
+                        if time.time() >= deadline:
+                            self._dropped.value += len(batch)
+                            return
+                        time.sleep(self.poll_interval)
+                        continue
+                    self._write(batch[:free])
+                    batch = batch[free:]
+                return
+            if self.policy == 'drop-newest':
+                free = max(0, self._free_space(self._cursor.value))
+                if n > free:
+                    self._dropped.value += n - free
+                    batch = batch[:free]
+                self._write(batch)
+                return
+            self._write(batch)
+
+    def _write(self, batch):
+        # Izsauc ar paņemtu rakstītāju slēdzeni
+        n = len(batch)
+        if n == 0:
+            return
+        if n > self.capacity:
+            batch = batch[n - self.capacity:]
+        seq = self._cursor.value
+        skipped = n - len(batch)
+        start = (seq + skipped) % self.capacity
+        first = min(len(batch), self.capacity - start)
+        self._reserved.value = seq + n
+        self._ring[start:start + first] = batch[:first]
+        if first < len(batch):
+            self._ring[:len(batch) - first] = batch[first:]
+        self._cursor.value = seq + n
+
+    # BatchSender raksta ar put(), tāpēc kanālu var izmantot rindas vietā
+    put = publish
+
+    @property
+    def published(self):
+        return self._cursor.value
+
+    @property
+    def produced(self):
+        return self._produced.value
+
+    @property
+    def dropped(self):
+        return self._dropped.value
+
+    def subscribe(self, from_start=True):
+        # Jauns abonents; no sākuma vai tikai jaunajiem ierakstiem. Jāizveido pirms ražotāju palaišanas.
+        with self._lock:
+            slot = self._reader_count.value
+            if slot >= MAX_SUBSCRIBERS:
+                raise ValueError(f"Pārāk daudz abonentu (maksimums {MAX_SUBSCRIBERS})")
+            self._reader_count.value = slot + 1
+            position = 0 if from_start else self._cursor.value
+            self._readers[slot] = position
+        return Subscription(self, position, slot)
+
+    def read(self, position):
+        # Ieraksti no `position` līdz pašreizējam kursoram: (kopija, jaunā_pozīcija, zaudēto_skaits)
+        written = self._cursor.value
+        lost = max(0, written - self.capacity - position)
+        position += lost
+        n = written - position
+        if n <= 0:
+            return np.empty(0, dtype=self.dtype), position, lost
+        start = position % self.capacity
+        first = min(n, self.capacity - start)
+        batch = np.concatenate((self._ring[start:start + first], self._ring[:n - first]))
+        # Ja rakstītājs kopēšanas laikā apsteidza lasītāju, sākuma ieraksti var būt pārrakstīti
+        overrun = min(n, max(0, self._reserved.value - self.capacity - position))
+        if overrun:
+            batch = batch[overrun:]
+            lost += overrun
+        return batch, written, lost
+
+    def close(self):
+        # Atbrīvo segmentu; izveidotājs to arī dzēš
+        self._ring = None
+        try:
+            self._shm.close()
+        except BufferError:
+            # Kāds skats vēl ir dzīvs; segments tiks atbrīvots kopā ar to
+            pass
+        if self._owner:
+            self._shm.unlink()
+
+
+class Subscription:
+    # Abonenta kursors; saskarne kā BatchReceiver (get, summary), tāpēc patērētāju kods nemainās
+    def __init__(self, channel, position=0, slot=None, poll_interval=0.005):
+        self.channel = channel
+        self.position = position
+        self.slot = slot
+        self.poll_interval = poll_interval
+        self.started = time.time()
+        self.received_packets = 0
+        self.received_batches = 0
+        self.lost = 0
+
+    def get(self, timeout=0.0):
+        # Visi jaunie ieraksti vienā masīvā; ar timeout > 0 gaida, līdz parādās dati
+        deadline = time.time() + timeout
+        while True:
+            batch, self.position, lost = self.channel.read(self.position)
+            self.lost += lost
+            if self.slot is not None:
+                self.channel._readers[self.slot] = self.position
+            if len(batch) or time.time() >= deadline:
+                break
+            time.sleep(self.poll_interval)
+        if len(batch):
+            self.received_batches += 1
+            self.received_packets += len(batch)
+        return batch
+
+    def close(self):
+        # Abonents vairs nelasa; 'block' un 'drop-newest' politikās ražotāji viņu vairs negaida
+        if self.slot is not None:
+            self.channel._readers[self.slot] = INACTIVE
+
+    def lag(self):
+        return self.channel.published - self.position
+
+    def packets_per_second(self):
+        elapsed = time.time() - self.started
+        return self.received_packets / elapsed if elapsed > 0 else 0.0
+
+    def summary(self):
+        return (f"{self.received_packets} paketes {self.received_batches} kopās, "
+                f"{self.packets_per_second():.1f} paketes/s, zaudētas {self.lost}")
@@ -0,0 +1,171 @@
+import logging
+import threading
+import time
+import numpy as np
+import radio
+from radio import AdaptiveReceiver, Backoff
+
+# Kadru uztveršana atdalīta no analīzes. Uztveršanas pavediens tikai nolasa kadrus (kb.pnext()),
+# pieraksta saņemšanas laiku un ieraksta tos gredzena buferī; analīze notiek izsaucēja pavedienā pa kopām.
+# Gredzens ir viens rakstītājs / viens lasītājs bez slēdzenes: rakstītājs maina tikai `head`, lasītājs –
+# tikai `tail`, un katrs kursors tiek palielināts tikai pēc tam, kad slots ir ierakstīts vai nolasīts.
+# Pilnā gredzenā uztveršana negaida: kadrs tiek nomests un uzskaitīts (`dropped`).
+# Abi pavedieni dīkstāvē gaida ar pieaugošu pauzi (radio.Backoff), nevis griežas ciklā; katram posmam
+# tiek atvēlēta puse no `max_latency`, tāpēc kopējā papildu aizture nepārsniedz `max_latency`.
+# Laiks tiek ņemts no avota pulksteņa, ja tāds ir (ieraksta atskaņošanā – ierakstītais laiks), citādi time.time().
+# Avotam ar `lossless` (ieraksta atskaņošana) uztveršana pilnā gredzenā gaida, nevis nomet kadrus.
+
+DEFAULT_CAPACITY = 1 << 14  # Kadru skaits gredzenā
+DEFAULT_BATCH = 512         # Maksimālais kadru skaits vienā analīzes kopā
+STOP_TIMEOUT = 1.0          # Cik ilgi gaidīt uztveršanas pavedienu (pnext var būt bloķējošs)
+
+logger = logging.getLogger(__name__)
+
+
+class CaptureRing:
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        self.capacity = capacity
+        self.times = np.empty(capacity)
+        self.frames = [None] * capacity
+        self.head = 0  # Ierakstīto kadru skaits (maina tikai rakstītājs)
+        self.tail = 0  # Nolasīto kadru skaits (maina tikai lasītājs)
+        self.dropped = 0
+        self.max_depth = 0
+
+    @property
+    def depth(self):
+        return self.head - self.tail
+
+    def push(self, timestamp, frame):
+        # Uztveršanas pusē: False, ja gredzens pilns un kadrs nomests
+        head = self.head
+        depth = head - self.tail
+        if depth >= self.capacity:
+            self.dropped += 1
+            return False
+        idx = head % self.capacity
+        self.times[idx] = timestamp
+        self.frames[idx] = frame
+        self.head = head + 1
+        if depth >= self.max_depth:
+            self.max_depth = depth + 1
+        return True
+
+    def pop_batch(self, max_count=DEFAULT_BATCH):
+        # Analīzes pusē: (laiki, kadri) līdz `max_count` vecākajiem kadriem
+        tail = self.tail
+        n = min(self.head - tail, max_count)
+        if n <= 0:
+            return np.empty(0), []
+        start = tail % self.capacity
+        end = start + n
+        if end <= self.capacity:
+            times = self.times[start:end].copy()
+            frames = self.frames[start:end]
+        else:
+            end -= self.capacity
+            times = np.concatenate((self.times[start:], self.times[:end]))
+            frames = self.frames[start:] + self.frames[:end]
+        self.tail = tail + n
+        return times, frames
+
+
+class PacketCapture:
+    def __init__(self, kb, capacity=DEFAULT_CAPACITY, batch_size=DEFAULT_BATCH, max_latency=None):
+        self.kb = kb
+        # Griesti katram posmam (uztveršana, analīze)
+        self.stage_latency = (radio.MAX_ADDED_LATENCY if max_latency is None else max_latency) / 2
+        self.ring = CaptureRing(capacity)
+        self.batch_size = batch_size
+        self.errors = 0
+        self.clock = getattr(kb, 'clock', time.time)
+        self.lossless = getattr(kb, 'lossless', False)
+        self.started = None
+        self.deadline = None
+        self._reported_drops = 0
+        self._stop = threading.Event()
+        self.receiver = AdaptiveReceiver(kb, self.stage_latency, stop=self._stop)
+        self._thread = threading.Thread(target=self._capture, name="capture", daemon=True)
+
+    def start(self, duration):
+        # Uztveršana līdz `duration` s pēc avota pulksteņa vai līdz avota beigām
+        self.started = self.clock()
+        self.deadline = self.started + duration
+        self._thread.start()
+        return self
+
+    @property
+    def running(self):
+        return self._thread.is_alive()
+
+    def _capture(self):
+        # Tikai nolasīšana, laika zīmogs un ierakstīšana gredzenā
+        pnext = self.receiver.pnext
+        push = self.ring.push
+        clock = self.clock
+        deadline = self.deadline
+        stopped = self._stop.is_set
+        full = Backoff(self.stage_latency, stop=self._stop)
+        while not stopped():
+            try:
+                frame = pnext()
+            except Exception as e:
+                self.errors += 1
+                logger.error("Kadra nolasīšanas kļūda: %s", e)
+                self.receiver.backoff.wait()
+                continue
+            now = clock()
+            if now >= deadline:
+                break
+            if frame:
+                if self.lossless:
+                    while self.ring.depth >= self.ring.capacity and not stopped():
+                        full.wait()
+                    full.reset()
+                push(now, frame)
+            elif self.receiver.finished:
+                break
+
+    def stop(self):
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join(STOP_TIMEOUT)
+
+    def _check_drops(self):
+        dropped = self.ring.dropped
+        if dropped > self._reported_drops:
+            logger.warning("Uztveršanas gredzens pilns: nomesti %d kadri (kopā %d), dziļums %d/%d",
+                           dropped - self._reported_drops, dropped, self.ring.depth, self.ring.capacity)
+            self._reported_drops = dropped
+
+    def batches(self):
+        # Kopas (laiki, kadri, tagad), kamēr darbojas uztveršana, un pēc tam atlikušie kadri no gredzena.
+        # Tukša kopa nozīmē, ka gredzens ir tukšs – analīzei laika pārbaudēm (piem. trokšņa noteikšanai);
+        # `tagad` ir pēdējā kadra laiks vai avota pulksteņa laiks, ja kadru nav.
+        idle = Backoff(self.stage_latency)
+        while True:
+            running = self.running
+            times, frames = self.ring.pop_batch(self.batch_size)
+            self._check_drops()
+            if frames:
+                idle.reset()
+                yield times, frames, float(times[-1])
+            elif not running:
+                return
+            else:
+                yield times, frames, min(self.clock(), self.deadline)
+                idle.wait()
+
+    def stats(self):
+        ring = self.ring
+        return {'captured': ring.head + ring.dropped, 'analyzed': ring.tail, 'dropped': ring.dropped,
+                'depth': ring.depth, 'max_depth': ring.max_depth, 'capacity': ring.capacity, 'errors': self.errors}
+
+    def summary(self):
+        s = self.stats()
+        text = (f"Uztveršana: {s['captured']} kadri, analizēti {s['analyzed']}, nomesti {s['dropped']}, "
+                f"maks. rindas dziļums {s['max_depth']}/{s['capacity']}, nolasīšanas kļūdas {s['errors']}")
+        if hasattr(self.kb, 'overflow'):
+            # Emulētā ierīce zina arī kadrus, kas pazuda tās buferī, pirms tos nolasīja
+            text += f", ierīces bufera pārpilde {self.kb.overflow}"
+        return text
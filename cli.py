@@ -0,0 +1,175 @@
+import argparse
+import importlib
+import subprocess
+import sys
+
+# Vienota palaišanas saskarne visiem skriptiem: `python cli.py <komanda> [opcijas]`.
+# Šis modulis importē tikai standarta bibliotēku. Izvēlētās komandas skripts tiek ielādēts tikai pēc
+# argumentu parsēšanas, un tā smagās atkarības (matplotlib, killerbee, SoapySDR) – tikai tajā koda ceļā,
+# kas tās izmanto (grafiku zīmēšana, ierīces atvēršana). `startup-check` mēra katra skripta importa
+# laiku atsevišķā procesā un pārbauda, ka smagās bibliotēkas importa laikā netiek ielādētas.
+# Žurnāls pēc noklusējuma darbojas rindas režīmā (log_queue): formatēšana un izvade – fona pavedienā,
+# per-packet ziņojumi – periodiskos kopsavilkumos.
+
+HEAVY_MODULES = ('matplotlib', 'scipy', 'killerbee', 'SoapySDR')
+STARTUP_BUDGET = 0.5  # Maksimālais viena skripta importa laiks sekundēs
+
+
+def _or(value, default):
+    return default if value is None else value
+
+
+def run_analyzer(module, args):
+    duration = _or(args.duration, getattr(module, 'ILGUMS', None) or getattr(module, 'ILGUMС', 120))
+    module.sniff_and_analyze(_or(args.device, module.IERĪCE), _or(args.channel, module.KANĀLS), duration,
+                             plot=not args.no_plot)
+
+
+def run_jamming_attack(module, args):
+    module.perform_jamming(_or(args.device, module.INTERFACE), _or(args.channel, module.CHANNEL),
+                           _or(args.duration, module.DURATION), module.PACKET_SIZE,
+                           module.DELAY_BETWEEN_PACKETS, module.JAM_HEADER)
+
+
+def run_dos_attack(module, args):
+    module.perform_dos_attack(_or(args.device, module.INTERFACE), _or(args.channel, module.CHANNEL),
+                              _or(args.duration, module.DURATION), module.PACKET_SIZE, module.DELAY_BETWEEN_PACKETS)
+
+
+def run_interference(module, args):
+    module.send_packets(_or(args.device, module.INTERFACE), _or(args.channel, module.CHANNEL),
+                        _or(args.duration, module.DURATION))
+
+
+def run_preventer(module, args):
+    # --device var būt arī uztveršanas fails (*.pcap / *.pcapng), ko atskaņo detektoram
+    if args.device is not None:
+        module.CC2531_INTERFACE = args.device
+    if args.channel is not None:
+        module.ZIGBEE_CHANNEL = args.channel
+    module.main(_or(args.duration, getattr(module, 'RUNTIME', 120)), jam=not args.detect_only)
+
+
+def run_jamming_simulation(module, args):
+    module.main(args.duration, args.devices, plot=not args.no_plot)
+
+
+def run_injection_simulation(module, args):
+    module.main_injector(_or(args.duration, 120), batch=not args.per_device, plot=not args.no_plot)
+
+
+def run_dos_simulation(module, args):
+    if args.check:
+        # Īss virtuālā un reālā laika režīma salīdzinājums (pēc noklusējuma 10 s)
+        sys.exit(0 if module.check_modes(_or(args.duration, 20)) else 1)
+    module.main(virtual=args.virtual, duration=_or(args.duration, 120), plot=not args.no_plot)
+
+
+# komanda: (modulis, apraksts, izpildītājs, papildu opcijas)
+COMMANDS = {
+    'analyze-dos': ('analyze_dos2601_lat', "DoS uzbrukuma analīze ar CC2531", run_analyzer, ('sniffer', 'plot')),
+    'analyze-injection': ('analyze_rssi_injection5', "RSSI uzraudzība pakešu injekcijas laikā", run_analyzer,
+                          ('sniffer', 'plot')),
+    'analyze-nakagami': ('analyze_rssi_nakagami260120254', "RSSI analīze ar Nakagami sadalījumu", run_analyzer,
+                         ('sniffer', 'plot')),
+    'attack-jamming': ('attack_jamming1901', "Traucēšanas uzbrukums ar RZUSBStick", run_jamming_attack, ('sniffer',)),
+    'prevent-jamming': ('attack_jamming_prevent19013', "Traucēšanas novēršana ar CC2531 un HackRF", run_preventer,
+                        ('sniffer', 'detect')),
+    'interference': ('create_interference_with_nakagami16', "Pakešu injekcija ar vāju RSSI", run_interference,
+                     ('sniffer',)),
+    'attack-dos': ('dos_attack05121', "DoS uzbrukums ar RZUSBStick", run_dos_attack, ('sniffer',)),
+    'prevent-dos': ('dos_prevent18013', "DoS novēršana ar HackRF", run_preventer, ('sniffer', 'detect')),
+    'prevent-injection': ('hackrf_prevent_inject24011', "Injekcijas novēršana ar HackRF", run_preventer,
+                          ('sniffer', 'detect')),
+    'sim-jamming': ('jamming_simulation_lat', "Traucēšanas simulācija", run_jamming_simulation, ('plot', 'devices')),
+    'sim-injection': ('packet_inj_sim21011_lat', "Pakešu injekcijas simulācija", run_injection_simulation,
+                      ('plot', 'per-device')),
+    'sim-dos': ('zigbee_dos_simulation20018_lat', "DoS simulācija", run_dos_simulation,
+                ('plot', 'virtual', 'check')),
+}
+
+
+def startup_check(budget=STARTUP_BUDGET):
+    # Katrs skripts tiek importēts tīrā procesā; ziņo importa laiku un ielādētās smagās bibliotēkas
+    probe = ("import importlib, sys, time\n"
+             "t = time.perf_counter()\n"
+             "importlib.import_module(sys.argv[1])\n"
+             "elapsed = time.perf_counter() - t\n"
+             "heavy = [m for m in sys.argv[2:] if m in sys.modules]\n"
+             "print(elapsed, ','.join(heavy))\n")
+    failed = False
+    for name in ['cli'] + [module for module, *_ in COMMANDS.values()]:
+        result = subprocess.run([sys.executable, '-c', probe, name, *HEAVY_MODULES],
+                                capture_output=True, text=True)
+        if result.returncode != 0:
+            print(f"{name:40s} KĻŪDA: {result.stderr.strip().splitlines()[-1]}")
+            failed = True
+            continue
+        elapsed, _, heavy = result.stdout.strip().rpartition("\n")[2].partition(" ")
+        elapsed = float(elapsed)
+        status = "OK"
+        if elapsed > budget:
+            status = f"PĀRSNIEGTS BUDŽETS ({budget:.2f} s)"
+            failed = True
+        if heavy:
+            status = f"IELĀDĒTS IMPORTA LAIKĀ: {heavy}"
+            failed = True
+        print(f"{name:40s} {elapsed * 1000:8.1f} ms  {status}")
+    return 1 if failed else 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Zigbee uzbrukumu, aizsardzības un simulāciju palaišana")
+    parser.add_argument('--sync-log', action='store_true', help="Žurnāls bez rindas (izvade karstajā pavedienā)")
+    parser.add_argument('--log-interval', type=float, help="Per-packet kopsavilkumu intervāls sekundēs")
+    parser.add_argument('--log-sample', type=int, help="Katru N-to per-packet ziņojumu izvadīt pilnībā")
+    parser.add_argument('--max-latency', type=float,
+                        help="Snifferu maksimālā papildu aizture dīkstāvē sekundēs (gaidīšanas griesti)")
+    parser.add_argument('--replay-speed', type=float,
+                        help="Uztveršanas faila atskaņošanas ātrums: 0 – cik ātri vien iespējams, 1 – ierakstītajā laikā")
+    parser.add_argument('--ti-metadata', action='store_true', default=None,
+                        help="Uztveršanas failā FCS vietā ir CC24xx RSSI/LQI baiti")
+    commands = parser.add_subparsers(dest='command', required=True)
+    for command, (module, description, _, options) in COMMANDS.items():
+        sub = commands.add_parser(command, help=description, description=f"{description} ({module}.py)")
+        sub.add_argument('--duration', type=int, help="Darbības ilgums sekundēs")
+        if 'sniffer' in options:
+            sub.add_argument('--device', help="KillerBee saskarne, piem. 1:3, vai uztveršanas fails (*.pcap, *.pcapng)")
+            sub.add_argument('--channel', type=int, help="Zigbee kanāls")
+        if 'detect' in options:
+            sub.add_argument('--detect-only', action='store_true', help="Tikai atklāšana, bez HackRF traucēšanas")
+        if 'plot' in options:
+            sub.add_argument('--no-plot', action='store_true', help="Neveidot grafikus (matplotlib netiek ielādēts)")
+        if 'devices' in options:
+            sub.add_argument('--devices', type=int, help="Ierīču skaits tīklā")
+        if 'per-device' in options:
+            sub.add_argument('--per-device', action='store_true', help="Katra ierīce sūta savu paketi (bez kopām)")
+        if 'virtual' in options:
+            sub.add_argument('--virtual', action='store_true', help="Simulētā laika režīms (notikumu dzinējs)")
+        if 'check' in options:
+            sub.add_argument('--check', action='store_true',
+                             help="Salīdzināt virtuālā un reālā laika režīma rezultātus pie efektivitātes 1.0 un 0.5")
+    check = commands.add_parser('startup-check', help="Skriptu importa laika pārbaude")
+    check.add_argument('--budget', type=float, default=STARTUP_BUDGET, help="Maksimālais importa laiks sekundēs")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.command == 'startup-check':
+        return startup_check(args.budget)
+    from log_queue import configure_packet_log, start_queue_logging
+    if not args.sync_log:
+        start_queue_logging()
+    configure_packet_log(args.log_interval, args.log_sample)
+    from radio import configure_receive
+    from replay import configure_replay
+    configure_receive(args.max_latency)
+    configure_replay(args.replay_speed, args.ti_metadata)
+    module_name, _, runner, _ = COMMANDS[args.command]
+    runner(importlib.import_module(module_name), args)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
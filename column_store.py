@@ -0,0 +1,112 @@
+import csv
+import json
+import os
+import numpy as np
+
+# Binārs kolonnu rezultātu formāts: katra kolonna ir atsevišķs .npy fails direktorijā.
+# Rakstīšanas laikā dati tiek pievienoti faila beigās pa kopām (bez visu datu turēšanas atmiņā);
+# .npy galvene ar rindu skaitu tiek ierakstīta fiksēta izmēra vietā un aizpildīta, aizverot failu.
+# Analīze var kolonnas atvērt ar np.load(..., mmap_mode='r') uzreiz, neatkarīgi no rindu skaita.
+# CSV eksports saderībai tiek rakstīts pa daļām.
+
+HEADER_SIZE = 128  # Fiksēts .npy galvenes izmērs (dalās ar 64, kā prasa formāts)
+META_FILE = "meta.json"
+CSV_CHUNK = 65536
+
+
+def _npy_header(dtype, rows):
+    header = repr({'descr': np.lib.format.dtype_to_descr(dtype), 'fortran_order': False, 'shape': (rows,)})
+    padding = HEADER_SIZE - 10 - len(header) - 1
+    if padding < 0:
+        raise ValueError(f"Kolonnas tips {dtype} neietilpst .npy galvenē")
+    header = (header + " " * padding + "\n").encode('latin1')
+    return b"\x93NUMPY\x01\x00" + len(header).to_bytes(2, 'little') + header
+
+
+class ColumnWriter:
+    def __init__(self, directory, schema, labels=None):
+        # schema: [(kolonnas_nosaukums, dtype), ...]; labels: {kolonna: {kods: nosaukums}} (piem. avotiem)
+        self.directory = directory
+        self.schema = [(name, np.dtype(dtype)) for name, dtype in schema]
+        self.labels = labels or {}
+        self.rows = 0
+        os.makedirs(directory, exist_ok=True)
+        self._files = {}
+        for name, dtype in self.schema:
+            f = open(os.path.join(directory, f"{name}.npy"), 'wb')
+            f.write(_npy_header(dtype, 0))
+            self._files[name] = f
+
+    @classmethod
+    def for_dtype(cls, directory, dtype, labels=None):
+        # Kolonnas pēc strukturēta dtype laukiem (piem. PACKET_DTYPE)
+        dtype = np.dtype(dtype)
+        return cls(directory, [(name, dtype.fields[name][0]) for name in dtype.names], labels)
+
+    def __len__(self):
+        return self.rows
+
+    def append(self, columns):
+        # Vienāda garuma kolonnas shēmas secībā
+        n = len(columns[0])
+        if n == 0:
+            return
+        for (name, dtype), values in zip(self.schema, columns):
+            self._files[name].write(np.ascontiguousarray(values, dtype=dtype).tobytes())
+        self.rows += n
+
+    def append_records(self, records):
+        # Strukturēts masīvs ar laukiem, kas sakrīt ar shēmas kolonnām
+        self.append([records[name] for name, _ in self.schema])
+
+    def close(self):
+        if not self._files:
+            return
+        for name, dtype in self.schema:
+            f = self._files[name]
+            f.seek(0)
+            f.write(_npy_header(dtype, self.rows))
+            f.close()
+        self._files = {}
+        meta = {'rows': self.rows, 'columns': [name for name, _ in self.schema],
+                'labels': {column: {str(code): label for code, label in table.items()}
+                           for column, table in self.labels.items()}}
+        with open(os.path.join(self.directory, META_FILE), 'w') as f:
+            json.dump(meta, f, ensure_ascii=False)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def write_columns(directory, columns, labels=None):
+    # Vienreizēja ierakstīšana no {nosaukums: masīvs}
+    arrays = {name: np.asarray(values) for name, values in columns.items()}
+    with ColumnWriter(directory, [(name, values.dtype) for name, values in arrays.items()], labels) as writer:
+        writer.append(list(arrays.values()))
+
+
+def load_columns(directory, mmap_mode='r'):
+    # {nosaukums: masīvs}; pēc noklusējuma atmiņā kartēti (mmap), dati netiek nolasīti uzreiz
+    with open(os.path.join(directory, META_FILE)) as f:
+        meta = json.load(f)
+    return {name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode=mmap_mode) for name in meta['columns']}
+
+
+def load_labels(directory):
+    with open(os.path.join(directory, META_FILE)) as f:
+        meta = json.load(f)
+    return {column: {int(code): label for code, label in table.items()} for column, table in meta['labels'].items()}
+
+
+def export_csv(filename, header, columns, order=None, chunk_size=CSV_CHUNK):
+    # CSV saderībai: rindas tiek rakstītas pa `chunk_size` daļām; `order` – neobligāta rindu secība (indeksi)
+    n = len(columns[0]) if columns else 0
+    with open(filename, mode='w', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(header)
+        for start in range(0, n, chunk_size):
+            rows = slice(start, min(start + chunk_size, n)) if order is None else order[start:start + chunk_size]
+            writer.writerows(zip(*(np.asarray(column[rows]).tolist() for column in columns)))
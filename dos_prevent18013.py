@@ -1,7 +1,7 @@
 import logging
 import numpy as np
-from SoapySDR import Device, SOAPY_SDR_TX
-from killerbee import KillerBee
+from radio import LINE_RATE_KBPS, PHY_OVERHEAD_BYTES, AdaptiveReceiver, open_killerbee
+from log_queue import LazyHex, PacketLog, flush_packet_logs, packet_log
 import threading
 import time
 from datetime import datetime
@@ -15,9 +15,10 @@ GAIN = 47  # Maksimālais signāla pastiprinājums
 JAMMING_DURATION = 10  # Traucējumu noveršanas ilgums sekundēs
 
 # CC2531 parametri
+CC2531_INTERFACE = "1:2"  # Ierīce vai uztveršanas fails atskaņošanai (*.pcap / *.pcapng)
 ZIGBEE_CHANNEL = 15
 HEADERS_TO_DETECT = [b'\x01\x01']  # DoS paketes galvēne (header)
-DETECTION_INTERVAL = 0.05  # Paketes pārbaudes intervāls (sekundēs)
+DETECTION_INTERVAL = 0  # Fiksēta pauze pēc katras nolasīšanas (sekundēs); 0 – katra pakete tiek apstrādāta uzreiz
 
 # Globālās mainīgās
 stop_event = threading.Event()
@@ -25,8 +26,12 @@ jam_event = threading.Event()
 packets_detected = 0
 packets_jammed = 0
 packets_in_jamming = 0
+frames_processed = 0
+bytes_processed = 0
+sniff_seconds = 0.0
 
 def open_hackrf():
+    from SoapySDR import Device, SOAPY_SDR_TX  # Ielādēts tikai, kad tiek izmantots HackRF
     ## HackRF inicializācijas process
     try:
         sdr = Device(dict(driver="hackrf"))
@@ -40,6 +45,7 @@ def open_hackrf():
         return None
 
 def jam_channel(sdr):
+    from SoapySDR import SOAPY_SDR_TX  # Ielādēts tikai, kad tiek izmantots HackRF
     global packets_in_jamming
     try:
         stream = sdr.setupStream(SOAPY_SDR_TX, "CF32")
@@ -62,16 +68,29 @@ def jam_channel(sdr):
 
 def sniff_with_cc2531():
    ## Pakešu analīze, izmantojot CC2531 snifferi
-    global packets_detected, packets_jammed, packets_in_jamming
+    global packets_detected, packets_jammed, packets_in_jamming, frames_processed, bytes_processed, sniff_seconds
+    kb = None
+    started = time.time()
     try:
-        kb = KillerBee(device="1:2")
+        kb = open_killerbee(CC2531_INTERFACE)
         kb.set_channel(ZIGBEE_CHANNEL)
         logging.info(f"Zigbee sniffers CC2531: {ZIGBEE_CHANNEL}.")
+        # Per-packet ziņojumi – kopsavilkumos; pirmā DoS paketes atklāšana – pilnībā
+        blocked_log = packet_log(__name__, "Bloķētās DoS paketes")
+        passed_log = packet_log(__name__, "Paketes bez bloķēšanas", level=logging.DEBUG)
+        # Visu apstrādāto kadru ātrums (kadri/s) periodiskā kopsavilkumā
+        frames_log = PacketLog(__name__, "CC2531: apstrādāti kadri", unit="kadri")
 
+        # Bez fiksētas pauzes: dīkstāvē gaida tikai tad, kad kadra nav (radio.AdaptiveReceiver)
+        receiver = AdaptiveReceiver(kb, stop=stop_event)
+        started = time.time()
         while not stop_event.is_set():
-            packet = kb.pnext()
+            packet = receiver.pnext()
             if packet:
                 payload = packet.get("bytes", b"")
+                frames_processed += 1
+                bytes_processed += len(payload)
+                frames_log.add(1)
                 header = payload[:len(HEADERS_TO_DETECT[0])]
                 timestamp = datetime.now()
 
@@ -79,24 +98,39 @@ def sniff_with_cc2531():
                     packets_detected += 1
                     if jam_event.is_set():
                         packets_in_jamming += 1
-                        logging.info(f"Pakete ir bloķēta: Galvēne={header.hex()}, Время={timestamp}")
+                        blocked_log("Pakete ir bloķēta: Galvēne=%s, Время=%s", LazyHex(header), timestamp)
                     else:
-                        logging.info(f"DoS pakets atklats: Galvēne={header.hex()}, Время={timestamp}")
+                        logging.info("DoS pakets atklats: Galvēne=%s, Время=%s", LazyHex(header), timestamp)
                         jam_event.set()
                 else:
-                    logging.debug(f"Paketes bez bloķēšanas: Galvēne={header.hex()}, Время={timestamp}")
-            time.sleep(DETECTION_INTERVAL)
+                    passed_log("Paketes bez bloķēšanas: Galvēne=%s, Время=%s", LazyHex(header), timestamp)
+            elif receiver.finished:
+                break  # Ieraksta beigas
+            if DETECTION_INTERVAL:
+                time.sleep(DETECTION_INTERVAL)
+        frames_log.close()
     except Exception as e:
         logging.error(f"CC2531 kļuda: {e}")
     finally:
-        kb.close()
+        sniff_seconds = time.time() - started
+        flush_packet_logs()
+        if kb is not None:
+            kb.close()
         logging.info("CC2531 darbības ir aptūreta.")
 
-def main(runtime):
-    ## Galvenais atklāšanas un bloķēšanas process.
+
+def throughput_report():
+    # Apstrādātie kadri/s un atbilstošais ātrums ēterā salīdzinājumā ar 802.15.4 līnijas ātrumu
+    elapsed = max(sniff_seconds, 1e-9)
+    kbps = (bytes_processed + PHY_OVERHEAD_BYTES * frames_processed) * 8 / 1000 / elapsed
+    return (f"Apstrādāti {frames_processed} kadri {elapsed:.1f} s laikā: {frames_processed / elapsed:.1f} kadri/s, "
+            f"{kbps:.1f} kbit/s ({kbps / LINE_RATE_KBPS * 100:.1f}% no {LINE_RATE_KBPS} kbit/s)")
+
+def main(runtime, jam=True):
+    ## Galvenais atklāšanas un bloķēšanas process; jam=False – tikai atklāšana (bez HackRF)
     global packets_detected, packets_jammed, packets_in_jamming
-    sdr = open_hackrf()
-    if not sdr:
+    sdr = open_hackrf() if jam else None
+    if jam and not sdr:
         logging.error("HackRF neizdevās inicializēt. Programmas pabeigšana.")
         return
 
@@ -105,10 +139,11 @@ def main(runtime):
 
     start_time = time.time()
     try:
-        while time.time() - start_time < runtime:
+        while time.time() - start_time < runtime and sniff_thread.is_alive():
             if jam_event.is_set():
-                packets_jammed += 1
-                jam_channel(sdr)
+                if sdr:
+                    jam_channel(sdr)
+                    packets_jammed += 1
                 jam_event.clear()
             time.sleep(0.1)
     except KeyboardInterrupt:
@@ -120,7 +155,9 @@ def main(runtime):
             del sdr
 
         logging.info(f"Atklāto pakešu skaits: {packets_detected}")
-        logging.info(f"Novērstu paketes skaits: {packets_jammed}")
+        if jam:  # Tikai atklāšanas režīmā nekas netiek novērsts
+            logging.info(f"Novērstu paketes skaits: {packets_jammed}")
+        logging.info(throughput_report())
 
 if __name__ == "__main__":
     runtime = 120  # Darbības ilgums
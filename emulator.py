@@ -0,0 +1,182 @@
+import time
+import numpy as np
+from radio import LINE_RATE_KBPS, PHY_OVERHEAD_BYTES
+
+# Programmatiska KillerBee ierīce (set_channel, pnext, inject, close) slodzes testiem bez USB radio.
+# Ierīce ģenerē kadru plūsmu ar noteiktu pakešu veidu maisījumu (parastās, DoS, injekcijas, traucēšanas)
+# un RSSI sadalījumiem. Starp kadriem paiet kadra pārraides laiks ēterā (250 kbit/s) plus eksponenciāla
+# pauze, kuras vidējā vērtība dod vidējo ātrumu `rate` (kadri/s), tāpēc plūsma nepārsniedz 802.15.4
+# līnijas ātrumu. rate='line' – kadri bez pauzēm, t.i. līnijas ātrums visam maisījumam.
+# Reālā laika režīmā kadri, kas pienākuši, bet nav nolasīti, krājas ierīces buferī (`buffer_frames`);
+# pārpildes gadījumā vecākie tiek nomesti un uzskaitīti (`overflow`) – kā lēnam lasītājam ar īstu ierīci.
+# Virtuālā laika režīmā (realtime=False) kadri tiek atdoti bez gaidīšanas, bet pulkstenis ir ģenerētais
+# laiks, tāpēc analizatoru caurlaidspēju var mērīt bez pauzēm. Injicētie kadri tiek ierakstīti (`injected`).
+# Ierīces nosaukums radio.open_killerbee: "emu" vai "emu:rate=2000,dos=0.2,normal=0.8,seed=1,realtime=0",
+# RSSI sadalījums – "dos_rssi=-55:3" (vidējais:std dBm).
+
+BLOCK_SIZE = 4096          # Kadru skaits vienā ģenerēšanas blokā
+DEFAULT_RATE = 100.0       # Kadri/s
+DEFAULT_BUFFER = 256       # Ierīces bufera ietilpība (kadri)
+MAX_RECORDED = 100000      # Cik injicēto kadru saglabāt (pārējie tikai tiek skaitīti)
+ZIGBEE_CHANNELS = range(11, 27)
+
+# veids: (galvene, kadra garums baitos, RSSI vidējais, RSSI std)
+FRAME_KINDS = {
+    'normal': (b"\x41\x88", 30, -60.0, 8.0),
+    'dos': (b"\x01\x01", 50, -55.0, 3.0),
+    'injection': (b"\xAA\xBB" + bytes([-90 & 0xFF]), 45, -88.0, 2.0),  # Galvene + kodēts RSSI (kā injektorā)
+    'jamming': (b"\xFF" * 5, 50, -40.0, 3.0),
+}
+DEFAULT_MIX = {'normal': 0.85, 'dos': 0.1, 'injection': 0.03, 'jamming': 0.02}
+
+
+def airtime(length):
+    # Kadra pārraides laiks ēterā (s) ar PHY papildu baitiem
+    return (np.asarray(length) + PHY_OVERHEAD_BYTES) * 8 / (LINE_RATE_KBPS * 1000)
+
+
+class EmulatedKillerBee:
+    def __init__(self, rate=DEFAULT_RATE, mix=None, rssi=None, realtime=True, buffer_frames=DEFAULT_BUFFER,
+                 seed=None, channel=None):
+        mix = DEFAULT_MIX if mix is None else mix
+        unknown = set(mix) - set(FRAME_KINDS)
+        if unknown:
+            raise ValueError(f"Nezināmi pakešu veidi: {', '.join(sorted(unknown))} (pieejami: {', '.join(FRAME_KINDS)})")
+        self.kinds = [kind for kind in FRAME_KINDS if mix.get(kind, 0) > 0]
+        weights = np.array([mix[kind] for kind in self.kinds], dtype=float)
+        self.weights = weights / weights.sum()
+        self.headers = [FRAME_KINDS[kind][0] for kind in self.kinds]
+        self.lengths = np.array([FRAME_KINDS[kind][1] for kind in self.kinds])
+        rssi = rssi or {}
+        self.rssi_params = np.array([rssi.get(kind, FRAME_KINDS[kind][2:]) for kind in self.kinds], dtype=float)
+        mean_airtime = float(airtime(self.lengths) @ self.weights)
+        self.rate = 1.0 / mean_airtime if rate == 'line' else min(float(rate), 1.0 / mean_airtime)
+        self.mean_idle = 1.0 / self.rate - mean_airtime  # Vidējā pauze starp kadriem (s)
+        self.realtime = realtime
+        self.buffer_frames = buffer_frames
+        self.rng = np.random.default_rng(seed)
+        self.channel = channel
+        self.delivered = 0
+        self.delivered_kinds = dict.fromkeys(self.kinds, 0)
+        self.overflow = 0
+        self.injected = []
+        self.injected_count = 0
+        self.closed = False
+        if not realtime:
+            # Virtuālais laiks: uztveršana izmanto ģenerēto laiku un pilnā gredzenā gaida (capture.PacketCapture)
+            self.clock = self._virtual_clock
+            self.lossless = True
+        self._start = time.time() if realtime else 0.0
+        self._last_time = self._start
+        self._next_arrival = self._start
+        self._times = np.empty(0)
+        self._pos = 0
+
+    @classmethod
+    def from_spec(cls, spec):
+        # "emu:rate=2000,dos=0.2,dos_rssi=-55:3,realtime=0,seed=1,buffer=256"
+        _, _, options = spec.partition(":")
+        kwargs = {}
+        mix = {}
+        rssi = {}
+        for item in filter(None, (part.strip() for part in options.split(","))):
+            name, _, value = item.partition("=")
+            if name == 'rate':
+                kwargs['rate'] = value if value == 'line' else float(value)
+            elif name == 'realtime':
+                kwargs['realtime'] = value not in ('0', 'false', 'no')
+            elif name == 'seed':
+                kwargs['seed'] = int(value)
+            elif name == 'buffer':
+                kwargs['buffer_frames'] = int(value)
+            elif name.endswith('_rssi'):
+                mean, _, std = value.partition(":")
+                rssi[name[:-len('_rssi')]] = (float(mean), float(std or 0.0))
+            else:
+                mix[name] = float(value)
+        if mix:
+            kwargs['mix'] = mix
+        if rssi:
+            kwargs['rssi'] = rssi
+        return cls(**kwargs)
+
+    def _generate_block(self):
+        # Nākamie BLOCK_SIZE kadri: veidi, RSSI, garumi un ienākšanas laiki (pārraides laiks + pauze)
+        n = BLOCK_SIZE
+        kinds = self.rng.choice(len(self.kinds), size=n, p=self.weights)
+        lengths = self.lengths[kinds]
+        gaps = airtime(lengths) + self.rng.exponential(max(self.mean_idle, 0.0), size=n)
+        self._times = self._next_arrival + np.concatenate(([0.0], np.cumsum(gaps[:-1])))
+        self._next_arrival = self._times[-1] + gaps[-1]
+        mean, std = self.rssi_params[kinds].T
+        self._rssi = np.clip(np.rint(self.rng.normal(mean, std)), -100, -1).astype(int).tolist()
+        self._kinds = kinds.tolist()
+        self._lengths = lengths.tolist()
+        self._random = self.rng.bytes(int(lengths.sum()))
+        self._offsets = np.concatenate(([0], np.cumsum(lengths[:-1]))).tolist()
+        self._pos = 0
+
+    def _frame(self, i):
+        kind = self._kinds[i]
+        header = self.headers[kind]
+        offset = self._offsets[i]
+        payload = header + self._random[offset + len(header):offset + self._lengths[i]]
+        rssi = self._rssi[i]
+        self.delivered_kinds[self.kinds[kind]] += 1
+        return {'bytes': payload, 'rssi': rssi, 'dbm': rssi, 'validcrc': True, 'kind': self.kinds[kind]}
+
+    def _virtual_clock(self):
+        return self._last_time
+
+    def set_channel(self, channel):
+        if channel not in ZIGBEE_CHANNELS:
+            raise ValueError(f"Nederīgs Zigbee kanāls: {channel}")
+        self.channel = channel
+
+    def pnext(self, timeout=100):
+        # Nākamais kadrs; reālā laikā gaida tā pienākšanu, bet ne ilgāk par `timeout` ms
+        if self.closed:
+            return None
+        if self._pos >= len(self._times):
+            self._generate_block()
+        if self.realtime:
+            now = time.time()
+            while self._times[-1] <= now:
+                # Lasītājs atpaliek vairāk nekā par visu bloku – bloka atlikums ir zaudēts
+                self.overflow += len(self._times) - self._pos
+                self._generate_block()
+            # Nenolasītie kadri ierīces buferī: pārpildes gadījumā vecākie tiek nomesti
+            due = int(np.searchsorted(self._times, now, side='right')) - self._pos
+            if due > self.buffer_frames:
+                self.overflow += due - self.buffer_frames
+                self._pos += due - self.buffer_frames
+            delay = self._times[self._pos] - now
+            if delay > 0:
+                time.sleep(min(delay, timeout / 1000))
+                if delay > timeout / 1000:
+                    return None
+        self._last_time = float(self._times[self._pos])
+        frame = self._frame(self._pos)
+        self._pos += 1
+        self.delivered += 1
+        return frame
+
+    def inject(self, packet, channel=None, count=1, delay=0):
+        # Injicētie kadri tiek tikai ierakstīti (laiks, kanāls, baiti)
+        if self.closed:
+            raise IOError("Ierīce ir aizvērta")
+        channel = self.channel if channel is None else channel
+        for _ in range(count):
+            self.injected_count += 1
+            if len(self.injected) < MAX_RECORDED:
+                self.injected.append((time.time(), channel, bytes(packet)))
+            if delay:
+                time.sleep(delay)
+
+    def close(self):
+        self.closed = True
+
+    def summary(self):
+        generated = ", ".join(f"{kind} {count}" for kind, count in self.delivered_kinds.items())
+        return (f"Emulators: piedāvātā slodze {self.rate:.1f} kadri/s, nolasīti {self.delivered} ({generated}), "
+                f"bufera pārpilde {self.overflow}, injicēti {self.injected_count}")
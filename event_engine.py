@@ -0,0 +1,35 @@
+import heapq
+import itertools
+
+# Diskrētu notikumu dzinējs virtuālā laika simulācijām.
+# Notikumi tiek glabāti kaudzē (heap) pēc simulētā laika, un pulkstenis pārlec
+# uzreiz uz nākamo notikumu, tāpēc 120 s (vai 24 h) scenārijs aizņem milisekundes.
+
+
+class EventEngine:
+    def __init__(self, start_time=0.0):
+        self.now = start_time
+        self.processed_events = 0
+        self._queue = []
+        self._sequence = itertools.count()  # Vienāda laika notikumiem saglabā ieplānošanas secību
+
+    def schedule(self, delay, callback, *args):
+        # Ieplāno notikumu pēc `delay` sekundēm simulētajā laikā
+        self.schedule_at(self.now + delay, callback, *args)
+
+    def schedule_at(self, when, callback, *args):
+        # Ieplāno notikumu absolūtā simulētā laika brīdī
+        heapq.heappush(self._queue, (when, next(self._sequence), callback, args))
+
+    def pending(self):
+        return len(self._queue)
+
+    def run(self, until):
+        # Apstrādā notikumus, kamēr simulētais laiks ir mazāks par `until`
+        queue = self._queue
+        while queue and queue[0][0] < until:
+            when, _, callback, args = heapq.heappop(queue)
+            self.now = when
+            callback(*args)
+            self.processed_events += 1
+        self.now = until
@@ -0,0 +1,182 @@
+import argparse
+import csv
+import importlib
+import itertools
+import logging
+import os
+from multiprocessing import Pool
+import numpy as np
+
+# Parametru pārlase (sweep) un Monte Carlo replikācija virtuālā laika scenārijiem.
+# Katrs režģa punkts (vai replika) tiek palaists atsevišķā procesu pūla darbiniekā, un kopsavilkumi
+# tiek apkopoti vienā tabulā (CSV). Replikām katram darbiniekam ir sava SeedSequence atvasināta
+# plūsma, tāpēc rezultāti ir bit-par-bitam reproducējami no galvenās sēklas.
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+# Scenārija nosaukums -> modulis ar run_scenario(**parametri)
+SCENARIOS = {
+    'dos': 'zigbee_dos_simulation20018_lat',
+    'jamming': 'jamming_simulation_lat',
+    'injection': 'packet_inj_sim21011_lat',
+}
+
+# Rādītāji, kuriem replikācijas režīmā tiek aprēķināti ticamības intervāli
+REPLICATION_METRICS = {
+    'dos': ['jammed_pct', 'recovered_rssi', 'recovered_capacity'],
+    'jamming': ['jammed_pct', 'recovered_rssi', 'recovered_capacity'],
+    'injection': ['removed_pct', 'recovered_rssi', 'recovered_capacity'],
+}
+
+
+def expand_grid(grid):
+    # {'a': [1, 2], 'b': [3]} -> [{'a': 1, 'b': 3}, {'a': 2, 'b': 3}]
+    names = list(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[name] for name in names))]
+
+
+def parse_grid(items):
+    # "jammer_efficiency=0.5,0.8,1.0" -> {'jammer_efficiency': [0.5, 0.8, 1.0]}
+    grid = {}
+    for item in items:
+        name, _, values = item.partition("=")
+        grid[name.strip()] = [parse_value(v) for v in values.split(",") if v.strip()]
+    return grid
+
+
+def parse_value(text):
+    text = text.strip()
+    for cast in (int, float):
+        try:
+            return cast(text)
+        except ValueError:
+            pass
+    return text
+
+
+def _init_worker():
+    # Darbiniekos atstājam tikai brīdinājumus, lai žurnāls nepārslogotu pārlasi
+    logging.getLogger().setLevel(logging.WARNING)
+
+
+def _run_point(task):
+    scenario, params = task
+    module = importlib.import_module(SCENARIOS[scenario])
+    return module.run_scenario(**params)
+
+
+def _map_tasks(tasks, processes):
+    # Uzdevumi procesu pūlā; rezultātu secība sakrīt ar uzdevumu secību
+    processes = processes or os.cpu_count() or 1
+    with Pool(processes=min(processes, max(len(tasks), 1)), initializer=_init_worker) as pool:
+        return pool.map(_run_point, tasks, chunksize=1)
+
+
+def check_scenario(scenario):
+    if scenario not in SCENARIOS:
+        raise ValueError(f"Nezināms scenārijs: {scenario} (pieejami: {', '.join(SCENARIOS)})")
+
+
+def run_sweep(scenario, grid, processes=None, fixed=None):
+    # Palaiž visus režģa punktus procesu pūlā (pēc noklusējuma – tik, cik CPU kodolu)
+    check_scenario(scenario)
+    points = expand_grid(grid)
+    if fixed:
+        points = [dict(fixed, **point) for point in points]
+    logging.info(f"Pārlase '{scenario}': {len(points)} punkti.")
+    results = _map_tasks([(scenario, point) for point in points], processes)
+    return [dict(point, **result) for point, result in zip(points, results)]
+
+
+def run_replicas(scenario, replicas, master_seed=0, processes=None, grid=None):
+    # Katram režģa punktam palaiž `replicas` neatkarīgas replikas ar SeedSequence atvasinātām sēklām.
+    # Atgriež (replikas_rindas, kopsavilkuma_rindas_ar_ticamības_intervāliem).
+    check_scenario(scenario)
+    points = expand_grid(grid or {})
+    point_seeds = np.random.SeedSequence(master_seed).spawn(len(points))
+    tasks = []
+    for point, point_seed in zip(points, point_seeds):
+        tasks.extend((scenario, dict(point, seed=seed)) for seed in point_seed.spawn(replicas))
+    logging.info(f"Replikācija '{scenario}': {len(points)} punkti x {replicas} replikas, sēkla {master_seed}.")
+    results = _map_tasks(tasks, processes)
+
+    replica_rows = []
+    summary_rows = []
+    for p, point in enumerate(points):
+        point_results = results[p * replicas:(p + 1) * replicas]
+        replica_rows.extend(dict(point, replica=r, **result) for r, result in enumerate(point_results))
+        summary = dict(point, replicas=replicas)
+        for metric in REPLICATION_METRICS[scenario]:
+            mean, low, high = confidence_interval([result[metric] for result in point_results])
+            summary.update({f"{metric}_mean": mean, f"{metric}_ci_low": low, f"{metric}_ci_high": high})
+        summary_rows.append(summary)
+    return replica_rows, summary_rows
+
+
+def confidence_interval(values, confidence=0.95):
+    # Vidējais un Stjudenta t ticamības intervāls; NaN vērtības (tukšas replikas) tiek izlaistas
+    from scipy.stats import t
+
+    values = np.asarray(values, dtype=float)
+    values = values[~np.isnan(values)]
+    if values.size == 0:
+        return float('nan'), float('nan'), float('nan')
+    mean = float(np.mean(values))
+    if values.size < 2:
+        return mean, float('nan'), float('nan')
+    half_width = float(t.ppf((1 + confidence) / 2, values.size - 1) * np.std(values, ddof=1) / np.sqrt(values.size))
+    return mean, mean - half_width, mean + half_width
+
+
+def save_table(rows, filename):
+    if not rows:
+        logging.warning("Nav rezultātu, ko saglabāt.")
+        return
+    columns = list(rows[0])
+    with open(filename, mode='w', newline='') as file:
+        writer = csv.DictWriter(file, fieldnames=columns)
+        writer.writeheader()
+        writer.writerows(rows)
+    logging.info(f"Rezultāti saglabāti failā: {filename}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parametru pārlase Zigbee uzbrukumu simulācijām (virtuālais laiks).")
+    parser.add_argument("scenario", choices=sorted(SCENARIOS))
+    parser.add_argument("--grid", action="append", default=[], metavar="NAME=V1,V2,...",
+                        help="parametra vērtības, piem. jammer_efficiency=0.5,0.8,1.0")
+    parser.add_argument("--processes", type=int, default=None, help="procesu skaits (noklusējums: CPU kodolu skaits)")
+    parser.add_argument("--output", default="sweep_results.csv")
+    parser.add_argument("--replicas", type=int, default=0,
+                        help="Monte Carlo replikas katram punktam (0 – viena palaišana bez ticamības intervāliem)")
+    parser.add_argument("--fixed", action="append", default=[], metavar="NAME=VALUE",
+                        help="parametrs ar vienu vērtību visiem punktiem, piem. duration=60")
+    parser.add_argument("--seed", type=int, default=None,
+                        help="sēkla: replikācijas režīmā – galvenā sēkla (noklusējums 0), pārlasē – visu punktu sēkla")
+    args = parser.parse_args()
+    fixed = {name: values[0] for name, values in parse_grid(args.fixed).items()}
+
+    if args.replicas > 0:
+        if 'seed' in fixed:
+            parser.error("replikācijas režīmā sēklu norāda ar --seed")
+        # Fiksētie parametri ir režģa dimensijas ar vienu vērtību
+        grid = dict(parse_grid(args.grid), **{name: [value] for name, value in fixed.items()})
+        master_seed = 0 if args.seed is None else args.seed
+        replica_rows, summary_rows = run_replicas(args.scenario, args.replicas, master_seed,
+                                                  processes=args.processes, grid=grid)
+        root, ext = os.path.splitext(args.output)
+        save_table(replica_rows, f"{root}_replicas{ext}")
+        save_table(summary_rows, args.output)
+        for row in summary_rows:
+            logging.info(", ".join(f"{key}={value:.3f}" if isinstance(value, float) else f"{key}={value}"
+                                   for key, value in row.items()))
+        return
+
+    if args.seed is not None:
+        fixed['seed'] = args.seed
+    rows = run_sweep(args.scenario, parse_grid(args.grid), processes=args.processes, fixed=fixed)
+    save_table(rows, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+import os
+import weakref
+import numpy as np
+
+# Nakagami fadinga paraugu ģenerators, kopīgs visām simulācijām un analizatoriem.
+# Vērtības tiek izlozētas lieliem blokiem ar NumPy Generator un uzreiz pārvērstas dB,
+# tāpēc vienai paketei paliek tikai nolasīšana no bufera.
+
+DEFAULT_BLOCK_SIZE = 65536
+
+_samplers = weakref.WeakSet()
+
+
+class NakagamiSampler:
+    def __init__(self, m=0.8, omega=0.3, amplitude=False, block_size=DEFAULT_BLOCK_SIZE, seed=None):
+        # amplitude=False: jaudas fadings Gamma(m, omega/m) (kā nakagami_fading analizatoros)
+        # amplitude=True: amplitūdas fadings omega*sqrt(Gamma(m, 1/m)) (kā scipy.stats.nakagami.rvs(m, scale=omega))
+        self.m = m
+        self.omega = omega
+        self.amplitude = amplitude
+        self.block_size = block_size
+        self.seeded = seed is not None
+        self.rng = np.random.default_rng(seed)
+        self._buffer = np.empty(0)
+        self._pos = 0
+        _samplers.add(self)
+
+    def _draw_block(self, size):
+        # Izlozē `size` fadinga vērtības un atgriež tās dB
+        if self.amplitude:
+            gain = self.omega * np.sqrt(self.rng.gamma(shape=self.m, scale=1.0 / self.m, size=size))
+        else:
+            gain = self.rng.gamma(shape=self.m, scale=self.omega / self.m, size=size)
+        return 10 * np.log10(gain)
+
+    def _refill(self):
+        self._buffer = self._draw_block(self.block_size)
+        self._pos = 0
+
+    def next_db(self):
+        # Viena fadinga vērtība (dB) no bufera
+        if self._pos >= len(self._buffer):
+            self._refill()
+        value = self._buffer[self._pos]
+        self._pos += 1
+        return float(value)
+
+    def gains_db(self, n):
+        # `n` fadinga vērtības (dB); bufera atlikums tiek izmantots pirms jauna bloka
+        out = np.empty(n)
+        filled = 0
+        while filled < n:
+            if self._pos >= len(self._buffer):
+                if n - filled >= self.block_size:
+                    # Lieliem pieprasījumiem izlozējam tieši, neejot caur buferi
+                    out[filled:] = self._draw_block(n - filled)
+                    return out
+                self._refill()
+            take = min(n - filled, len(self._buffer) - self._pos)
+            out[filled:filled + take] = self._buffer[self._pos:self._pos + take]
+            self._pos += take
+            filled += take
+        return out
+
+    def apply(self, rssi):
+        # Pielieto fadingu RSSI vērtībai vai masīvam: rssi + 10*log10(fadings)
+        if np.ndim(rssi) == 0:
+            return rssi + self.next_db()
+        rssi = np.asarray(rssi, dtype=float)
+        return rssi + self.gains_db(rssi.size).reshape(rssi.shape)
+
+    def reseed(self, seed=None):
+        self.rng = np.random.default_rng(seed)
+        self.seeded = seed is not None
+        self._buffer = np.empty(0)
+        self._pos = 0
+
+
+def _reseed_after_fork():
+    # Pēc fork() bērnprocess manto bufera saturu un ģeneratora stāvokli;
+    # nesēdētiem ģeneratoriem katrā procesā vajadzīga sava neatkarīga plūsma.
+    for sampler in list(_samplers):
+        if not sampler.seeded:
+            sampler.reseed()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reseed_after_fork)
@@ -1,7 +1,7 @@
 import logging
 import numpy as np
-from SoapySDR import Device, SOAPY_SDR_TX
-from killerbee import KillerBee
+from radio import AdaptiveReceiver, open_killerbee
+from log_queue import LazyHex, flush_packet_logs, packet_log
 import time
 import threading
 
@@ -15,6 +15,7 @@ AMPLITUDE = 1.0  # Amplitūda
 TX_DURATION = 3.0  # Viena bloķēšanas cikla ilgums
 GAIN = 47  # Maksimālais signāla pastiprinājums
 ZIGBEE_CHANNEL = 15
+CC2531_INTERFACE = "1:2"  # Ierīce vai uztveršanas fails atskaņošanai (*.pcap / *.pcapng)
 
 # Paketes parametri
 MIN_PACKET_LENGTH = 40
@@ -35,6 +36,7 @@ def generate_wideband_noise(sample_count, intensity):
 
 # Adaptīvā slāpēšana
 def adaptive_jamming(sdr, freq, duration, intensity):
+    from SoapySDR import SOAPY_SDR_TX  # Ielādēts tikai, kad tiek izmantots HackRF
     global potentially_jammed_packets
     try:
         sdr.setSampleRate(SOAPY_SDR_TX, 0, SAMPLE_RATE)
@@ -57,51 +59,66 @@ def adaptive_jamming(sdr, freq, duration, intensity):
         logging.error(f"Slāpēšanas kļuda: {e}")
 
 # CC2531 sniffers
-def sniff_with_cc2531():
+def sniff_with_cc2531(jam=True):
     global detected_packets, jam_event
     try:
-        kb = KillerBee(device="1:2")
+        kb = open_killerbee(CC2531_INTERFACE)
         kb.set_channel(ZIGBEE_CHANNEL)
         logging.info(f"Zigbee sniffers CC2531: {ZIGBEE_CHANNEL}.")
+        sniffed_log = packet_log(__name__, "CC2531: paketes", unit="paketes, garums")  # Kopsavilkums; atklāšana – pilnībā
+        # Bez traucēšanas (tikai atklāšana) atklātās paketes nāk bez pauzes – arī tās kopsavilkumā
+        detected_log = packet_log(__name__, "CC2531: Atklātās paketes", unit="paketes, garums", level=logging.WARNING)
 
+        receiver = AdaptiveReceiver(kb, stop=stop_event)  # Dīkstāvē gaida, nevis griežas ciklā
         while not stop_event.is_set():
-            packet = kb.pnext()
+            packet = receiver.pnext()
             if packet:
                 payload = packet.get("bytes", b"")
                 header = payload[:2]
                 packet_length = len(payload)
 
-                logging.info(f"CC2531: Paketes garums: {packet_length} baits, Galvēne: {header.hex()}")
+                sniffed_log("CC2531: Paketes garums: %d baits, Galvēne: %s", packet_length, LazyHex(header), value=packet_length)
 
                 if header in HEADERS_TO_DETECT and MIN_PACKET_LENGTH <= packet_length <= MAX_PACKET_LENGTH:
                     detected_packets += 1
-                    logging.warning(f"CC2531: Atklāts pakete ar garumu {packet_length} baits")
+                    if jam:
+                        logging.warning("CC2531: Atklāts pakete ar garumu %d baits", packet_length)
+                    else:
+                        detected_log("CC2531: Atklāts pakete ar garumu %d baits", packet_length, value=packet_length)
                     jam_event.set()
+            elif receiver.finished:
+                break  # Ieraksta beigas
     except Exception as e:
         logging.error(f"CC2531 kļuda: {e}")
     finally:
+        flush_packet_logs()
         kb.close()
         logging.info("CC2531 darbības aptūreta.")
 
 # Parvaldības elements
-def main(runtime):
+def main(runtime, jam=True):
+    # jam=False – tikai atklāšana (bez HackRF)
+    if jam:
+        from SoapySDR import Device  # Ielādēts tikai, kad tiek izmantots HackRF
     global jammed_packets, potentially_jammed_packets
     try:
-        sniff_thread = threading.Thread(target=sniff_with_cc2531)
+        sniff_thread = threading.Thread(target=sniff_with_cc2531, args=(jam,))
         sniff_thread.start()
 
         # HackRF inicializācija
-        sdr = Device(dict(driver="hackrf"))
-        logging.info(f"HackRF veiksmīgi inicializēts.")
+        if jam:
+            sdr = Device(dict(driver="hackrf"))
+            logging.info(f"HackRF veiksmīgi inicializēts.")
 
         start_time = time.time()
-        while time.time() - start_time < runtime:
+        while time.time() - start_time < runtime and sniff_thread.is_alive():
             if stop_event.is_set():
                 break
             if jam_event.is_set():
-                logging.info("HackRF: Adaptīvās bloķēšanas sākšana...")
-                adaptive_jamming(sdr, CENTER_FREQ, TX_DURATION, AMPLITUDE)
-                jammed_packets += 1
+                if jam:
+                    logging.info("HackRF: Adaptīvās bloķēšanas sākšana...")
+                    adaptive_jamming(sdr, CENTER_FREQ, TX_DURATION, AMPLITUDE)
+                    jammed_packets += 1
                 jam_event.clear()
             time.sleep(0.1)
 
@@ -110,7 +127,8 @@ def main(runtime):
 
         # Statistika
         logging.info(f"Atklāto pakešu skaits: {detected_packets}")
-        logging.info(f"Novērstu paketes skaits: {jammed_packets}")
+        if jam:  # Tikai atklāšanas režīmā nekas netiek novērsts
+            logging.info(f"Novērstu paketes skaits: {jammed_packets}")
         logging.info(f"Potenciāli bloķēto pakešu skaits: {potentially_jammed_packets}")
     except KeyboardInterrupt:
         logging.info("Programmas partrakūma process.")
@@ -1,113 +1,214 @@
+import logging
 import random
 import time
-from multiprocessing import Process, Queue, Manager, Value
+from multiprocessing import Event, Process, Queue, Value
 import numpy as np
-import matplotlib
-matplotlib.use('Agg')  # Headless režīms – grafiki tiek saglabāti uz diska
-import matplotlib.pyplot as plt
-from scipy.stats import nakagami
-import csv
-
-# Konstantes
-TROKSNIS = -95         # Troksnis (dBm)
-MAKS_SNR = 40          # Maksimālais SNR, pie kura tiek sasniegta augsta panākumu varbūtība
-C_TEORETISKA = 250     # Maksimālā teorētiskā caurlaidspēja (kbps)
-OVERHEAD = 0.4         # Papildu izmaksu daļa
-
-def calculate_capacity(rssi):
-    # Aprēķina caurlaidspēju (kbps) atkarībā no RSSI
-    snr_db = rssi - TROKSNIS
-    if snr_db < 0:
-        return 0
-    P_success = max(0.1, min(1.0, snr_db / MAKS_SNR))
-    Duty_Cycle = max(0.1, min(0.8, snr_db / MAKS_SNR))
-    return C_TEORETISKA * (1 - OVERHEAD) * P_success * Duty_Cycle
-
-def apply_nakagami(rssi, m=0.8, omega=0.3):
-    # Pielietots Nakagami sadalījums, lai iegūtu modificēto RSSI
-    nak_factor = nakagami.rvs(m, scale=omega)
-    return rssi + 10 * np.log10(nak_factor)
+from fading import NakagamiSampler
+from capacity import calculate_capacity
+from shared_buffer import SharedColumns, DEFAULT_CAPACITY
+from series_filters import countered_keep_mask
+from event_engine import EventEngine
+from rng_streams import numpy_generator, spawn_streams
+from device_population import DevicePopulation, generate_sharded
+from packets import Packet, SourceTable, make_batch
+from transport import BatchReceiver, BatchSender
+from column_store import ColumnWriter, export_csv
+from plot_render import draw_vlines, plot_series
+from log_queue import PacketLog
+
+# Pielietots Nakagami sadalījums (amplitūda, scale=omega), lai iegūtu modificēto RSSI
+FADING = NakagamiSampler(m=0.8, omega=0.3, amplitude=True)
+logger = logging.getLogger(__name__)
+
+# Avotu kodi: jammer un ierīces "DeviceN"; nosaukumi tiek atrasti tikai izdrukām un CSV
+SOURCES = SourceTable(fixed=("Jammer",), device_format="Device{}")
+JAMMER = SOURCES.code("Jammer")
+
+# Vienas saņemtās paketes ieraksts koplietojamajā kolonnu buferī (avots – vesels kods)
+PACKET_SCHEMA = [
+    ('timestamps', 'f8'),
+    ('original_rssi', 'f8'),
+    ('modified_rssi', 'f8'),
+    ('capacities', 'f8'),
+    ('sources', 'i4'),
+]
+
+def create_shared_data(capacity=DEFAULT_CAPACITY):
+    # Iepriekš izvietoti koplietojamās atmiņas buferi paketēm un novēršanas brīžiem
+    return {
+        'packets': SharedColumns(PACKET_SCHEMA, capacity),
+        'jamming_timestamps': SharedColumns([('timestamps', 'f8')], capacity),
+    }
 
 class Jammer:
     # Signāla traucēšana (jamming) paketu ģenerēšanai
-    def __init__(self, packet_queue):
+    def __init__(self, packet_queue, rng=random, fading=FADING, verbose=True):
         self.packet_queue = packet_queue
-        self.active = Value('b', True)
+        self.rng = rng
+        self.fading = fading
+        self.verbose = verbose
+        self.interval = 0.1
+        self.paused_until = Value('d', 0.0)  # Apturēts līdz šim brīdim (s no sākuma); koplietots ar AntiJammer
 
-    def jam_packets(self, duration):
-        # Ģenerē traucēšanas paketes noteiktu laika periodu
-        start_time = time.time()
-        while time.time() - start_time < duration:
-            if self.active.value:
-                rssi_val = random.uniform(-90, -70)
-                packet = {
-                    "source": "Jammer",
-                    "destination": "Broadcast",
-                    "rssi": rssi_val,
-                    "modified_rssi": apply_nakagami(rssi_val)
-                }
-                print(f"Jammer ierīce nosūta paketi: {packet}")
-                self.packet_queue.put(packet)
-                time.sleep(0.1)
-            else:
-                time.sleep(0.1)
+    def make_packet(self):
+        rssi_val = self.rng.uniform(-90, -70)
+        return Packet(JAMMER, rssi_val, self.fading.apply(rssi_val))
+
+    def jam_packets(self, duration, start_time=None):
+        # Ģenerē traucēšanas paketes noteiktu laika periodu; rindā tās tiek sūtītas pa kopām
+        sender = BatchSender(self.packet_queue, start_time)
+        sent_log = PacketLog(logger, "Jammer ierīce nosūta", unit="paketes, RSSI") if self.verbose else None
+        while sender.now() < duration:
+            if sender.now() >= self.paused_until.value:
+                packet = self.make_packet()
+                if sent_log:
+                    sent_log("Jammer ierīce nosūta paketi: %s", packet, value=packet.rssi)
+                sender.send(packet)
+            sender.sleep(self.interval)
+        sender.close()
+        if sent_log:
+            sent_log.close()
+
+    def start_virtual(self, engine, deliver):
+        # Virtuālā laika režīms: ik pēc `interval` s, ja jammer nav apturēts
+        def tick():
+            if engine.now >= self.paused_until.value:
+                deliver(self.make_packet(), engine.now)
+            engine.schedule(self.interval, tick)
+        engine.schedule(0.0, tick)
 
 class AntiJammer:
     # AntiJammer atklāšanai un novēršanai
-    def __init__(self, packet_queue, jammer, jamming_efficiency=0.8, shared_data=None):
+    def __init__(self, packet_queue, jammer, jamming_efficiency=0.8, shared_data=None, rng=random, verbose=True):
         self.packet_queue = packet_queue
         self.jammer = jammer
         self.jamming_efficiency = jamming_efficiency
+        self.rng = rng
+        self.draws = numpy_generator(rng)  # Kopu lēmumi (handle_batch) vienā izsaukumā
+        self.verbose = verbose  # Žurnalēt saņemtās jammer paketes (periodiskos kopsavilkumos)
+        self.received_log = PacketLog(logger, "AntiJammer saņem jammer", unit="paketes, RSSI")
+        self.suppression_time = 3.0
+        self.suppressed_until = 0.0  # Pašreizējās apturēšanas beigas
+        self.suppressed_total = 0.0  # Kopējais apturēšanas ilgums (pārklājumi netiek skaitīti divreiz)
+        self.store = None  # Neobligāts ColumnWriter paketēm (straumēšana uz diska monitora laikā)
         self.successful_counters = 0
         self.failed_counters = 0
         self.total_packets = 0
 
-        # Izmantojam Manager koplietojamos sarakstus
+        # Izmantojam koplietojamās atmiņas kolonnu buferus (bez Manager starpprocesa izsaukumiem)
         if shared_data is None:
-            manager = Manager()
-            self.timestamps = manager.list()
-            self.original_rssi = manager.list()
-            self.modified_rssi = manager.list()
-            self.capacities = manager.list()
-            self.sources = manager.list()
-            self.jamming_timestamps = manager.list()
-        else:
-            self.timestamps = shared_data['timestamps']
-            self.original_rssi = shared_data['original_rssi']
-            self.modified_rssi = shared_data['modified_rssi']
-            self.capacities = shared_data['capacities']
-            self.sources = shared_data['sources']
-            self.jamming_timestamps = shared_data['jamming_timestamps']
-
-    def monitor_and_counter(self, duration):
-        # Monitorē paketes un mēģina novērst traucēšanu.
-        start_time = time.time()
+            shared_data = create_shared_data()
+        self.packets = shared_data['packets']
+        self.jamming = shared_data['jamming_timestamps']
+
+    # Sērijas vecāka procesā tiek nolasītas kā NumPy skati uz koplietojamo atmiņu
+    @property
+    def timestamps(self):
+        return self.packets.view('timestamps')
+
+    @property
+    def original_rssi(self):
+        return self.packets.view('original_rssi')
+
+    @property
+    def modified_rssi(self):
+        return self.packets.view('modified_rssi')
+
+    @property
+    def capacities(self):
+        return self.packets.view('capacities')
+
+    @property
+    def sources(self):
+        return self.packets.view('sources')
+
+    @property
+    def jamming_timestamps(self):
+        return self.jamming.view('timestamps')
+
+    def suppress(self, current_time):
+        # Aptur jammer līdz current_time + suppression_time; pārklājoša apturēšana pagarina termiņu
+        end = current_time + self.suppression_time
+        self.suppressed_total += end - max(current_time, self.suppressed_until)
+        self.suppressed_until = end
+        self.jammer.paused_until.value = end
+
+    def suppressed_time(self, until=None):
+        # Kopējais apturēšanas laiks; ar `until` tiek atmesta daļa pēc simulācijas beigām
+        if until is None:
+            return self.suppressed_total
+        return self.suppressed_total - max(0.0, self.suppressed_until - until)
+
+    def handle_packet(self, packet, current_time):
+        # Reģistrē paketi un izlemj par pretpasākumu; atgriež True, ja traucēšana novērsta (jammer tiek apturēts)
+        row = (current_time, packet.rssi, packet.modified_rssi, calculate_capacity(packet.modified_rssi), packet.source)
+        self.packets.append(row)
+        if self.store is not None:
+            self.store.append([[value] for value in row])
+        self.total_packets += 1
+        if packet.source == JAMMER:
+            if self.rng.random() < self.jamming_efficiency:
+                self.successful_counters += 1
+                self.jamming.append((current_time,))
+                self.suppress(current_time)
+                return True
+            self.failed_counters += 1
+        return False
+
+    def record_batch(self, times, rssi, modified_rssi, sources):
+        # Reģistrē ierīču pakešu kopu vienā buferu rakstīšanā (ierīču paketes neizraisa pretpasākumus)
+        columns = [times, rssi, modified_rssi, calculate_capacity(modified_rssi), sources]
+        self.packets.extend(columns)
+        if self.store is not None:
+            self.store.append(columns)
+        self.total_packets += len(times)
+
+    def handle_batch(self, batch):
+        # Saņemtu pakešu kopa: visas paketes tiek ierakstītas vienā rakstīšanā ar to nosūtīšanas laikiem,
+        # lēmumi par jammer paketēm tiek pieņemti vektorizēti. Atgriež True, ja kāda traucēšana novērsta.
+        self.record_batch(batch['time'], batch['rssi'], batch['modified_rssi'], batch['source'])
+        jammed = batch[batch['source'] == JAMMER]
+        if len(jammed) == 0:
+            return False
+        if self.verbose:
+            self.received_log.add(len(jammed), jammed['rssi'])
+        countered = self.draws.random(len(jammed)) < self.jamming_efficiency
+        successful = int(np.count_nonzero(countered))
+        self.successful_counters += successful
+        self.failed_counters += len(jammed) - successful
+        self.jamming.extend([jammed['time'][countered]])
+        for countered_time in jammed['time'][countered].tolist():
+            self.suppress(countered_time)
+        return successful > 0
+
+    def monitor_and_counter(self, duration, start_time=None, timeout=0.1, output_dir=None):
+        # Monitorē paketes un mēģina novērst traucēšanu: gaida līdz `timeout` s, tad apstrādā visas gatavās paketes kā vienu kopu.
+        # Ar `output_dir` paketes tiek straumētas uz diska binārajā kolonnu formātā (.npy katrai kolonnai).
+        start_time = time.time() if start_time is None else start_time
+        receiver = BatchReceiver(self.packet_queue)
+        if output_dir is not None:
+            self.store = ColumnWriter(output_dir, PACKET_SCHEMA)
         while time.time() - start_time < duration:
-            if not self.packet_queue.empty():
-                packet = self.packet_queue.get()
-                print(f"AntiJammer saņem paketi: {packet}")
-                current_time = time.time() - start_time
-                self.timestamps.append(current_time)
-                self.original_rssi.append(packet["rssi"])
-                self.modified_rssi.append(packet["modified_rssi"])
-                self.capacities.append(calculate_capacity(packet["modified_rssi"]))
-                self.sources.append(packet.get("source", "unknown"))
-                self.total_packets += 1
-                if packet["source"] == "Jammer":
-                    if random.random() < self.jamming_efficiency:
-                        self.successful_counters += 1
-                        self.jamming_timestamps.append(current_time)
-                        print("AntiJammer: Traucēšana novērsta! Aizkavēju jammer darbību uz 3 sekundēm.")
-                        self.jammer.active.value = False
-                        time.sleep(3)
-                        self.jammer.active.value = True
-                    else:
-                        self.failed_counters += 1
-            time.sleep(0.05)
+            batch = receiver.get(timeout=timeout)
+            # Apturēšana ir termiņš, nevis gaidīšana: monitors turpina apstrādāt paketes
+            if len(batch) and self.handle_batch(batch):
+                logger.info("AntiJammer: Traucēšana novērsta! Jammer apturēts līdz %.2f s.", self.suppressed_until)
+        self.received_log.close()
+        print(f"AntiJammer: saņemtas {receiver.summary()}; pārrakstītas buferī {self.packets.overwritten}")
+        if self.store is not None:
+            self.store.labels = {'sources': SOURCES.labels(self.sources)}
+            self.store.close()
+            print(f"AntiJammer: {len(self.store)} rindas saglabātas direktorijā {self.store.directory}")
+        self.print_summary(duration)
+
+    def print_summary(self, duration=None):
         # Procentu aprēķins visiem paketes
         overall_success_percent = (self.successful_counters / self.total_packets * 100) if self.total_packets > 0 else 0
         overall_failure_percent = (self.failed_counters / self.total_packets * 100) if self.total_packets > 0 else 0
         print(f"Kopā apstrādāto paketu skaits: {self.total_packets}")
+        if self.packets.overwritten:
+            print(f"Buferis pilns: {self.packets.overwritten} vecākās paketes pārrakstītas, "
+                  f"grafiki un CSV aptver tikai pēdējās {len(self.packets)}")
         print(f"Veiksmīgi novērstie traucēšanas notikumi: {self.successful_counters} ({overall_success_percent:.2f}%)")
         print(f"Neveiksmīgi novērstie traucēšanas notikumi: {self.failed_counters} ({overall_failure_percent:.2f}%)")
         # Aprēķinam procentuālo daļu nojamto (jammed) paketu starp tikai jammer pakētēm
@@ -117,44 +218,60 @@ class AntiJammer:
         else:
             jammer_success_percent = 0
         print(f"Traucēšanas paketes veiksmīgi novērstās procentuāli (tikai Jammer): {jammer_success_percent:.2f}%")
+        print(f"Jammer kopā apturēts: {self.suppressed_time(duration):.2f} s")
+
+    def summary(self, duration=None):
+        # Viena palaišanas kopsavilkums parametru pārlasei: skaiti, vidējās un atjaunotās vērtības
+        keep = countered_keep_mask(self.timestamps, self.sources, self.jamming_timestamps, 0.01, JAMMER)
+        original = self.original_rssi
+        capacities = self.capacities
+        detected = self.successful_counters + self.failed_counters
+        return {
+            'packets': len(self.packets),
+            'overwritten': self.packets.overwritten,
+            'detected': detected,
+            'jammed': self.successful_counters,
+            'jammed_pct': self.successful_counters / detected * 100 if detected else 0.0,
+            'mean_rssi': float(np.mean(original)) if len(original) else float('nan'),
+            'recovered_rssi': float(np.mean(original[keep])) if keep.any() else float('nan'),
+            'mean_capacity': float(np.mean(capacities)) if len(capacities) else float('nan'),
+            'recovered_capacity': float(np.mean(capacities[keep])) if keep.any() else float('nan'),
+            'suppressed_time': self.suppressed_time(duration),
+        }
 
     def plot_results(self, output_prefix="results"):
+        import matplotlib  # Ielādēts tikai, kad tiek zīmēti grafiki
+        matplotlib.use('Agg')  # Headless režīms – grafiki tiek saglabāti uz diska
+        import matplotlib.pyplot as plt
         # Veido grafikus ar matplotlib 
-        if not self.timestamps:
+        if len(self.packets) == 0:
             print("Nav datu, lai zīmētu grafikus.")
             return
 
-        def filter_jammer(ts, values, srcs, jamming_ts, tolerance=0.01, jammer_source="Jammer"):
-            filt_ts = []
-            filt_vals = []
-            for t, v, src in zip(ts, values, srcs):
-                remove = False
-                if src == jammer_source:
-                    for jt in jamming_ts:
-                        if abs(t - jt) < tolerance:
-                            remove = True
-                            break
-                if not remove:
-                    filt_ts.append(t)
-                    filt_vals.append(v)
-            return filt_ts, filt_vals
+        # Jammer paketes, kas sakrīt ar novēršanas brīdi (pielaide 0.01 s), tiek izslēgtas; masks kopīgs visām sērijām
+        keep = countered_keep_mask(self.timestamps, self.sources, self.jamming_timestamps, 0.01, JAMMER)
+
+        def filter_jammer(ts, values):
+            n = len(keep)
+            return np.asarray(ts[:n])[keep].tolist(), np.asarray(values[:n])[keep].tolist()
 
         # --- RSSI grafiks ---
+        # Līknes tiek samazinātas līdz asu platumam pikseļos, pretpasākumu brīži – viena līniju kolekcija
         plt.figure(figsize=(10, 6))
-        plt.plot(self.timestamps, self.original_rssi, 'b.-', label='Oriģinālais RSSI (visi paketes)')
-        plt.plot(self.timestamps, self.modified_rssi, 'g.-', label='Modificētais RSSI (visi paketes)')
+        ax = plt.gca()
+        plot_series(ax, self.timestamps, self.original_rssi, 'b.-', label='Oriģinālais RSSI (visi paketes)')
+        plot_series(ax, self.timestamps, self.modified_rssi, 'g.-', label='Modificētais RSSI (visi paketes)')
         avg_ori_all = np.mean(self.original_rssi)
         avg_mod_all = np.mean(self.modified_rssi)
         plt.axhline(avg_ori_all, color='blue', linestyle='dotted', label=f"Vidējais oriģinālais RSSI ({avg_ori_all:.2f})")
         plt.axhline(avg_mod_all, color='green', linestyle='dotted', label=f"Vidējais modificētais RSSI ({avg_mod_all:.2f})")
-        filt_ts_ori, filt_ori = filter_jammer(self.timestamps, self.original_rssi, self.sources, self.jamming_timestamps)
-        filt_ts_mod, filt_mod = filter_jammer(self.timestamps, self.modified_rssi, self.sources, self.jamming_timestamps)
+        filt_ts_ori, filt_ori = filter_jammer(self.timestamps, self.original_rssi)
+        filt_ts_mod, filt_mod = filter_jammer(self.timestamps, self.modified_rssi)
         avg_ori_filt = np.mean(filt_ori) if filt_ori else float('nan')
         avg_mod_filt = np.mean(filt_mod) if filt_mod else float('nan')
         plt.axhline(avg_ori_filt, color='blue', linestyle='dashdot', label=f"Atjaunotais oriģinālais RSSI ({avg_ori_filt:.2f})")
         plt.axhline(avg_mod_filt, color='green', linestyle='dashdot', label=f"Atjaunotais modificētais RSSI ({avg_mod_filt:.2f})")
-        for jt in self.jamming_timestamps:
-            plt.axvline(jt, color='red', linestyle='--')
+        draw_vlines(ax, self.jamming_timestamps, color='red', linestyle='--')
         plt.title("RSSI laika gaitā")
         plt.xlabel("Laiks (s)")
         plt.ylabel("RSSI (dBm)")
@@ -165,23 +282,23 @@ class AntiJammer:
         plt.close()
 
         # --- Caurlaidspējas grafiks ---
-        capacities_real = [calculate_capacity(x) for x in self.original_rssi]
+        capacities_real = calculate_capacity(np.asarray(self.original_rssi, dtype=float)).tolist()
         avg_cap_mod_all = np.mean(self.capacities)
         avg_cap_real_all = np.mean(capacities_real)
-        _, filt_cap_mod = filter_jammer(self.timestamps, self.capacities, self.sources, self.jamming_timestamps)
-        _, filt_cap_real = filter_jammer(self.timestamps, capacities_real, self.sources, self.jamming_timestamps)
+        _, filt_cap_mod = filter_jammer(self.timestamps, self.capacities)
+        _, filt_cap_real = filter_jammer(self.timestamps, capacities_real)
         avg_cap_mod_filt = np.mean(filt_cap_mod) if filt_cap_mod else float('nan')
         avg_cap_real_filt = np.mean(filt_cap_real) if filt_cap_real else float('nan')
 
         plt.figure(figsize=(10, 6))
-        plt.plot(self.timestamps, self.capacities, 'm.-', label='Modificētā caurlaidspēja (visi paketes)')
+        ax = plt.gca()
+        plot_series(ax, self.timestamps, self.capacities, 'm.-', label='Modificētā caurlaidspēja (visi paketes)')
         plt.axhline(avg_cap_mod_all, color='magenta', linestyle='dotted', label=f"Vidējā modificētā caurlaidspēja ({avg_cap_mod_all:.2f})")
         plt.axhline(avg_cap_mod_filt, color='black', linestyle='dashdot', label=f"Atjaunotā modificētā caurlaidspēja ({avg_cap_mod_filt:.2f})")
-        plt.plot(self.timestamps, capacities_real, 'c.-', label='Reālā caurlaidspēja (visi paketes)')
+        plot_series(ax, self.timestamps, capacities_real, 'c.-', label='Reālā caurlaidspēja (visi paketes)')
         plt.axhline(avg_cap_real_all, color='cyan', linestyle='dotted', label=f"Vidējā reālā caurlaidspēja ({avg_cap_real_all:.2f})")
         plt.axhline(avg_cap_real_filt, color='orange', linestyle='dashdot', label=f"Atjaunotā reālā caurlaidspēja ({avg_cap_real_filt:.2f})")
-        for jt in self.jamming_timestamps:
-            plt.axvline(jt, color='red', linestyle='--')
+        draw_vlines(ax, self.jamming_timestamps, color='red', linestyle='--')
         plt.title("Caurlaidspējas laika gaitā")
         plt.xlabel("Laiks (s)")
         plt.ylabel("Caurlaidspēja (kbps)")
@@ -196,70 +313,99 @@ class AntiJammer:
         Saglabā datus CSV failā nākotnes trendline analīzei.
         Kolonnas: Laiks (s), Oriģinālais RSSI, Modificētais RSSI, Caurlaidspēja (kbps), Avots.
         """
-        with open(output_filename, mode='w', newline='') as csvfile:
-            writer = csv.writer(csvfile)
-            writer.writerow(["Laiks (s)", "Oriģinālais RSSI", "Modificētais RSSI", "Caurlaidspēja (kbps)", "Avots"])
-            for t, r, mr, cap, src in zip(self.timestamps, self.original_rssi, self.modified_rssi, self.capacities, self.sources):
-                writer.writerow([t, r, mr, cap, src])
-
-class SimulatedDevice:
-    # Klase ierīces ZigBee paketes ģenerēšanai
-    def __init__(self, device_id, packet_queue):
-        self.device_id = device_id
-        self.packet_queue = packet_queue
+        export_csv(output_filename,
+                   ["Laiks (s)", "Oriģinālais RSSI", "Modificētais RSSI", "Caurlaidspēja (kbps)", "Avots"],
+                   [self.timestamps, self.original_rssi, self.modified_rssi, self.capacities, SOURCES.names(self.sources)])
 
-    def generate_packet(self):
-        # Izveidots pakets ar normālu RSSI
-        rssi = random.uniform(-50, -30)
-        modified_rssi = apply_nakagami(rssi)
-        packet = {
-            "source": self.device_id,
-            "destination": "Broadcast",
-            "rssi": rssi,
-            "modified_rssi": modified_rssi,
-        }
-        print(f"Ierīce {self.device_id} nosūta paketi: {packet}")
-        self.packet_queue.put(packet)
+def create_device_population(num_devices, seed=None):
+    # Ierīces ar normālu RSSI (-50..-30 dBm), katra sūta ik pēc 1..3 s
+    return DevicePopulation(np.arange(1, num_devices + 1), rssi_range=(-50, -30), interval=(1, 3),
+                            seed=seed, name_format="Device{}")
 
-    def run(self, duration):
-        # Ģenerē paketes noteiktu laika periodu
-        start_time = time.time()
-        while time.time() - start_time < duration:
-            self.generate_packet()
-            time.sleep(random.uniform(1, 3))
+def run_device_population(population, packet_queue, stop_event, start_time, fading=FADING, verbose=True):
+    # Viens process visai ierīču populācijai (vai tās daļai) procesa-katrai-ierīcei vietā.
+    # Izdotās kopas tiek uzkrātas un nosūtītas rindā pa kopām (BatchSender).
+    sender = BatchSender(packet_queue, start_time)
+    sent_log = PacketLog(logger, "Ierīces nosūta", unit="paketes, RSSI")
+
+    def emit_batch(times, ids, rssi):
+        modified = fading.apply(rssi)
+        sender.send_batch(make_batch(times, SOURCES.device_codes(ids), rssi, modified))
+        if verbose:
+            sent_log.add(len(times), rssi)
+    population.run_realtime(stop_event, start_time, emit_batch, max_sleep=sender.max_age, idle=sender.poll)
+    sender.close()
+    sent_log.close()
+
+def simulate_virtual(duration, num_devices, jamming_efficiency=0.8, seed=None, shards=1):
+    # Virtuālā laika simulācija ar notikumu dzinēju: tās pašas ierīces, jammer un AntiJammer bez procesiem.
+    # Veiksmīgs pretpasākums aptur jammer uz `suppression_time` sekundēm simulētajā laikā.
+    # Ierīces ir viena masīvu populācija, kas tiek reģistrēta paketēs (ar shards > 1 – ģenerēta paralēli).
+    rng, numpy_seed = spawn_streams(seed)
+    fading_seed, population_seed = numpy_seed.spawn(2)
+    fading = NakagamiSampler(m=0.8, omega=0.3, amplitude=True, seed=fading_seed)
+    engine = EventEngine()
+    # Buferu izmērs pēc paredzamā pakešu skaita (ierīces ≤ 1 pakete/s, jammer 10 paketes/s)
+    capacity = int(duration * (num_devices + 10)) + 1024
+    jammer = Jammer(None, rng=rng, fading=fading, verbose=False)
+    antijammer = AntiJammer(None, jammer, jamming_efficiency, shared_data=create_shared_data(capacity), rng=rng)
 
-def main():
+    def deliver(packet, current_time):
+        antijammer.handle_packet(packet, current_time)
+
+    def deliver_batch(times, ids, rssi):
+        antijammer.record_batch(times, rssi, fading.apply(rssi), SOURCES.device_codes(ids))
+
+    population = create_device_population(num_devices, seed=population_seed)
+    if shards > 1:
+        deliver_batch(*generate_sharded(population, duration, shards))
+    else:
+        population.start_virtual(engine, deliver_batch, until=duration)
+    jammer.start_virtual(engine, deliver)
+    engine.run(until=duration)
+    return antijammer
+
+def run_scenario(duration=120, num_devices=10, jamming_efficiency=0.8, seed=None, shards=1):
+    # Viens virtuālā laika scenārijs bez grafikiem; atgriež kopsavilkumu
+    antijammer = simulate_virtual(duration, num_devices, jamming_efficiency, seed, shards)
+    result = antijammer.summary(duration)
+    antijammer.packets.close()
+    antijammer.jamming.close()
+    return result
+
+def main(duration=None, num_devices=None, plot=True):
+    logging.basicConfig(level=logging.INFO, format="%(message)s")  # Bez efekta, ja žurnāls jau konfigurēts (piem. CLI)
+    # Parametri, kas nav norādīti (piem. no CLI), tiek pieprasīti interaktīvi
     try:
-        duration = int(input("Ievadi simulācijas ilgumu sekundēs: "))
-        num_devices = int(input("Ievadi ierīču skaitu tīklā: "))
+        if duration is None:
+            duration = int(input("Ievadi simulācijas ilgumu sekundēs: "))
+        if num_devices is None:
+            num_devices = int(input("Ievadi ierīču skaitu tīklā: "))
     except Exception as e:
         print(f"Kļūda ievadē: {e}")
         return
 
     packet_queue = Queue()
+    device_shards = 1  # Procesu skaits ierīču populācijai (tūkstošiem ierīču var izmantot vairāk)
+    stop_event = Event()
+    start_time = time.time()
 
-    # Izveido simulācijas ierīču procesus
+    # Ierīču populācija: viens process uz daļu (shard), nevis viens process uz ierīci
+    population = create_device_population(num_devices)
     device_processes = [
-        Process(target=SimulatedDevice(f"Device{i}", packet_queue).run, args=(duration,))
-        for i in range(1, num_devices + 1)
+        Process(target=run_device_population, args=(shard, packet_queue, stop_event, start_time))
+        for shard in population.shard(device_shards)
     ]
 
     jammer = Jammer(packet_queue)
-    jammer_process = Process(target=jammer.jam_packets, args=(duration,))
-
-    # Izveidojam Manager, lai koplietotu datus starp procesiem
-    manager = Manager()
-    shared_data = {
-        'timestamps': manager.list(),
-        'original_rssi': manager.list(),
-        'modified_rssi': manager.list(),
-        'capacities': manager.list(),
-        'sources': manager.list(),
-        'jamming_timestamps': manager.list()
-    }
+    jammer_process = Process(target=jammer.jam_packets, args=(duration, start_time))
+
+    # Koplietojamās atmiņas buferi datu apmaiņai starp procesiem
+    shared_data = create_shared_data()
 
     antijammer = AntiJammer(packet_queue, jammer, jamming_efficiency=0.8, shared_data=shared_data)
-    antijammer_process = Process(target=antijammer.monitor_and_counter, args=(duration,))
+    antijammer_process = Process(target=antijammer.monitor_and_counter, args=(duration, start_time),
+                                 kwargs={'output_dir': "sim_results_data"})
 
     try:
         for p in device_processes:
@@ -267,15 +413,25 @@ def main():
         jammer_process.start()
         antijammer_process.start()
 
-        for p in device_processes:
-            p.join()
-        jammer_process.join()
         antijammer_process.join()
+        stop_event.set()
+        # Ražotāji beigās izsūta atlikušās kopas; rinda tiek iztukšota, lai tie varētu beigt darbu
+        leftover = BatchReceiver(packet_queue)
+        producers = device_processes + [jammer_process]
+        while any(p.is_alive() for p in producers):
+            leftover.get(timeout=0.1)
+        for p in producers:
+            p.join()
 
-        antijammer.plot_results(output_prefix="sim_results")
+        if plot:
+            antijammer.plot_results(output_prefix="sim_results")
         antijammer.save_csv(output_filename="sim_results_data.csv")
     except Exception as e:
         print(f"Kļūda simulācijas laikā: {e}")
+    finally:
+        stop_event.set()
+        for buffer in shared_data.values():
+            buffer.close()
 
     print("Simulācija pabeigta. Grafiki saglabāti, dati saglabāti CSV failā.")
 
@@ -0,0 +1,162 @@
+import atexit
+import copy
+import logging
+import logging.handlers
+import os
+import time
+
+# Žurnālēšana ārpus karstajiem cikliem.
+# 1) Rindas režīms: ieraksti tiek nodoti rindā (QueueHandler), bet formatēšana un izvade konsolē notiek
+#    fona klausītājā (QueueListener). Procesa iekšējai rindai ziņojums netiek formatēts vispār;
+#    starpprocesu rindai (multiprocessing.Queue) tiek aprēķināts tikai msg % args, jo ieraksts jāserializē.
+# 2) Per-packet ziņojumi (PacketLog): katrs izsaukums tikai palielina skaitītājus; ik `interval` s tiek
+#    izvadīts viens kopsavilkums (skaits, ātrums, vērtību vid./min/max). Ar `sample` > 0 katrs `sample`-ais
+#    ziņojums tiek izvadīts pilnībā. Retie notikumi (atklāšana, kļūdas) tiek žurnalēti parasti un pilnībā.
+
+LOG_FORMAT = "%(asctime)s - %(levelname)s - %(message)s"
+SUMMARY_INTERVAL = 1.0  # Per-packet kopsavilkumu intervāls sekundēs
+SAMPLE_EVERY = 0        # Katrs N-tais per-packet ziņojums pilnībā (0 – tikai kopsavilkumi)
+
+
+class LazyQueueHandler(logging.handlers.QueueHandler):
+    def __init__(self, queue, local=False):
+        super().__init__(queue)
+        self.local = local
+
+    def prepare(self, record):
+        if self.local:
+            return record
+        if record.exc_info:
+            return super().prepare(record)
+        # Starpprocesu rindai: tikai ziņojuma teksts, bez laika/līmeņa formatēšanas
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+def start_queue_logging(level=logging.INFO, fmt=LOG_FORMAT, processes=True):
+    # Pārslēdz saknes žurnālu uz rindas režīmu; ar processes=True rindā var rakstīt arī bērnprocesi (fork)
+    if processes:
+        import multiprocessing
+        log_queue = multiprocessing.Queue(-1)
+    else:
+        import queue
+        log_queue = queue.SimpleQueue()
+    output = logging.StreamHandler()
+    output.setFormatter(logging.Formatter(fmt))
+    listener = logging.handlers.QueueListener(log_queue, output, respect_handler_level=True)
+    listener.start()
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(LazyQueueHandler(log_queue, local=not processes))
+    root.setLevel(level)
+    atexit.register(listener.stop)
+    return listener
+
+
+def configure_packet_log(interval=None, sample=None):
+    # Noklusējumi jaunajiem PacketLog (piem. no CLI); bērnprocesi tos manto
+    global SUMMARY_INTERVAL, SAMPLE_EVERY
+    if interval is not None:
+        SUMMARY_INTERVAL = interval
+    if sample is not None:
+        SAMPLE_EVERY = sample
+
+
+class PacketLog:
+    def __init__(self, logger, label, interval=None, sample=None, level=logging.INFO, unit="paketes"):
+        self.logger = logger if isinstance(logger, logging.Logger) else logging.getLogger(logger)
+        self.label = label
+        self.interval = SUMMARY_INTERVAL if interval is None else interval
+        self.sample = SAMPLE_EVERY if sample is None else sample
+        self.level = level
+        self.unit = unit
+        self.total = 0
+        self._reset(time.monotonic())
+
+    def _reset(self, now):
+        self.count = 0
+        self.values = 0
+        self.value_sum = 0.0
+        self.value_min = float('inf')
+        self.value_max = float('-inf')
+        self.started = now
+        self._next = now + self.interval
+
+    def __call__(self, msg=None, *args, value=None):
+        # Viena pakete; `msg % args` tiek formatēts tikai izlasei
+        self.count += 1
+        self.total += 1
+        if value is not None:
+            self.values += 1
+            self.value_sum += value
+            self.value_min = min(self.value_min, value)
+            self.value_max = max(self.value_max, value)
+        if self.sample and msg is not None and self.total % self.sample == 0:
+            self.logger.log(self.level, msg, *args)
+        now = time.monotonic()
+        if now >= self._next:
+            self.flush(now)
+
+    def add(self, n, values=None):
+        # Pakešu kopa; `values` – neobligāts NumPy vērtību masīvs (piem. RSSI) kopsavilkumam
+        if n == 0:
+            return
+        self.count += n
+        self.total += n
+        if values is not None and len(values):
+            self.values += len(values)
+            self.value_sum += float(values.sum())
+            self.value_min = min(self.value_min, float(values.min()))
+            self.value_max = max(self.value_max, float(values.max()))
+        now = time.monotonic()
+        if now >= self._next:
+            self.flush(now)
+
+    def flush(self, now=None):
+        now = time.monotonic() if now is None else now
+        if self.count and self.logger.isEnabledFor(self.level):
+            elapsed = max(now - self.started, 1e-9)
+            if self.values:
+                self.logger.log(self.level, "%s: %d %s %.1f s laikā (%.1f/s), vid. %.2f [%.2f; %.2f]",
+                                self.label, self.count, self.unit, elapsed, self.count / elapsed,
+                                self.value_sum / self.values, self.value_min, self.value_max)
+            else:
+                self.logger.log(self.level, "%s: %d %s %.1f s laikā (%.1f/s)",
+                                self.label, self.count, self.unit, elapsed, self.count / elapsed)
+        self._reset(now)
+
+    def close(self):
+        self.flush()
+
+
+_packet_logs = {}
+
+
+def packet_log(logger, label, **kwargs):
+    # Kopīgs PacketLog pēc (žurnāls, nosaukums) šajā procesā, piem. visām ierīcēm vai visam sniffera ciklam
+    key = (os.getpid(), logger, label)
+    if key not in _packet_logs:
+        _packet_logs[key] = PacketLog(logger, label, **kwargs)
+    return _packet_logs[key]
+
+
+def flush_packet_logs():
+    # Izvada šī procesa PacketLog atlikušos kopsavilkumus (piem. cikla beigās)
+    pid = os.getpid()
+    for key, log in _packet_logs.items():
+        if key[0] == pid:
+            log.flush()
+
+
+class LazyHex:
+    # Baiti kā heksadecimāls teksts tikai tad, kad ziņojums tiešām tiek formatēts
+    __slots__ = ('data',)
+
+    def __init__(self, data):
+        self.data = data
+
+    def __str__(self):
+        return self.data.hex()
@@ -1,98 +1,152 @@
+import logging
 import random
 import time
+from queue import Queue
 import numpy as np
-import matplotlib.pyplot as plt
-from scipy.stats import nakagami
-from queue import Queue, Empty
-import csv
-
-# Konstantes
-TROKSNIS = -95         # Troksnis (dBm)
-MAKS_SNR = 40          # Maksimālais SNR, pie kura sasniedzama augsta panākumu varbūtība
-C_TEORETISKA = 250     # Maksimālā teorētiskā caurlaidspēja (kbps)
-OVERHEAD = 0.4         # Papildu izmaksu daļa
-
-def calculate_capacity(rssi):
-    # Aprēķina caurlaidspēju (kbps) atkarībā no RSSI
-    snr_db = rssi - TROKSNIS
-    if snr_db < 0:
-        return 0
-    P_success = max(0.1, min(1.0, snr_db / MAKS_SNR))
-    Duty_Cycle = max(0.1, min(0.8, snr_db / MAKS_SNR))
-    capacity = C_TEORETISKA * (1 - OVERHEAD) * P_success * Duty_Cycle
-    return capacity
-
-def apply_fading(rssi, m=0.8, omega=0.3):
-    
-    ## Piemēro Nakagami sadalījumu RSSI vērtībai
-   
-    fading_factor = nakagami.rvs(m, scale=omega)
-    return rssi + 10 * np.log10(fading_factor)
+from fading import NakagamiSampler
+from capacity import calculate_capacity
+from series_filters import countered_keep_mask
+from event_engine import EventEngine
+from rng_streams import numpy_generator, spawn_streams
+from packets import PACKET_DTYPE, Packet, SourceTable, make_batch, packets_to_batch
+from transport import BatchReceiver, BatchSender
+from column_store import ColumnWriter, export_csv
+from plot_render import draw_vlines, plot_series
+from log_queue import PacketLog, flush_packet_logs, packet_log
+
+## Piemēro Nakagami sadalījumu RSSI vērtībai (amplitūda, scale=omega)
+FADING = NakagamiSampler(m=0.8, omega=0.3, amplitude=True)
+logger = logging.getLogger(__name__)
+
+# Avotu kodi: injektors un ierīces "IerīceN"; nosaukumi tiek atrasti tikai izdrukām un CSV
+SOURCES = SourceTable(fixed=("Injector",), device_format="Ierīce{}")
+INJECTOR = SOURCES.code("Injector")
 
 class PacketInjector:
-    # Klase pakešu injekcijai ar zemu RSSI (injektors)
-    def __init__(self, packet_queue):
-        self.packet_queue = packet_queue
+    # Klase pakešu injekcijai ar zemu RSSI (injektors); paketes tiek sūtītas caur BatchSender
+    def __init__(self, sender, rng=random, fading=FADING, verbose=True):
+        self.sender = sender
+        self.rng = rng
+        self.fading = fading
+        self.verbose = verbose
 
     def inject_packet(self):
-        rssi = random.uniform(-90, -85)
-        modified_rssi = apply_fading(rssi)
-        packet = {
-            "source": "Injector",
-            "destination": "Broadcast",
-            "rssi": rssi,
-            "modified_rssi": modified_rssi,
-        }
-        self.packet_queue.put(packet)
-        print(f"Ievietota pakete (Injector) ar RSSI {rssi:.2f} (modificēts: {modified_rssi:.2f})")
+        rssi = self.rng.uniform(-90, -85)
+        modified_rssi = self.fading.apply(rssi)
+        self.sender.send(Packet(INJECTOR, rssi, modified_rssi))
+        if self.verbose:
+            packet_log(logger, "Injector ievieto", unit="paketes, RSSI")(
+                "Ievietota pakete (Injector) ar RSSI %.2f (modificēts: %.2f)", rssi, modified_rssi, value=rssi)
 
 class NetworkDevice:
-    # Klase haotiski strādājošām ierīcēm
-    def __init__(self, device_id, packet_queue):
+    # Klase haotiski strādājošām ierīcēm; paketes tiek sūtītas caur BatchSender
+    def __init__(self, device_id, sender, rng=random, fading=FADING, verbose=True):
         self.device_id = device_id
-        self.packet_queue = packet_queue
+        self.source = SOURCES.code(device_id)
+        self.sender = sender
+        self.rng = rng
+        self.fading = fading
+        self.verbose = verbose
 
     def send_packet(self):
-        rssi = random.uniform(-50, -30)
-        modified_rssi = apply_fading(rssi)
-        packet = {
-            "source": self.device_id,
-            "destination": "Broadcast",
-            "rssi": rssi,
-            "modified_rssi": modified_rssi,
-        }
-        self.packet_queue.put(packet)
-        print(f"{self.device_id} nosūtīja paketi ar RSSI {rssi:.2f} (modificēts: {modified_rssi:.2f})")
+        rssi = self.rng.uniform(-50, -30)
+        modified_rssi = self.fading.apply(rssi)
+        self.sender.send(Packet(self.source, rssi, modified_rssi))
+        if self.verbose:
+            # Visām ierīcēm viens kopīgs kopsavilkums
+            packet_log(logger, "Ierīces nosūta", unit="paketes, RSSI")(
+                "%s nosūtīja paketi ar RSSI %.2f (modificēts: %.2f)", self.device_id, rssi, modified_rssi, value=rssi)
+
+class TickBatchGenerator:
+    # Viena takta visas paketes (injektors + visas ierīces) kā viena kopa: RSSI un fading tiek ģenerēti vektorizēti
+    def __init__(self, device_ids, rng=None, fading=FADING, injector_range=(-90, -85), device_range=(-50, -30)):
+        self.sources = np.array([INJECTOR] + [SOURCES.code(device_id) for device_id in device_ids], dtype=np.int32)
+        self.low = np.array([injector_range[0]] + [device_range[0]] * len(device_ids), dtype=float)
+        self.high = np.array([injector_range[1]] + [device_range[1]] * len(device_ids), dtype=float)
+        self.rng = np.random.default_rng(rng)
+        self.fading = fading
+
+    def __len__(self):
+        return len(self.sources)
+
+    def generate(self):
+        rssi = self.rng.uniform(self.low, self.high)
+        return make_batch(0.0, self.sources, rssi, self.fading.apply(rssi))
 
 class InjectionHandler:
     
     # Klase injekciju atklāšanai un novēršanai.
     # Saglabā oriģinālās un modificētās RSSI vērtības, kā arī aprēķināto caurlaidspēju.
     # Reģistrē arī jamming notikumus, kad injektora paketes tiek noņemtas.
+    # Paketes tiek glabātas kā strukturētu masīvu kopas (PACKET_DTYPE), nevis objekts katrai vērtībai.
     
-    def __init__(self, jamming_efficiency=0.9):
+    def __init__(self, jamming_efficiency=0.9, rng=random, verbose=True, store=None):
+        self.draws = numpy_generator(rng)  # Lēmumi par visu kopu vienā izsaukumā
+        self.verbose = verbose
+        self.removed_log = PacketLog(logger, "Noņemtas injicētās", unit="paketes, RSSI")
+        self.store = store                  # Neobligāts ColumnWriter: kopas tiek straumētas uz diska
         self.total_injected = 0
         self.removed_injected = 0
-        self.rssi_values = []               # Oriģinālie RSSI
-        self.modified_rssi_values = []       # Modificētie RSSI
-        self.capacities = []                # Caurlaidspēja (aprēķināta no modificētā RSSI)
-        self.sources = []                   # Katras paketes avots
-        self.jamming_timestamps = []        # Laiki, kad tika veikta novēršana
+        self.total_packets = 0              # Visas apstrādātās paketes (arī ierīču)
+        self._chunks = []                   # Apstrādātās pakešu kopas; laiks – nosūtīšanas vai takta brīdis
+        self.jamming_timestamps = []        # Noņemto injektora pakešu laiki
         self.jamming_efficiency = jamming_efficiency
 
+    @property
+    def records(self):
+        # Visas paketes vienā masīvā; kopas tiek apvienotas tikai nolasot
+        if len(self._chunks) != 1:
+            self._chunks = [np.concatenate(self._chunks) if self._chunks else np.empty(0, dtype=PACKET_DTYPE)]
+        return self._chunks[0]
+
+    @property
+    def timestamps(self):
+        return self.records['time']
+
+    @property
+    def rssi_values(self):
+        return self.records['rssi']            # Oriģinālie RSSI
+
+    @property
+    def modified_rssi_values(self):
+        return self.records['modified_rssi']   # Modificētie RSSI
+
+    @property
+    def capacities(self):
+        return calculate_capacity(self.modified_rssi_values)  # Caurlaidspēja (no modificētā RSSI)
+
+    @property
+    def sources(self):
+        return self.records['source']          # Katras paketes avota kods
+
     def handle_packet(self, packet, current_time):
-        rssi = packet.get("rssi", 0)
-        modified_rssi = packet.get("modified_rssi", rssi)
-        self.rssi_values.append(rssi)
-        self.modified_rssi_values.append(modified_rssi)
-        self.capacities.append(calculate_capacity(modified_rssi))
-        self.sources.append(packet.get("source", "unknown"))
-        if packet.get("source") == "Injector":
-            self.total_injected += 1
-            if random.random() < self.jamming_efficiency:
-                self.removed_injected += 1
-                self.jamming_timestamps.append(current_time)
-                print(f"Noņemta injicētā pakete ar RSSI {rssi:.2f} (modificēts: {modified_rssi:.2f})")
+        self.handle_packets(packets_to_batch([packet]), current_time)
+
+    def handle_packets(self, batch, current_time=None):
+        # Apstrādā visu takta pakešu kopu (PACKET_DTYPE masīvu): lēmumi par injektora paketēm tiek pieņemti
+        # vektorizēti. Ar `current_time` visām paketēm tiek iestatīts šis laiks (kopijā – izsaucēja masīvs
+        # netiek mainīts), citādi saglabājas ierakstu laiki. Atgriež apstrādāto pakešu skaitu.
+        n = len(batch)
+        if n == 0:
+            return 0
+        if current_time is not None:
+            batch = batch.copy()
+            batch['time'] = current_time
+        self._chunks.append(batch)
+        if self.store is not None:
+            self.store.append_records(batch)
+        self.total_packets += n
+        rssi = batch['rssi']
+
+        injected = np.flatnonzero(batch['source'] == INJECTOR)
+        if injected.size:
+            removed = injected[self.draws.random(injected.size) < self.jamming_efficiency]
+            self.total_injected += int(injected.size)
+            self.removed_injected += int(removed.size)
+            self.jamming_timestamps.extend(batch['time'][removed].tolist())
+            if self.verbose:
+                self.removed_log.add(int(removed.size), rssi[removed])
+        return n
 
     def get_results(self):
         percentage_removed = (self.removed_injected / self.total_injected * 100
@@ -103,57 +157,46 @@ class InjectionHandler:
             "percentage_removed": percentage_removed
         }
 
-def filter_injected_packets(timestamps, values, sources, jamming_timestamps, tolerance=0.001, inj_source="Injector"):
+def filter_injected_packets(timestamps, values, sources, jamming_timestamps, tolerance=0.001, inj_source=INJECTOR, keep=None):
     
     # Filtrē datus: ja paketes avots ir "Injector" un tās laiks sakrīt ar kādu no gaismošanas notikumiem (ar nelielu toleranci),
-    # tad šādas vērtības tiek izņemtas.
-
-    filt_t = []
-    filt_v = []
-    for t, v, src in zip(timestamps, values, sources):
-        remove = False
-        if src == inj_source:
-            for jt in jamming_timestamps:
-                if abs(t - jt) < tolerance:
-                    remove = True
-                    break
-        if not remove:
-            filt_t.append(t)
-            filt_v.append(v)
-    return filt_t, filt_v
+    # tad šādas vērtības tiek izņemtas. Iepriekš aprēķinātu masku `keep` var atkārtoti izmantot citām sērijām.
+
+    if keep is None:
+        keep = countered_keep_mask(timestamps, sources, jamming_timestamps, tolerance, inj_source)
+    n = len(keep)
+    return np.asarray(timestamps[:n])[keep].tolist(), np.asarray(values[:n])[keep].tolist()
 
 def plot_results(timestamps, rssi_values, modified_rssi_values, capacities_mod, sources, jamming_timestamps, output_prefix):
+    import matplotlib.pyplot as plt  # Ielādēts tikai, kad tiek zīmēti grafiki
     
     # Izveido grafikus:
      # 1. RSSI laika gaitā: attēlo oriģinālo un modificēto RSSI ar vidējām vērtībām (visi un atjaunotie).
      # 2. Caurlaidspējas laika gaitā: attēlo gan modificēto caurlaidspēju, gan reālo caurlaidspēju (aprēķinātu no oriģinālā RSSI),
      #    ar vidējām vērtībām (visi un atjaunotie).
     
-    if not timestamps:
+    if len(timestamps) == 0:
         print("Nav datu, lai zīmētu grafikus.")
         return
 
     # RSSI grafiks
+    # Līknes tiek samazinātas līdz asu platumam pikseļos, pretpasākumu brīži – viena līniju kolekcija
     plt.figure(figsize=(10, 6))
-    plt.plot(timestamps, rssi_values, 'b.-', label='Oriģinālais RSSI (visi paketes)')
-    plt.plot(timestamps, modified_rssi_values, 'g.-', label='Modificētais RSSI (visi paketes)')
+    ax = plt.gca()
+    plot_series(ax, timestamps, rssi_values, 'b.-', label='Oriģinālais RSSI (visi paketes)')
+    plot_series(ax, timestamps, modified_rssi_values, 'g.-', label='Modificētais RSSI (visi paketes)')
     avg_ori = np.mean(rssi_values)
     avg_mod = np.mean(modified_rssi_values)
     plt.axhline(avg_ori, color='blue', linestyle='dotted', label=f"Vidējais oriģinālais RSSI ({avg_ori:.2f})")
     plt.axhline(avg_mod, color='green', linestyle='dotted', label=f"Vidējais modificētais RSSI ({avg_mod:.2f})")
-    filt_t_ori, filt_rssi = filter_injected_packets(timestamps, rssi_values, sources, jamming_timestamps)
-    filt_t_mod, filt_mod = filter_injected_packets(timestamps, modified_rssi_values, sources, jamming_timestamps)
+    keep = countered_keep_mask(timestamps, sources, jamming_timestamps, 0.001, INJECTOR)
+    filt_t_ori, filt_rssi = filter_injected_packets(timestamps, rssi_values, sources, jamming_timestamps, keep=keep)
+    filt_t_mod, filt_mod = filter_injected_packets(timestamps, modified_rssi_values, sources, jamming_timestamps, keep=keep)
     avg_ori_filt = np.mean(filt_rssi) if filt_rssi else float('nan')
     avg_mod_filt = np.mean(filt_mod) if filt_mod else float('nan')
     plt.axhline(avg_ori_filt, color='blue', linestyle='dashdot', label=f"Atjaunotais oriģinālais RSSI ({avg_ori_filt:.2f})")
     plt.axhline(avg_mod_filt, color='green', linestyle='dashdot', label=f"Atjaunotais modificētais RSSI ({avg_mod_filt:.2f})")
-    added_label = False
-    for jt in jamming_timestamps:
-        if not added_label:
-            plt.axvline(jt, color='red', linestyle='--', label="Pretpasākuma darbība")
-            added_label = True
-        else:
-            plt.axvline(jt, color='red', linestyle='--')
+    draw_vlines(ax, jamming_timestamps, color='red', linestyle='--', label="Pretpasākuma darbība")
     plt.title("RSSI laika gaitā")
     plt.xlabel("Laiks (s)")
     plt.ylabel("RSSI (dBm)")
@@ -164,23 +207,23 @@ def plot_results(timestamps, rssi_values, modified_rssi_values, capacities_mod,
     plt.close()
 
     # Reālā caurlaidspēja aprēķināta no oriģinālā RSSI
-    capacities_real = [calculate_capacity(x) for x in rssi_values]
-    filt_t_real, filt_cap_real = filter_injected_packets(timestamps, capacities_real, sources, jamming_timestamps)
-    _, filt_cap_mod = filter_injected_packets(timestamps, capacities_mod, sources, jamming_timestamps)
+    capacities_real = calculate_capacity(np.asarray(rssi_values, dtype=float)).tolist()
+    filt_t_real, filt_cap_real = filter_injected_packets(timestamps, capacities_real, sources, jamming_timestamps, keep=keep)
+    _, filt_cap_mod = filter_injected_packets(timestamps, capacities_mod, sources, jamming_timestamps, keep=keep)
     avg_cap_mod_all = np.mean(capacities_mod)
     avg_cap_mod_filt = np.mean(filt_cap_mod) if filt_cap_mod else float('nan')
     avg_cap_real_all = np.mean(capacities_real)
     avg_cap_real_filt = np.mean(filt_cap_real) if filt_cap_real else float('nan')
 
     plt.figure(figsize=(10, 6))
-    plt.plot(timestamps, capacities_mod, 'm.-', label='Modificētā caurlaidspēja (visi paketes)')
+    ax = plt.gca()
+    plot_series(ax, timestamps, capacities_mod, 'm.-', label='Modificētā caurlaidspēja (visi paketes)')
     plt.axhline(avg_cap_mod_all, color='magenta', linestyle='dotted', label=f"Vidējā modificētā caurlaidspēja ({avg_cap_mod_all:.2f})")
     plt.axhline(avg_cap_mod_filt, color='black', linestyle='dashdot', label=f"Atjaunotā modificētā caurlaidspēja ({avg_cap_mod_filt:.2f})")
-    plt.plot(timestamps, capacities_real, 'c.-', label='Reālā caurlaidspēja (visi paketes)')
+    plot_series(ax, timestamps, capacities_real, 'c.-', label='Reālā caurlaidspēja (visi paketes)')
     plt.axhline(avg_cap_real_all, color='cyan', linestyle='dotted', label=f"Vidējā reālā caurlaidspēja ({avg_cap_real_all:.2f})")
     plt.axhline(avg_cap_real_filt, color='orange', linestyle='dashdot', label=f"Atjaunotā reālā caurlaidspēja ({avg_cap_real_filt:.2f})")
-    for jt in jamming_timestamps:
-        plt.axvline(jt, color='red', linestyle='--')
+    draw_vlines(ax, jamming_timestamps, color='red', linestyle='--')
     plt.title("Caurlaidspēja laika gaitā")
     plt.xlabel("Laiks (s)")
     plt.ylabel("Caurlaidspēja (kbps)")
@@ -195,49 +238,111 @@ def save_data_to_csv(timestamps, rssi_values, modified_rssi_values, capacities,
     # Saglabā datus CSV failā nākotnes trendline analīzei.
     # Kolonnas: Laiks (s), Oriģinālais RSSI, Modificētais RSSI, Caurlaidspēja (kbps), Avots.
     
-    with open(output_filename, mode='w', newline='') as csvfile:
-        writer = csv.writer(csvfile)
-        writer.writerow(["Laiks (s)", "Oriģinālais RSSI", "Modificētais RSSI", "Caurlaidspēja (kbps)", "Avots"])
-        for t, r, mr, cap, src in zip(timestamps, rssi_values, modified_rssi_values, capacities, sources):
-            writer.writerow([t, r, mr, cap, src])
+    export_csv(output_filename,
+               ["Laiks (s)", "Oriģinālais RSSI", "Modificētais RSSI", "Caurlaidspēja (kbps)", "Avots"],
+               [timestamps, rssi_values, modified_rssi_values, capacities, SOURCES.names(sources)])
+
+def simulate_virtual(duration, jamming_efficiency=0.85, num_devices=30, seed=None):
+    # Virtuālā laika variants main_injector cilpai: tie paši 0.1 s takti notikumu dzinējā, bez gaidīšanas un izdrukām.
+    # Katra takta paketes tiek ģenerētas un apstrādātas kā viena kopa.
+    rng, numpy_seed = spawn_streams(seed)
+    fading_seed, batch_seed = numpy_seed.spawn(2)
+    fading = NakagamiSampler(m=0.8, omega=0.3, amplitude=True, seed=fading_seed)
+    handler = InjectionHandler(jamming_efficiency, rng=rng, verbose=False)
+    generator = TickBatchGenerator([f"Ierīce{i}" for i in range(num_devices)], rng=batch_seed, fading=fading)
+    engine = EventEngine()
+    tick = 0.1
+
+    def step():
+        current_time = engine.now + tick  # Apstrāde notiek pēc takta pauzes, kā reālajā cilpā
+        handler.handle_packets(generator.generate(), current_time)
+        engine.schedule(tick, step)
+
+    engine.schedule(0.0, step)
+    engine.run(until=duration)
+    return handler.timestamps, handler
 
-def main_injector(duration, jamming_efficiency=0.85):
+def summarize(timestamps, handler):
+    # Viena palaišanas kopsavilkums parametru pārlasei: skaiti, vidējās un atjaunotās vērtības
+    results = handler.get_results()
+    original = handler.rssi_values
+    capacities = handler.capacities
+    keep = countered_keep_mask(timestamps, handler.sources, handler.jamming_timestamps, 0.001, INJECTOR)
+    return {
+        'packets': len(original),
+        'detected': results['total_injected'],
+        'removed': results['removed_injected'],
+        'removed_pct': results['percentage_removed'],
+        'mean_rssi': float(np.mean(original)) if original.size else float('nan'),
+        'recovered_rssi': float(np.mean(original[:len(keep)][keep])) if keep.any() else float('nan'),
+        'mean_capacity': float(np.mean(capacities)) if capacities.size else float('nan'),
+        'recovered_capacity': float(np.mean(capacities[:len(keep)][keep])) if keep.any() else float('nan'),
+    }
+
+def run_scenario(duration=120, jamming_efficiency=0.85, num_devices=30, seed=None):
+    # Viens virtuālā laika scenārijs bez grafikiem; atgriež kopsavilkumu
+    timestamps, handler = simulate_virtual(duration, jamming_efficiency, num_devices, seed)
+    return summarize(timestamps, handler)
+
+def main_injector(duration, jamming_efficiency=0.85, batch=True, plot=True):
     
     #Galvenā injekciju un apstrādes cilpa.
     #Simulācija darbojas norādītajā laika periodā (piemēram, 10 s).
+    #batch=True: katra takta paketes tiek ģenerētas vektorizēti un nodotas apstrādei kā viena kopa.
+    #batch=False: katra ierīce sūta savu paketi caur BatchSender, un rinda katrā taktā tiek iztukšota pilnībā.
     
-    packet_queue = Queue()
-    handler = InjectionHandler(jamming_efficiency)
-    injector = PacketInjector(packet_queue)
-    devices = [NetworkDevice(f"Ierīce{i}", packet_queue) for i in range(30)]  
-
-    timestamps = []
+    logging.basicConfig(level=logging.INFO, format="%(message)s")  # Bez efekta, ja žurnāls jau konfigurēts (piem. CLI)
     start_time = time.time()
+    # Apstrādātās paketes tiek straumētas uz diska binārajā kolonnu formātā (.npy katrai kolonnai)
+    store = ColumnWriter.for_dtype("injection_results_data", PACKET_DTYPE)
+    handler = InjectionHandler(jamming_efficiency, verbose=not batch, store=store)
+    device_ids = [f"Ierīce{i}" for i in range(30)]
+    if batch:
+        generator = TickBatchGenerator(device_ids)
+    else:
+        packet_queue = Queue()
+        sender = BatchSender(packet_queue, start_time, max_count=31, max_age=0.1)
+        receiver = BatchReceiver(packet_queue)
+        injector = PacketInjector(sender)
+        devices = [NetworkDevice(device_id, sender) for device_id in device_ids]
+
+    generated = 0
 
     print("Sākas injekcija un apstrāde...")
     while time.time() - start_time < duration:
-        injector.inject_packet()
-        for device in devices:
-            device.send_packet()
+        if batch:
+            packets = generator.generate()
+        else:
+            injector.inject_packet()
+            for device in devices:
+                device.send_packet()
+        generated += len(device_ids) + 1
         time.sleep(0.1)
-        try:
-            packet = packet_queue.get_nowait()
-            current_time = time.time() - start_time
-            handler.handle_packet(packet, current_time)
-            timestamps.append(current_time)
-        except Empty:
-            pass
+        if batch:
+            handler.handle_packets(packets, time.time() - start_time)
+        else:
+            # Paketēm saglabājas BatchSender pierakstītie nosūtīšanas laiki
+            sender.flush()
+            handler.handle_packets(receiver.get())
 
+    handler.removed_log.close()
+    flush_packet_logs()
+    store.labels = {'source': SOURCES.labels(handler.sources)}
+    store.close()
     print("Injekcija un apstrāde pabeigta.")
+    elapsed = time.time() - start_time
+    print(f"Apstrādātas paketes: {handler.total_packets} no {generated} ģenerētajām "
+          f"({handler.total_packets / elapsed:.1f} paketes/s)")
     results = handler.get_results()
     print(f"Kopā injicētās paketes: {results['total_injected']}")
     print(f"Noņemtās injicētās paketes: {results['removed_injected']}")
     print(f"Noņemtās paketes procentuālais īpatsvars: {results['percentage_removed']:.2f}%")
     
-    plot_results(timestamps, handler.rssi_values, handler.modified_rssi_values,
-                 handler.capacities, handler.sources, handler.jamming_timestamps,
-                 "injection_results")
-    save_data_to_csv(timestamps, handler.rssi_values, handler.modified_rssi_values,
+    if plot:
+        plot_results(handler.timestamps, handler.rssi_values, handler.modified_rssi_values,
+                     handler.capacities, handler.sources, handler.jamming_timestamps,
+                     "injection_results")
+    save_data_to_csv(handler.timestamps, handler.rssi_values, handler.modified_rssi_values,
                      handler.capacities, handler.sources, "injection_results_data.csv")
 
 if __name__ == "__main__":
@@ -0,0 +1,85 @@
+import numpy as np
+
+# Kompakts pakešu attēlojums: viena pakete – objekts ar __slots__ (bez __dict__ katrai instancei),
+# pakešu kopa – NumPy strukturēts masīvs. Avoti tiek glabāti kā veseli kodi, bet nosaukumi
+# tiek atrasti avotu tabulā tikai izdrukām un saglabāšanai.
+
+# Viena ieraksta izkārtojums kopās (28 baiti); galamērķis visās simulācijās ir "Broadcast", tāpēc netiek glabāts
+PACKET_DTYPE = np.dtype([('time', 'f8'), ('source', 'i4'), ('rssi', 'f8'), ('modified_rssi', 'f8')])
+
+UNKNOWN_SOURCE = 0
+
+
+class SourceTable:
+    # Avotu nosaukumi <-> kodi. Fiksētie avoti (uzbrucēji) saņem kodus 1..k, ierīces – `device_base + ID`.
+    # Kodi ir deterministiski, tāpēc visi procesi tos aprēķina vienādi bez koplietotas vārdnīcas.
+    def __init__(self, fixed=(), device_format="Ierīce-{}"):
+        self.fixed = {name: code for code, name in enumerate(fixed, start=UNKNOWN_SOURCE + 1)}
+        self.fixed_names = {code: name for name, code in self.fixed.items()}
+        self.device_base = len(self.fixed) + 1
+        self.device_format = device_format
+        self._prefix, _, self._suffix = device_format.partition("{}")
+
+    def code(self, name):
+        if name in self.fixed:
+            return self.fixed[name]
+        if name.startswith(self._prefix) and name.endswith(self._suffix):
+            device_id = name[len(self._prefix):len(name) - len(self._suffix)]
+            if device_id.isdigit():
+                return self.device_base + int(device_id)
+        return UNKNOWN_SOURCE
+
+    def device_code(self, device_id):
+        return self.device_base + int(device_id)
+
+    def device_codes(self, ids):
+        return np.asarray(ids, dtype=np.int32) + np.int32(self.device_base)
+
+    def name(self, code):
+        code = int(code)
+        if code in self.fixed_names:
+            return self.fixed_names[code]
+        if code >= self.device_base:
+            return self.device_format.format(code - self.device_base)
+        return "unknown"
+
+    def names(self, codes):
+        # Nosaukumu masīvs kodiem; katrs atšķirīgais kods tiek formatēts tikai vienreiz
+        codes = np.asarray(codes)
+        if codes.size == 0:
+            return np.empty(0, dtype=str)
+        unique, inverse = np.unique(codes, return_inverse=True)
+        return np.array([self.name(code) for code in unique])[inverse]
+
+    def labels(self, codes):
+        # {kods: nosaukums} sastopamajiem kodiem (piem. saglabāšanai kopā ar kolonnu datiem)
+        return {int(code): self.name(code) for code in np.unique(np.asarray(codes))}
+
+
+class Packet:
+    # Viena pakete bez __dict__; `source` ir avota kods
+    __slots__ = ('source', 'rssi', 'modified_rssi')
+
+    def __init__(self, source, rssi, modified_rssi):
+        self.source = source
+        self.rssi = rssi
+        self.modified_rssi = modified_rssi
+
+    def __repr__(self):
+        return f"Packet(source={self.source}, rssi={self.rssi:.2f}, modified_rssi={self.modified_rssi:.2f})"
+
+
+def make_batch(times, sources, rssi, modified_rssi):
+    # Kolonnas -> viens strukturēts masīvs (viens objekts rindā vai buferī visai kopai)
+    batch = np.empty(len(rssi), dtype=PACKET_DTYPE)
+    batch['time'] = times
+    batch['source'] = sources
+    batch['rssi'] = rssi
+    batch['modified_rssi'] = modified_rssi
+    return batch
+
+
+def packets_to_batch(packets, times=0.0):
+    # Atsevišķu pakešu saraksts -> strukturēts masīvs
+    return make_batch(times, [p.source for p in packets], [p.rssi for p in packets],
+                      [p.modified_rssi for p in packets])
@@ -0,0 +1,156 @@
+import numpy as np
+from series_filters import IntervalIndex
+
+# Grafiku zīmēšana lieliem datu apjomiem. Līknes tiek samazinātas līdz punktu skaitam, ko attēls
+# spēj parādīt (asu platums pikseļos), saglabājot formu: katram pikseļa stabiņam – pirmais, pēdējais,
+# minimālais un maksimālais punkts (M4) vai LTTB. Traucēšanas intervāli tiek apvienoti, un vertikālās
+# līnijas/intervāli tiek zīmēti kā viens kolekcijas objekts, nevis viens axvline/axvspan katram notikumam.
+
+POINTS_PER_BUCKET = 4  # M4: pirmais, pēdējais, min un max katrā stabiņā
+
+
+def pixel_width(ax):
+    # Asu platums pikseļos (pēc figūras izmēra un dpi)
+    return max(1, int(ax.get_window_extent().width))
+
+
+def _bucket_keys(x, buckets):
+    # Stabiņa numurs katram punktam; nedilstošs, tāpēc stabiņi ir nepārtrauktas indeksu daļas
+    n = len(x)
+    if n > 1 and np.all(np.diff(x) >= 0) and x[-1] > x[0]:
+        keys = ((x - x[0]) / (x[-1] - x[0]) * buckets).astype(np.int64)
+        return np.minimum(keys, buckets - 1)
+    return np.arange(n, dtype=np.int64) * buckets // max(n, 1)
+
+
+def minmax_indices(x, y, buckets):
+    # Indeksi M4 samazinājumam: līnija caur tiem pikseļos izskatās tāpat kā caur visiem punktiem
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    if n <= POINTS_PER_BUCKET * buckets:
+        return np.arange(n)
+    keys = _bucket_keys(x, buckets)
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    ends = np.r_[starts[1:], n] - 1
+    # Sakārtojot pēc (stabiņš, y), stabiņu robežas paliek tajās pašās pozīcijās
+    order = np.lexsort((y, keys))
+    return np.unique(np.concatenate((starts, ends, order[starts], order[ends])))
+
+
+def lttb_indices(x, y, n_out):
+    # Largest-Triangle-Three-Buckets: katrā stabiņā punkts ar lielāko trijstūra laukumu
+    # starp iepriekš izvēlēto punktu un nākamā stabiņa vidējo punktu
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        next_hi = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[hi:next_hi].mean() if next_hi > hi else x[-1]
+        avg_y = y[hi:next_hi].mean() if next_hi > hi else y[-1]
+        area = np.abs((x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a]))
+        a = lo + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+
+def reduce_series(x, y, buckets, method='minmax'):
+    # (x, y) ar ne vairāk kā ~POINTS_PER_BUCKET * buckets punktiem
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = min(len(x), len(y))
+    x, y = x[:n], y[:n]
+    if method == 'lttb':
+        idx = lttb_indices(x, y, POINTS_PER_BUCKET * buckets)
+    elif method == 'minmax':
+        idx = minmax_indices(x, y, buckets)
+    else:
+        raise ValueError(f"Nezināma samazināšanas metode: {method}")
+    return x[idx], y[idx]
+
+
+def plot_series(ax, x, y, *fmt, method='minmax', buckets=None, **kwargs):
+    # ax.plot aizstājējs: zīmē līkni, samazinātu līdz asu platumam pikseļos
+    xs, ys = reduce_series(x, y, buckets or pixel_width(ax), method)
+    return ax.plot(xs, ys, *fmt, **kwargs)
+
+
+def data_per_pixel(ax, xs=()):
+    # Viena pikseļa platums datu vienībās (ņemot vērā arī vēl nezīmētos x)
+    lo, hi = ax.get_xlim()
+    xs = np.asarray(xs, dtype=float).ravel()
+    if xs.size:
+        lo, hi = min(lo, xs.min()), max(hi, xs.max())
+    return (hi - lo) / pixel_width(ax)
+
+
+def merge_spans(spans, min_gap=0.0):
+    # Sakārtoti, apvienoti intervāli (starts, ends); intervāli ar atstarpi <= min_gap tiek apvienoti
+    index = IntervalIndex(spans)
+    starts, ends = index.starts, index.ends
+    if min_gap > 0 and len(starts) > 1:
+        new_group = np.r_[True, starts[1:] - ends[:-1] > min_gap]
+        groups = np.flatnonzero(new_group)
+        starts, ends = starts[groups], np.maximum.reduceat(ends, groups)
+    return starts, ends
+
+
+def _add_x_collection(ax, collection, starts, ends):
+    # Kolekcija x datu / y asu koordinātās (kā axvline/axvspan); x robežas tiek atjaunotas atsevišķi
+    collection.set_transform(ax.get_xaxis_transform())
+    ax.add_collection(collection, autolim=False)
+    ax.update_datalim(np.column_stack((np.r_[starts, ends], np.zeros(2 * len(starts)))), updatey=False)
+    ax.autoscale_view(scaley=False)
+    return collection
+
+
+def draw_spans(ax, spans, min_gap=None, **kwargs):
+    # Visi intervāli vienā PolyCollection; pēc noklusējuma apvieno intervālus, kas atšķiras mazāk par pikseli
+    spans = np.asarray(list(spans), dtype=float).reshape(-1, 2)
+    if len(spans) == 0:
+        return None
+    from matplotlib.collections import PolyCollection
+    if min_gap is None:
+        min_gap = data_per_pixel(ax, spans)
+    starts, ends = merge_spans(spans, min_gap)
+    verts = np.stack((np.column_stack((starts, np.zeros_like(starts))), np.column_stack((starts, np.ones_like(starts))),
+                      np.column_stack((ends, np.ones_like(ends))), np.column_stack((ends, np.zeros_like(ends)))), axis=1)
+    return _add_x_collection(ax, PolyCollection(verts, **kwargs), starts, ends)
+
+
+def draw_vlines(ax, xs, **kwargs):
+    # Visas vertikālās līnijas vienā LineCollection; līnijas vienā pikselī tiek zīmētas vienreiz
+    xs = np.asarray(list(xs), dtype=float).ravel()
+    if xs.size == 0:
+        return None
+    from matplotlib.collections import LineCollection
+    px = data_per_pixel(ax, xs)
+    if px > 0:
+        _, first = np.unique(np.floor((xs - xs.min()) / px), return_index=True)
+        xs = xs[first]
+    segments = np.stack((np.column_stack((xs, np.zeros_like(xs))), np.column_stack((xs, np.ones_like(xs)))), axis=1)
+    return _add_x_collection(ax, LineCollection(segments, **kwargs), xs, xs)
+
+
+def draw_markers(ax, x, y, **kwargs):
+    # ax.scatter aizstājējs: vienā pikselī sakrītoši marķieri tiek zīmēti vienreiz
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = min(len(x), len(y))
+    x, y = x[:n], y[:n]
+    if n > 1:
+        bbox = ax.get_window_extent()
+        cols = np.floor((x - x.min()) / ((np.ptp(x) or 1.0) / bbox.width)).astype(np.int64)
+        rows = np.floor((y - y.min()) / ((np.ptp(y) or 1.0) / bbox.height)).astype(np.int64)
+        _, first = np.unique(cols * (int(bbox.height) + 2) + rows, return_index=True)
+        first.sort()
+        x, y = x[first], y[first]
+    return ax.scatter(x, y, **kwargs)
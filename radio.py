@@ -0,0 +1,89 @@
+import time
+from replay import PcapReplay, is_capture_file
+
+# Piekļuve radio ierīcēm. Aparatūras bibliotēka (killerbee) tiek ielādēta tikai tad, kad ierīce
+# tiek atvērta, tāpēc skriptu imports, CLI un simulācijas bez aparatūras startē ātri.
+# Ierīces vietā var norādīt uztveršanas failu ("pcap:ceļš" vai *.pcap / *.pcapng) – tad kadri tiek
+# atskaņoti no ieraksta (replay.PcapReplay) ar to pašu saskarni; "emu[:opcijas]" – programmatiska
+# ierīce ar ģenerētu plūsmu slodzes testiem (emulator.EmulatedKillerBee).
+# Kadru saņemšana (AdaptiveReceiver): ja kb.pnext() neatgriež kadru, nākamā nolasīšana tiek atlikta
+# ar pieaugošu pauzi (2x no MIN_BACKOFF līdz MAX_ADDED_LATENCY), tāpēc tukšā kanālā sniffers negriežas
+# ciklā ar 100 % CPU. Pēc katra kadra pauze tiek atiestatīta, tāpēc slodzes laikā kadri tiek lasīti bez gaidīšanas.
+
+MIN_BACKOFF = 0.0005        # Pirmā pauze (s) pēc tukšas nolasīšanas
+MAX_ADDED_LATENCY = 0.02    # Maksimālā pauze (s), t.i. maksimālā papildu aizture pirmajam kadram pēc klusuma
+
+# 802.15.4 līnijas ātrums un PHY papildu baiti katram kadram (preambula, SFD, garums)
+LINE_RATE_KBPS = 250
+PHY_OVERHEAD_BYTES = 6
+EMULATOR_PREFIX = "emu"     # Ierīces nosaukums emulatoram (emulator.EmulatedKillerBee)
+
+
+def open_killerbee(device):
+    # KillerBee ierīce (CC2531 / RZUSBStick) pēc saskarnes, piem. "1:3", vai ieraksta atskaņotājs
+    if is_capture_file(device):
+        return PcapReplay(device)
+    if device == EMULATOR_PREFIX or device.startswith(EMULATOR_PREFIX + ":"):
+        from emulator import EmulatedKillerBee
+        return EmulatedKillerBee.from_spec(device)
+    from killerbee import KillerBee
+    return KillerBee(device=device)
+
+
+def configure_receive(max_latency=None, min_backoff=None):
+    # Noklusējumi jaunajiem Backoff/AdaptiveReceiver (piem. no CLI)
+    global MAX_ADDED_LATENCY, MIN_BACKOFF
+    if max_latency is not None:
+        MAX_ADDED_LATENCY = max_latency
+    if min_backoff is not None:
+        MIN_BACKOFF = min(min_backoff, MAX_ADDED_LATENCY)
+
+
+class Backoff:
+    # Pieaugoša gaidīšana dīkstāvē ar griestiem; `stop` (threading.Event) pārtrauc gaidīšanu uzreiz
+    def __init__(self, max_latency=None, min_backoff=None, stop=None):
+        self.max_latency = MAX_ADDED_LATENCY if max_latency is None else max_latency
+        self.min_backoff = min(MIN_BACKOFF if min_backoff is None else min_backoff, self.max_latency)
+        self.stop = stop
+        self.delay = 0.0
+        self.idle_time = 0.0
+
+    def reset(self):
+        self.delay = 0.0
+
+    def wait(self, elapsed=0.0):
+        # Nākamā pauze; laiks, kas jau pavadīts bloķējošā nolasīšanā (`elapsed`), tiek atskaitīts
+        self.delay = min(self.max_latency, max(self.min_backoff, self.delay * 2))
+        remaining = self.delay - elapsed
+        if remaining <= 0:
+            return
+        self.idle_time += remaining
+        if self.stop is not None:
+            self.stop.wait(remaining)
+        else:
+            time.sleep(remaining)
+
+
+class AdaptiveReceiver:
+    # kb.pnext() aizstājējs sniffera cikliem
+    def __init__(self, kb, max_latency=None, stop=None):
+        self.kb = kb
+        self.backoff = Backoff(max_latency, stop=stop)
+        self.frames = 0
+        self.empty_reads = 0
+
+    @property
+    def finished(self):
+        # Avots beidzies (ieraksta atskaņošana); dzīvai ierīcei – nekad
+        return getattr(self.kb, 'finished', False)
+
+    def pnext(self):
+        started = time.monotonic()
+        frame = self.kb.pnext()
+        if frame:
+            self.frames += 1
+            self.backoff.reset()
+            return frame
+        self.empty_reads += 1
+        self.backoff.wait(time.monotonic() - started)
+        return None
@@ -0,0 +1,228 @@
+import mmap
+import struct
+import time
+
+# Ierakstītu 802.15.4 uztveršanu (PCAP / PCAPNG) atskaņošana ar KillerBee saskarni (set_channel, pnext,
+# close), tāpēc analizatori un detektori tos apstrādā tāpat kā dzīvu CC2531 plūsmu, bez aparatūras.
+# Ātrums: 0 – cik ātri vien iespējams (caurlaidspējas mērījumiem un atkārtotai analīzei),
+# 1 – ierakstītajā laikā, 2 – divreiz ātrāk utt. Pulkstenis (`clock`) ir ierakstītais laiks,
+# tāpēc laika pārbaudes (piem. trokšņa noteikšana) nav atkarīgas no atskaņošanas ātruma.
+# RSSI tiek nolasīts no 802.15.4 TAP (RSS TLV) vai TI CC24xx metadatiem FCS vietā (ti_metadata=True).
+
+REPLAY_SPEED = 0.0  # Noklusējuma atskaņošanas ātrums (0 – bez pauzēm)
+REPLAY_TI_METADATA = False  # Vai DLT 195 kadru pēdējie 2 baiti ir CC24xx RSSI/LQI, nevis FCS
+REPLAY_EXTENSIONS = ('.pcap', '.pcapng', '.cap')
+REPLAY_PREFIX = "pcap:"
+
+# Saišu tipi (LINKTYPE_*)
+LINKTYPE_IEEE802_15_4_WITHFCS = 195
+LINKTYPE_IEEE802_15_4_NONASK_PHY = 215
+LINKTYPE_IEEE802_15_4_NOFCS = 230
+LINKTYPE_IEEE802_15_4_TAP = 283
+LINKTYPE_PPI = 192
+
+PHY_HEADER_BYTES = 6  # NONASK_PHY: preambula (4), SFD (1), garums (1)
+CC24XX_RSSI_OFFSET = 73  # CC2531: dBm = RSSI reģistra vērtība - 73
+
+# 802.15.4 TAP TLV tipi
+TAP_RSS = 1
+TAP_CHANNEL = 3
+TAP_LQI = 10
+
+PCAP_MAGIC = {b"\xd4\xc3\xb2\xa1": ("<", 1e-6), b"\xa1\xb2\xc3\xd4": (">", 1e-6),
+              b"\x4d\x3c\xb2\xa1": ("<", 1e-9), b"\xa1\xb2\x3c\x4d": (">", 1e-9)}
+PCAPNG_SHB = 0x0A0D0D0A
+PCAPNG_BYTE_ORDER = 0x1A2B3C4D
+PCAPNG_IDB = 1
+PCAPNG_SPB = 3
+PCAPNG_EPB = 6
+PCAPNG_IF_TSRESOL = 9
+
+
+def configure_replay(speed=None, ti_metadata=None):
+    # Noklusējumi jauniem atskaņotājiem (piem. no CLI)
+    global REPLAY_SPEED, REPLAY_TI_METADATA
+    if speed is not None:
+        REPLAY_SPEED = speed
+    if ti_metadata is not None:
+        REPLAY_TI_METADATA = ti_metadata
+
+
+def is_capture_file(device):
+    # Vai ierīces nosaukums norāda uz uztveršanas failu ("pcap:ceļš" vai ceļš ar .pcap/.pcapng)
+    return isinstance(device, str) and (device.startswith(REPLAY_PREFIX) or device.lower().endswith(REPLAY_EXTENSIONS))
+
+
+def _pcap_records(buf):
+    # (laiks, saišu tips, dati) no klasiskā PCAP
+    order, unit = PCAP_MAGIC[bytes(buf[:4])]
+    linktype = struct.unpack_from(order + "I", buf, 20)[0] & 0x0FFFFFFF
+    record = struct.Struct(order + "IIII")
+    offset = 24
+    while offset + record.size <= len(buf):
+        seconds, fraction, caplen, _ = record.unpack_from(buf, offset)
+        offset += record.size
+        yield seconds + fraction * unit, linktype, bytes(buf[offset:offset + caplen])
+        offset += caplen
+
+
+def _pcapng_tsresol(options, order):
+    # if_tsresol no IDB opcijām; noklusējums – mikrosekundes
+    offset = 0
+    while offset + 4 <= len(options):
+        code, length = struct.unpack_from(order + "HH", options, offset)
+        if code == 0:
+            break
+        if code == PCAPNG_IF_TSRESOL and length >= 1:
+            value = options[offset + 4]
+            return 2.0 ** -(value & 0x7F) if value & 0x80 else 10.0 ** -value
+        offset += 4 + (length + 3) // 4 * 4
+    return 1e-6
+
+
+def _pcapng_records(buf):
+    # (laiks, saišu tips, dati) no PCAPNG (EPB un SPB; citi bloki tiek izlaisti)
+    interfaces = []  # (saišu tips, laika vienība)
+    order = "<"
+    offset = 0
+    timestamp = 0.0
+    while offset + 12 <= len(buf):
+        block_type = struct.unpack_from(order + "I", buf, offset)[0]
+        if block_type == PCAPNG_SHB:
+            order = "<" if struct.unpack_from("<I", buf, offset + 8)[0] == PCAPNG_BYTE_ORDER else ">"
+            interfaces = []
+        block_len = struct.unpack_from(order + "I", buf, offset + 4)[0]
+        if block_len < 12:
+            break
+        body = offset + 8
+        if block_type == PCAPNG_IDB:
+            linktype = struct.unpack_from(order + "H", buf, body)[0]
+            interfaces.append((linktype, _pcapng_tsresol(bytes(buf[body + 8:offset + block_len - 4]), order)))
+        elif block_type == PCAPNG_EPB:
+            interface, high, low, caplen, _ = struct.unpack_from(order + "IIIII", buf, body)
+            linktype, unit = interfaces[interface]
+            timestamp = ((high << 32) | low) * unit
+            yield timestamp, linktype, bytes(buf[body + 20:body + 20 + caplen])
+        elif block_type == PCAPNG_SPB and interfaces:
+            # Vienkāršotā pakete bez laika – iepriekšējās paketes laiks
+            origlen = struct.unpack_from(order + "I", buf, body)[0]
+            caplen = min(origlen, block_len - 16)
+            yield timestamp, interfaces[0][0], bytes(buf[body + 4:body + 4 + caplen])
+        offset += block_len
+
+
+def _tap_fields(data):
+    # 802.15.4 TAP galvene: (kadrs, RSSI, LQI, kanāls)
+    header_len = struct.unpack_from("<H", data, 2)[0]
+    rssi = lqi = channel = None
+    offset = 4
+    while offset + 4 <= header_len:
+        tlv_type, length = struct.unpack_from("<HH", data, offset)
+        value = offset + 4
+        if tlv_type == TAP_RSS and length >= 4:
+            rssi = int(round(struct.unpack_from("<f", data, value)[0]))
+        elif tlv_type == TAP_LQI and length >= 1:
+            lqi = data[value]
+        elif tlv_type == TAP_CHANNEL and length >= 2:
+            channel = struct.unpack_from("<H", data, value)[0]
+        offset = value + (length + 3) // 4 * 4
+    return data[header_len:], rssi, lqi, channel
+
+
+class PcapReplay:
+    def __init__(self, path, speed=None, ti_metadata=None, default_rssi=None):
+        if path.startswith(REPLAY_PREFIX):
+            path = path[len(REPLAY_PREFIX):]
+        self.path = path
+        self.speed = REPLAY_SPEED if speed is None else speed
+        self.ti_metadata = REPLAY_TI_METADATA if ti_metadata is None else ti_metadata
+        self.default_rssi = default_rssi
+        self.channel = None
+        self.frames = 0
+        self.skipped = 0
+        # Atskaņošana ir bez zudumiem: uztveršana gaida, ja gredzens pilns (capture.PacketCapture)
+        self.lossless = True
+        self.finished = False
+        self._file = open(path, "rb")
+        self._buf = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic = bytes(self._buf[:4])
+        if magic in PCAP_MAGIC:
+            self._records = _pcap_records(self._buf)
+        elif struct.unpack("<I", magic)[0] == PCAPNG_SHB:
+            self._records = _pcapng_records(self._buf)
+        else:
+            self.close()
+            raise ValueError(f"Nezināms uztveršanas faila formāts: {path}")
+        self._pending = self._next_frame()
+        self.first_time = self._pending['time'] if self._pending else 0.0
+        self._last_time = self.first_time
+        self._started = None
+
+    def _decode(self, timestamp, linktype, data):
+        # KillerBee pnext() formāta vārdnīca vai None, ja saišu tips netiek atbalstīts
+        rssi = lqi = channel = None
+        validcrc = None
+        if linktype == LINKTYPE_PPI and len(data) >= 8:
+            header_len, linktype = struct.unpack_from("<HI", data, 2)
+            data = data[header_len:]
+        if linktype == LINKTYPE_IEEE802_15_4_TAP and len(data) >= 4:
+            data, rssi, lqi, channel = _tap_fields(data)
+        elif linktype == LINKTYPE_IEEE802_15_4_NONASK_PHY:
+            data = data[PHY_HEADER_BYTES:]
+        elif linktype == LINKTYPE_IEEE802_15_4_WITHFCS:
+            if self.ti_metadata and len(data) >= 2:
+                # FCS vietā: RSSI (baits ar zīmi) un CRC_OK | LQI
+                raw = data[-2] - 256 if data[-2] > 127 else data[-2]
+                rssi = raw - CC24XX_RSSI_OFFSET
+                validcrc = bool(data[-1] & 0x80)
+                lqi = data[-1] & 0x7F
+        elif linktype != LINKTYPE_IEEE802_15_4_NOFCS:
+            return None
+        if rssi is None:
+            rssi = self.default_rssi
+        return {'bytes': data, 'rssi': rssi, 'dbm': rssi, 'lqi': lqi, 'validcrc': validcrc,
+                'channel': channel, 'time': timestamp}
+
+    def _next_frame(self):
+        for timestamp, linktype, data in self._records:
+            frame = self._decode(timestamp, linktype, data)
+            if frame is not None:
+                return frame
+            self.skipped += 1
+        return None
+
+    def set_channel(self, channel):
+        # Kanāls ir noteikts ierakstā; tiek tikai atcerēts
+        self.channel = channel
+
+    def clock(self):
+        # Ierakstītais laiks: ātrajā režīmā – pēdējās nolasītās paketes laiks
+        if self.speed > 0 and self._started is not None:
+            return self.first_time + (time.monotonic() - self._started) * self.speed
+        return self._last_time
+
+    def pnext(self, timeout=100):
+        # Nākamā pakete; ierakstītā laika režīmā gaida līdz tās laikam, bet ne ilgāk par `timeout` ms
+        frame = self._pending
+        if frame is None:
+            self.finished = True
+            return None
+        if self._started is None:
+            self._started = time.monotonic()
+        if self.speed > 0:
+            delay = (frame['time'] - self.first_time) / self.speed - (time.monotonic() - self._started)
+            if delay > 0:
+                time.sleep(min(delay, timeout / 1000))
+                if delay > timeout / 1000:
+                    return None
+        self._pending = self._next_frame()
+        self._last_time = frame['time']
+        self.frames += 1
+        return frame
+
+    def close(self):
+        self._records = iter(())
+        self._pending = None
+        self.finished = True
+        self._buf.close()
+        self._file.close()
@@ -0,0 +1,20 @@
+import random
+import numpy as np
+
+# Neatkarīgas, reproducējamas nejaušības plūsmas vienai simulācijas palaišanai.
+# No vienas sēklas (int vai numpy SeedSequence) tiek atvasinātas atsevišķas plūsmas
+# Python `random` lēmumiem un NumPy fadinga ģeneratoram, tāpēc globālais stāvoklis netiek izmantots.
+
+
+def spawn_streams(seed=None):
+    # Atgriež (random.Random, np.random.SeedSequence) pāri; seed=None – jauna entropija no OS
+    sequence = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+    python_seq, numpy_seq = sequence.spawn(2)
+    python_rng = random.Random(int.from_bytes(python_seq.generate_state(4, np.uint32).tobytes(), "little"))
+    return python_rng, numpy_seq
+
+
+def numpy_generator(rng=random):
+    # NumPy ģenerators vektorizētiem lēmumiem (vesela kopa vienā izsaukumā), atvasināts no Python plūsmas:
+    # ar to pašu sēklu tiek iegūtas tās pašas vērtības
+    return np.random.default_rng(rng.getrandbits(128))
@@ -0,0 +1,60 @@
+import numpy as np
+
+# Paketu sēriju filtri pretpasākumu analīzei.
+# Filtri atgriež Būla masku, ko var atkārtoti pielietot jebkurai sērijai (RSSI, caurlaidspēja, ...).
+
+
+class IntervalIndex:
+    # Apvienoti un sakārtoti slēgti intervāli [start, end]; piederības pārbaude ar searchsorted
+    def __init__(self, intervals):
+        pairs = np.asarray(list(intervals), dtype=float).reshape(-1, 2)
+        if len(pairs) == 0:
+            self.starts = np.empty(0)
+            self.ends = np.empty(0)
+            return
+        pairs = pairs[np.argsort(pairs[:, 0], kind='stable')]
+        starts, ends = pairs[:, 0], pairs[:, 1]
+        # Jauns apvienots intervāls sākas tur, kur sākums ir aiz visu iepriekšējo beigu maksimuma
+        reach = np.maximum.accumulate(ends)
+        new_group = np.empty(len(starts), dtype=bool)
+        new_group[0] = True
+        new_group[1:] = starts[1:] > reach[:-1]
+        self.starts = starts[new_group]
+        self.ends = np.maximum.reduceat(ends, np.flatnonzero(new_group))
+
+    def __len__(self):
+        return len(self.starts)
+
+    def contains(self, times):
+        # Būla masks: vai katrs laiks ietilpst kādā intervālā (vienā vektorizētā piegājienā)
+        times = np.asarray(times, dtype=float)
+        if len(self.starts) == 0:
+            return np.zeros(times.shape, dtype=bool)
+        idx = np.searchsorted(self.starts, times, side='right') - 1
+        return (idx >= 0) & (times <= self.ends[np.maximum(idx, 0)])
+
+
+def source_mask(sources, source):
+    # Būla masks paketēm no konkrēta avota
+    return np.asarray(sources) == source
+
+
+def tolerance_match_mask(times, event_times, tolerance):
+    # "As-of" savienojums ar pielaidi: True, ja |t - e| < tolerance kādam notikumam e.
+    # Notikumi tiek sakārtoti vienreiz; katram laikam pietiek pārbaudīt tuvākos kaimiņus abās pusēs.
+    times = np.asarray(times, dtype=float)
+    events = np.sort(np.asarray(event_times, dtype=float).ravel())
+    if events.size == 0:
+        return np.zeros(times.shape, dtype=bool)
+    idx = np.searchsorted(events, times)
+    right = events[np.minimum(idx, events.size - 1)]
+    left = events[np.maximum(idx - 1, 0)]
+    nearest = np.minimum(np.abs(times - left), np.abs(times - right))
+    return nearest < tolerance
+
+
+def countered_keep_mask(timestamps, sources, event_times, tolerance, source):
+    # Masks paketēm, kas paliek aprēķinā: `source` paketes, kas sakrīt ar pretpasākuma brīdi, tiek izslēgtas
+    n = min(len(timestamps), len(sources))
+    matched = tolerance_match_mask(np.asarray(timestamps[:n], dtype=float), event_times, tolerance)
+    return ~(matched & source_mask(sources[:n], source))
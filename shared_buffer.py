@@ -0,0 +1,120 @@
+import logging
+import numpy as np
+from multiprocessing import Value, resource_tracker, shared_memory
+
+# Fiksētas shēmas kolonnu buferis koplietojamajā atmiņā (multiprocessing.shared_memory).
+# Ražotāji pieraksta rindas bez Manager starpprocesa izsaukumiem: rakstīšanas kursors ir
+# atomisks koplietots skaitītājs, bet vērtības tiek ierakstītas tieši kolonnās.
+# Vecāka process rezultātus nolasa kā NumPy skatus (bez kopēšanas).
+# Pilnā buferī vecākās rindas tiek pārrakstītas; pirmajā reizē tiek izdots brīdinājums, bet kopējais
+# pārrakstīto rindu skaits ir `overwritten` (jāziņo kopsavilkumā, jo rezultāti aptver tikai beigu daļu).
+
+DEFAULT_CAPACITY = 1 << 20  # Rindu skaits; /dev/shm lapas tiek aizņemtas tikai rakstot
+
+logger = logging.getLogger(__name__)
+
+
+class SharedColumns:
+    def __init__(self, schema, capacity=DEFAULT_CAPACITY):
+        # schema: [(kolonnas_nosaukums, dtype), ...]
+        self.schema = [(name, np.dtype(dtype)) for name, dtype in schema]
+        self.capacity = capacity
+        self._cursor = Value('q', 0)  # Kopējais jebkad ierakstīto rindu skaits
+        size = sum(dtype.itemsize for _, dtype in self.schema) * capacity
+        self._shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        self._owner = True
+        self._attach()
+
+    def _attach(self):
+        self.columns = {}
+        offset = 0
+        for name, dtype in self.schema:
+            self.columns[name] = np.ndarray((self.capacity,), dtype=dtype, buffer=self._shm.buf, offset=offset)
+            offset += dtype.itemsize * self.capacity
+        self._column_list = [self.columns[name] for name, _ in self.schema]
+
+    def __getstate__(self):
+        # Nodošanai uz 'spawn' procesiem: pievienojamies tam pašam atmiņas segmentam pēc nosaukuma
+        return {'schema': self.schema, 'capacity': self.capacity, 'cursor': self._cursor, 'name': self._shm.name}
+
+    def __setstate__(self, state):
+        self.schema = state['schema']
+        self.capacity = state['capacity']
+        self._cursor = state['cursor']
+        self._shm = shared_memory.SharedMemory(name=state['name'])
+        # Segments pieder izveidotājam; bērnprocess to nedrīkst dzēst, beidzot darbu
+        resource_tracker.unregister(self._shm._name, "shared_memory")
+        self._owner = False
+        self._attach()
+
+    def append(self, row):
+        # Pievieno vienu rindu (vērtības shēmas secībā); pilnā buferī pārraksta vecākās rindas
+        with self._cursor.get_lock():
+            seq = self._cursor.value
+            self._cursor.value = seq + 1
+        if seq == self.capacity:
+            self._warn_full()
+        idx = seq % self.capacity
+        for column, value in zip(self._column_list, row):
+            column[idx] = value
+
+    def extend(self, columns):
+        # Pievieno rindu paketi: `columns` ir vienāda garuma masīvi shēmas secībā (viena kursora rezervācija)
+        n = len(columns[0])
+        if n == 0:
+            return
+        with self._cursor.get_lock():
+            seq = self._cursor.value
+            self._cursor.value = seq + n
+        if seq <= self.capacity < seq + n:
+            self._warn_full()
+        if n > self.capacity:
+            # Paliek tikai jaunākās rindas
+            seq += n - self.capacity
+            columns = [np.asarray(values)[n - self.capacity:] for values in columns]
+            n = self.capacity
+        start = seq % self.capacity
+        first = min(n, self.capacity - start)
+        for column, values in zip(self._column_list, columns):
+            values = np.asarray(values)
+            column[start:start + first] = values[:first]
+            if first < n:
+                column[:n - first] = values[first:]
+
+    def _warn_full(self):
+        # Tikai tā rezervācija, kas pirmā pārsniedz ietilpību (kursors ir kopīgs visiem procesiem)
+        logger.warning("Koplietojamās atmiņas buferis (%s) pilns: %d rindas, vecākās rindas tiek pārrakstītas",
+                       ", ".join(name for name, _ in self.schema), self.capacity)
+
+    @property
+    def total_written(self):
+        return self._cursor.value
+
+    @property
+    def overwritten(self):
+        # Cik vecāko rindu pārrakstītas, jo buferis bija pilns
+        return max(0, self._cursor.value - self.capacity)
+
+    def __len__(self):
+        return min(self._cursor.value, self.capacity)
+
+    def view(self, name):
+        # Kolonna ierakstīšanas secībā: skats bez kopēšanas, ja buferis nav apgriezies
+        written = self._cursor.value
+        column = self.columns[name]
+        if written <= self.capacity:
+            return column[:written]
+        head = written % self.capacity
+        return np.concatenate((column[head:], column[:head]))
+
+    def close(self):
+        # Atbrīvo segmentu; izveidotājs to arī dzēš
+        self.columns = {}
+        self._column_list = []
+        try:
+            self._shm.close()
+        except BufferError:
+            # Kāds skats vēl ir dzīvs; segments tiks atbrīvots kopā ar to
+            pass
+        if self._owner:
+            self._shm.unlink()
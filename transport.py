@@ -0,0 +1,127 @@
+import time
+from queue import Empty
+import numpy as np
+from packets import PACKET_DTYPE, packets_to_batch
+
+# Pakešu transports starp simulācijas procesiem pa kopām: ražotājs uzkrāj paketes un nosūta tās
+# vienā Queue.put (viens pickle un viena rakstīšana kanālā), kad sasniegts `max_count` vai vecākā
+# pakete ir gaidījusi `max_age` s. Patērētājs saņem visas pieejamās kopas vienā masīvā (PACKET_DTYPE).
+# Katras paketes laiks ir tās nosūtīšanas brīdis (sekundes no `start_time`).
+
+DEFAULT_MAX_COUNT = 256
+DEFAULT_MAX_AGE = 0.05
+
+
+class BatchSender:
+    def __init__(self, queue, start_time=None, max_count=DEFAULT_MAX_COUNT, max_age=DEFAULT_MAX_AGE):
+        self.queue = queue
+        self.start_time = time.time() if start_time is None else start_time
+        self.max_count = max_count
+        self.max_age = max_age
+        self._packets = []   # (laiks, pakete), kas vēl nav pārvērstas kopā
+        self._batches = []   # Gatavas kopas nosūtīšanas secībā
+        self._pending = 0
+        self._oldest = None  # Vecākās neizsūtītās paketes pievienošanas brīdis
+        self.sent_packets = 0
+        self.sent_batches = 0
+
+    def now(self):
+        return time.time() - self.start_time
+
+    def send(self, packet, timestamp=None):
+        # Viena pakete (objekts ar source, rssi, modified_rssi); laiks pēc noklusējuma – šis brīdis
+        self._packets.append((self.now() if timestamp is None else timestamp, packet))
+        self._added(1)
+
+    def send_batch(self, batch):
+        # Jau gatava PACKET_DTYPE kopa ar saviem laikiem
+        if len(batch) == 0:
+            return
+        self._collect_packets()
+        self._batches.append(batch)
+        self._added(len(batch))
+
+    def _added(self, n):
+        if self._oldest is None:
+            self._oldest = time.time()
+        self._pending += n
+        if self._pending >= self.max_count or time.time() - self._oldest >= self.max_age:
+            self.flush()
+
+    def _collect_packets(self):
+        if self._packets:
+            times = [t for t, _ in self._packets]
+            self._batches.append(packets_to_batch([p for _, p in self._packets], times))
+            self._packets = []
+
+    def flush(self):
+        self._collect_packets()
+        if not self._batches:
+            return
+        batch = self._batches[0] if len(self._batches) == 1 else np.concatenate(self._batches)
+        self.queue.put(batch)
+        self.sent_packets += len(batch)
+        self.sent_batches += 1
+        self._batches = []
+        self._pending = 0
+        self._oldest = None
+
+    def poll(self):
+        # Izsūta uzkrātās paketes, ja vecākā ir gaidījusi `max_age`; izsaucams ražotāja dīkstāvē
+        if self._oldest is not None and time.time() - self._oldest >= self.max_age:
+            self.flush()
+
+    def flush_deadline(self):
+        return None if self._oldest is None else self._oldest + self.max_age
+
+    def sleep(self, seconds):
+        sleep_flushing(seconds, self)
+
+    def close(self):
+        self.flush()
+
+
+def sleep_flushing(seconds, *senders):
+    # time.sleep aizstājējs ražotājiem: gaidīšanas laikā uzkrātās paketes tiek izsūtītas, tiklīdz sasniedz max_age
+    deadline = time.time() + seconds
+    while True:
+        pending = [(sender.flush_deadline(), i) for i, sender in enumerate(senders)
+                   if sender.flush_deadline() is not None]
+        if not pending or min(pending)[0] >= deadline:
+            break
+        flush_at, i = min(pending)
+        time.sleep(max(0.0, flush_at - time.time()))
+        senders[i].flush()
+    time.sleep(max(0.0, deadline - time.time()))
+
+
+class BatchReceiver:
+    def __init__(self, queue):
+        self.queue = queue
+        self.started = time.time()
+        self.received_packets = 0
+        self.received_batches = 0
+
+    def get(self, timeout=0.0):
+        # Visas pašlaik pieejamās kopas vienā masīvā; ar timeout > 0 gaida pirmo kopu. Tukšs masīvs, ja nav datu.
+        batches = []
+        try:
+            batches.append(self.queue.get(timeout=timeout) if timeout > 0 else self.queue.get_nowait())
+            while True:
+                batches.append(self.queue.get_nowait())
+        except Empty:
+            pass
+        if not batches:
+            return np.empty(0, dtype=PACKET_DTYPE)
+        self.received_batches += len(batches)
+        batch = batches[0] if len(batches) == 1 else np.concatenate(batches)
+        self.received_packets += len(batch)
+        return batch
+
+    def packets_per_second(self):
+        elapsed = time.time() - self.started
+        return self.received_packets / elapsed if elapsed > 0 else 0.0
+
+    def summary(self):
+        return (f"{self.received_packets} paketes {self.received_batches} kopās, "
+                f"{self.packets_per_second():.1f} paketes/s")
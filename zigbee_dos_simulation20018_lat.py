@@ -1,37 +1,38 @@
 import logging
+import os
 import random
+import sys
+import tempfile
 import time
-from multiprocessing import Process, Queue, Value, Manager, Event
-from queue import Empty
+from multiprocessing import Process, Value, Event
 import numpy as np
-import matplotlib.pyplot as plt
-import csv
+from event_engine import EventEngine
+from rng_streams import spawn_streams
+from fading import NakagamiSampler
+from capacity import calculate_capacity
+from shared_buffer import SharedColumns
+from series_filters import IntervalIndex, source_mask
+from device_population import DevicePopulation, generate_sharded
+from packets import SourceTable, make_batch
+from transport import BatchSender
+from broadcast import BroadcastChannel
+from column_store import ColumnWriter, export_csv, write_columns
+from plot_render import draw_markers, draw_spans, draw_vlines, plot_series
+from log_queue import PacketLog
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 
-# Константы
-NOISE_FLOOR = -95       # Troksnis (dBm)
-MAX_SNR = 40            # Maksimālais SNR, pie kura tiek sasniegta augsta panākumu varbūtība
-C_THEORETICAL = 250     # Maksimālā teorētiskā caurlaidspēja (kbps)
-OVERHEAD = 0.4          # Papildu izmaksu daļa
-
-def nakagami_fading(m, omega, size=1):
-    # Pielietots Nakagami sadalījums, lai iegūtu modificēto RSSI
-    return np.random.gamma(shape=m, scale=omega / m, size=size)
-
-def apply_nakagami_rssi(base_rssi, m, omega):
-    fading = nakagami_fading(m, omega, size=1)[0]
-    return base_rssi + 10 * np.log10(fading)
-
-def calculate_capacity(rssi):
-   # Aprēķina caurlaidspēju (kbps) atkarībā no RSSI
-    snr_db = rssi - NOISE_FLOOR  # Расчёт SNR
-    if snr_db < 0:
-        return 0
-    P_success = max(0.1, min(1.0, snr_db / MAX_SNR))
-    Duty_Cycle = max(0.1, min(0.8, snr_db / MAX_SNR))
-    capacity = C_THEORETICAL * (1 - OVERHEAD) * P_success * Duty_Cycle
-    return capacity
+# Pielietots Nakagami sadalījums, lai iegūtu modificēto RSSI (vērtības no iepriekš izlozēta bufera)
+FADING = NakagamiSampler(m=0.8, omega=0.3)
+
+# Avotu kodi: uzbrucējs un ierīces "Ierīce-N"; nosaukumi tiek atrasti tikai izdrukām
+SOURCES = SourceTable(fixed=("DoS-Attacker",), device_format="Ierīce-{}")
+DOS_ATTACKER = SOURCES.code("DoS-Attacker")
+
+# Koplietojamās atmiņas kolonnu shēmas savāktajiem datiem (avots – vesels kods)
+PACKET_SCHEMA = [('timestamps', 'f8'), ('original_rssi', 'f8'), ('modified_rssi', 'f8'), ('packet_sources', 'i4')]
+JAMMING_SCHEMA = [('start', 'f8'), ('end', 'f8')]
+DOS_SCHEMA = [('dos_timestamps', 'f8'), ('dos_rssi', 'f8')]
 
 def smooth(data, window_size=5):
     if len(data) < window_size:
@@ -39,97 +40,140 @@ def smooth(data, window_size=5):
     return np.convolve(data, np.ones(window_size) / window_size, mode='valid')
 
 class ZigBeePacket:
-    def __init__(self, source, destination, rssi):
+    __slots__ = ('source', 'destination', 'rssi', 'modified_rssi')
+
+    def __init__(self, source, destination, rssi, fading=FADING, modified_rssi=None):
         self.source = source
         self.destination = destination
         self.rssi = rssi
-        self.modified_rssi = apply_nakagami_rssi(rssi, m=0.8, omega=0.3)
-
-class DeviceSimulator:
-    def __init__(self, device_id, queue_main):
-        self.device_id = device_id
-        self.queue_main = queue_main
-
-    def run(self, stop_event, start_time):
-        while not stop_event.is_set():
-            rssi = random.uniform(-50, -40)  # Ierīces ar pieļaujamo RSSI
-            packet = ZigBeePacket(self.device_id, "Broadcast", rssi)
-            self.queue_main.put(packet)
-            logging.info(f"[Ierīce] {self.device_id} -> RSSI={rssi:.2f}, Mod={packet.modified_rssi:.2f}")
-            time.sleep(random.uniform(1, 3))
-        logging.info(f"[Ierīce] {self.device_id} beidz savu darbību.")
+        self.modified_rssi = fading.apply(rssi) if modified_rssi is None else modified_rssi
+
+def create_device_population(num_devices, seed=None):
+    # Ierīces ar pieļaujamo RSSI (-50..-40 dBm), katra sūta ik pēc 1..3 s
+    return DevicePopulation(np.arange(1, num_devices + 1), rssi_range=(-50, -40), interval=(1, 3),
+                            seed=seed, name_format="Ierīce-{}")
+
+def run_device_population(population, channel, stop_event, start_time, fading=FADING):
+    # Viens process visai ierīču populācijai (vai tās daļai) procesa-katrai-ierīcei vietā.
+    # Izdotās kopas tiek uzkrātas un publicētas kanālā pa kopām (BatchSender).
+    sender = BatchSender(channel, start_time)
+    sent_log = PacketLog(__name__, "[Ierīces]", unit="paketes, RSSI")  # Periodisks kopsavilkums, nevis ieraksts katrai kopai
+
+    def emit_batch(times, ids, rssi):
+        modified = fading.apply(rssi)
+        sender.send_batch(make_batch(times, SOURCES.device_codes(ids), rssi, modified))
+        sent_log.add(len(times), rssi)
+    population.run_realtime(stop_event, start_time, emit_batch, max_sleep=sender.max_age, idle=sender.poll)
+    sender.close()
+    sent_log.close()
+    logging.info(f"[Ierīces] {len(population)} ierīces beidz savu darbību ({sender.sent_packets} paketes "
+                 f"{sender.sent_batches} kopās).")
 
 class DosAttacker:
-    def __init__(self, queue_main, queue_def):
-        self.queue_main = queue_main
-        self.queue_def = queue_def
-
-    def run(self, stop_event):
+    def __init__(self, channel, rng=random, fading=FADING):
+        self.channel = channel
+        self.rng = rng
+        self.fading = fading
+        self.interval = 0.5
+
+    def run(self, stop_event, start_time=None):
+        # Katra pakete tiek publicēta kanālā vienreiz; to nolasa visi abonenti (savācējs, aizsargs, ...)
+        sender = BatchSender(self.channel, start_time)
+        sent_log = PacketLog(__name__, "[DoS]", unit="paketes, RSSI")
         count = 0
         while not stop_event.is_set():
-            rssi = random.uniform(-70, -60)  # RSSI DoS uzbrucējiem
-            packet = ZigBeePacket("DoS-Attacker", "Broadcast", rssi)
-            self.queue_main.put(packet)
-            self.queue_def.put(packet)
+            rssi = self.rng.uniform(-70, -60)  # RSSI DoS uzbrucējiem
+            packet = ZigBeePacket(DOS_ATTACKER, "Broadcast", rssi, self.fading)
+            sender.send(packet)
             count += 1
-            logging.info(f"[DoS] Pakete #{count} -> RSSI={rssi:.2f}, Mod={packet.modified_rssi:.2f}")
-            time.sleep(0.5)
+            sent_log("[DoS] Pakete #%d -> RSSI=%.2f, Mod=%.2f", count, rssi, packet.modified_rssi, value=rssi)
+            sender.sleep(self.interval)
+        sender.close()
+        sent_log.close()
         logging.info("[DoS] Atlikušās darbības beigtas.")
 
+    def start_virtual(self, engine, *subscribers):
+        def send():
+            rssi = self.rng.uniform(-70, -60)
+            packet = ZigBeePacket(DOS_ATTACKER, "Broadcast", rssi, self.fading)
+            for deliver in subscribers:
+                deliver(packet, engine.now)
+            engine.schedule(self.interval, send)
+        engine.schedule(0.0, send)
+
 class Defender:
-    def __init__(self, queue_def, jammer_efficiency):
-        self.queue_def = queue_def
+    def __init__(self, subscription, jammer_efficiency, rng=random):
+        self.subscription = subscription
         self.jammer_efficiency = jammer_efficiency
+        self.rng = rng
         self.detected_packets = Value('i', 0)
         self.jammed_packets = Value('i', 0)
-
-    def run(self, stop_event, start_time, duration, timestamps, original_rssi, modified_rssi, jamming_moments):
-        jamming_duration = 0.5  
-        last_jamming_end = 0.0
+        self.jamming_duration = 0.5
+        self.last_jamming_end = 0.0
+
+    def handle_packet(self, packet, current_time, jamming_moments):
+        # Lēmums par vienu paketi; kopīgs reālā un virtuālā laika režīmam
+        self.handle_source(packet.source, current_time, jamming_moments)
+
+    def handle_batch(self, batch, jamming_moments):
+        # Lēmumi par saņemtu pakešu kopu; katrai paketei izmanto tās nosūtīšanas laiku
+        for source, sent_time in zip(batch['source'].tolist(), batch['time'].tolist()):
+            self.handle_source(source, sent_time, jamming_moments)
+
+    def handle_source(self, source, current_time, jamming_moments):
+        if source != DOS_ATTACKER:
+            return
+        with self.detected_packets.get_lock():
+            self.detected_packets.value += 1
+        if self.rng.random() < self.jammer_efficiency:
+            # Pakete tieši iepriekšējā intervāla beigās tiek traucēta: virtuālajā režīmā uzbrucēja periods
+            # sakrīt ar traucēšanas ilgumu, un pirmā pakete ir pie t=0
+            if current_time >= self.last_jamming_end:
+                with self.jammed_packets.get_lock():
+                    self.jammed_packets.value += 1
+                jamming_moments.append((current_time, current_time + self.jamming_duration))
+                self.last_jamming_end = current_time + self.jamming_duration
+                logging.info("Traucējam DoS paketi pie %.2fs, gaismošanas ilgums %s s.", current_time, self.jamming_duration)
+
+    def run(self, stop_event, start_time, duration, jamming_moments):
+        # Aizsargs ir kanāla abonents: lasa visas paketes ar savu kursoru, paketes ieraksta tikai savācējs
         while not stop_event.is_set():
             try:
-                packet = self.queue_def.get(timeout=0.1)
-                current_time = time.time() - start_time  
-                timestamps.append(current_time)
-                original_rssi.append(packet.rssi)
-                modified_rssi.append(packet.modified_rssi)
-                if packet.source == "DoS-Attacker":
-                    with self.detected_packets.get_lock():
-                        self.detected_packets.value += 1
-                    if random.random() < self.jammer_efficiency:
-                        if current_time > last_jamming_end:
-                            with self.jammed_packets.get_lock():
-                                self.jammed_packets.value += 1
-                            jamming_moments.append((current_time, current_time + jamming_duration))
-                            last_jamming_end = current_time + jamming_duration
-                            logging.info(f"Traucējam DoS paketi pie {current_time:.2f}s, gaismošanas ilgums {jamming_duration} s.")
-            except Empty:
-                pass
+                batch = self.subscription.get(timeout=0.1)
+                if len(batch):
+                    self.handle_batch(batch, jamming_moments)
             except Exception as e:
                 logging.error(f"[Aizsargs] Kļūda: {e}")
-            time.sleep(0.05)
-        logging.info("[Aizsargs] Beidz savu darbību.")
-
-def filter_packets_during_jamming(timestamps, values, sources, jamming_moments, dos_source="DoS-Attacker"):
+        # Pēc apstāšanās ražotāji vairs negaida aizsarga kursoru
+        self.subscription.close()
+        logging.info(f"[Aizsargs] Beidz savu darbību. Saņemtas {self.subscription.summary()}.")
+
+def jamming_keep_mask(timestamps, sources, jamming_moments, dos_source=DOS_ATTACKER):
+    # Masks paketēm, kas paliek aprēķinā: DoS uzbrucēja paketes traucēšanas intervālos tiek izslēgtas.
+    # Intervāli tiek apvienoti un sakārtoti vienreiz; masku var pielietot RSSI, caurlaidspējai u.c. sērijām.
+    index = IntervalIndex(jamming_moments)
+    n = min(len(timestamps), len(sources))
+    in_jamming = index.contains(np.asarray(timestamps[:n], dtype=float))
+    return ~(in_jamming & source_mask(sources[:n], dos_source))
+
+def filter_packets_during_jamming(timestamps, values, sources, jamming_moments, dos_source=DOS_ATTACKER, keep=None):
   # Filtrē paketes: ja pakete ir no DoS uzbrucēja un tās laiks atbilst bloķēšanas intervālam, tad tā tiek izslēgta no aprēķina.
-    filtered_timestamps = []
-    filtered_values = []
-    for t, val, src in zip(timestamps, values, sources):
-        in_jamming = False
-        for interval in jamming_moments:
-            start, end = interval
-            if start <= t <= end:
-                in_jamming = True
-                break
-        if src == dos_source and in_jamming:
-            continue
-        filtered_timestamps.append(t)
-        filtered_values.append(val)
-    return filtered_timestamps, filtered_values
+    if keep is None:
+        keep = jamming_keep_mask(timestamps, sources, jamming_moments, dos_source)
+    n = len(keep)
+    return np.asarray(timestamps[:n])[keep], np.asarray(values[:n])[keep]
+
+def draw_jamming(ax, jamming_moments):
+    # Traucēšanas periodi (start, end) – apvienoti vienā kolekcijā; atsevišķi brīži – viena līniju kolekcija
+    spans = [jm for jm in jamming_moments if isinstance(jm, tuple)]
+    moments = [jm for jm in jamming_moments if not isinstance(jm, tuple)]
+    draw_spans(ax, spans, color='red', alpha=0.3, label='Traucēšanas periods')
+    draw_vlines(ax, moments, color='red', linestyle='dashed', label='Traucēšanas brīdis')
 
 def plot_results(timestamps, original_rssi, modified_rssi, jamming_moments,
                  output_prefix, dos_timestamps, dos_rssi, packet_sources):
-    if not timestamps:
+    import matplotlib.pyplot as plt  # Ielādēts tikai, kad tiek zīmēti grafiki
+    if len(timestamps) == 0:
         logging.error("Nav savākto datu, lai uzzīmētu grafikus.")
         return
 
@@ -139,19 +183,21 @@ def plot_results(timestamps, original_rssi, modified_rssi, jamming_moments,
     smoothed_modified = smooth(modified_rssi, window_size=5)
 
     # Filtrējam datus: noņemsim DoS paketes, kas saņemtas traucējumu periodos
+    keep = jamming_keep_mask(timestamps, packet_sources, jamming_moments)
     filtered_timestamps, filtered_original = filter_packets_during_jamming(
-        timestamps, original_rssi, packet_sources, jamming_moments)
+        timestamps, original_rssi, packet_sources, jamming_moments, keep=keep)
     _, filtered_modified = filter_packets_during_jamming(
-        timestamps, modified_rssi, packet_sources, jamming_moments)
+        timestamps, modified_rssi, packet_sources, jamming_moments, keep=keep)
     
     avg_original = np.mean(original_rssi)
     avg_modified = np.mean(modified_rssi)
-    avg_original_filtered = np.mean(filtered_original) if filtered_original else np.nan
-    avg_modified_filtered = np.mean(filtered_modified) if filtered_modified else np.nan
+    avg_original_filtered = np.mean(filtered_original) if filtered_original.size else np.nan
+    avg_modified_filtered = np.mean(filtered_modified) if filtered_modified.size else np.nan
 
     plt.figure(figsize=(10, 6))
-    plt.plot(smoothed_timestamps, smoothed_original, label='Oriģinālais RSSI (visi paketes)', color='blue')
-    plt.plot(smoothed_timestamps, smoothed_modified, label='Modificētais RSSI (visi paketes)', color='green')
+    ax = plt.gca()
+    plot_series(ax, smoothed_timestamps, smoothed_original, label='Oriģinālais RSSI (visi paketes)', color='blue')
+    plot_series(ax, smoothed_timestamps, smoothed_modified, label='Modificētais RSSI (visi paketes)', color='green')
     plt.axhline(y=avg_original, color='blue', linestyle='dotted', 
                 label=f'Vidējais oriģinālais RSSI ({avg_original:.2f})')
     plt.axhline(y=avg_modified, color='green', linestyle='dotted', 
@@ -160,14 +206,9 @@ def plot_results(timestamps, original_rssi, modified_rssi, jamming_moments,
                 label=f'Atjaunots oriģinālais RSSI ({avg_original_filtered:.2f})')
     plt.axhline(y=avg_modified_filtered, color='green', linestyle='dashdot', 
                 label=f'Atjaunots modificētais RSSI ({avg_modified_filtered:.2f})')
-    if dos_timestamps and dos_rssi:
-        plt.scatter(dos_timestamps, dos_rssi, marker='o', color='red', label='DoS Paketes')
-    for i, jm in enumerate(jamming_moments):
-        if isinstance(jm, tuple):
-            start, end = jm
-            plt.axvspan(start, end, color='red', alpha=0.3, label='Traucēšanas periods' if i == 0 else None)
-        else:
-            plt.axvline(x=jm, color='red', linestyle='dashed', label='Traucēšanas brīdis' if i == 0 else None)
+    if len(dos_timestamps) and len(dos_rssi):
+        draw_markers(ax, dos_timestamps, dos_rssi, marker='o', color='red', label='DoS Paketes')
+    draw_jamming(ax, jamming_moments)
     plt.title("RSSI laika gaitā")
     plt.xlabel("Laiks (s)")
     plt.ylabel("RSSI (dBm)")
@@ -178,20 +219,21 @@ def plot_results(timestamps, original_rssi, modified_rssi, jamming_moments,
     plt.close()
 
     # Caurlaidspējas grafiks
-    smoothed_cap_original = [calculate_capacity(x) for x in smoothed_original]
-    smoothed_cap_modified = [calculate_capacity(x) for x in smoothed_modified]
-    all_cap_original = [calculate_capacity(x) for x in original_rssi]
-    all_cap_modified = [calculate_capacity(x) for x in modified_rssi]
+    smoothed_cap_original = calculate_capacity(np.asarray(smoothed_original))
+    smoothed_cap_modified = calculate_capacity(np.asarray(smoothed_modified))
+    all_cap_original = calculate_capacity(np.asarray(original_rssi))
+    all_cap_modified = calculate_capacity(np.asarray(modified_rssi))
     avg_cap_original = np.mean(all_cap_original)
     avg_cap_modified = np.mean(all_cap_modified)
-    filtered_cap_original = [calculate_capacity(x) for x in filtered_original]
-    filtered_cap_modified = [calculate_capacity(x) for x in filtered_modified]
-    avg_cap_original_filtered = np.mean(filtered_cap_original) if filtered_cap_original else np.nan
-    avg_cap_modified_filtered = np.mean(filtered_cap_modified) if filtered_cap_modified else np.nan
+    filtered_cap_original = calculate_capacity(np.asarray(filtered_original))
+    filtered_cap_modified = calculate_capacity(np.asarray(filtered_modified))
+    avg_cap_original_filtered = np.mean(filtered_cap_original) if filtered_cap_original.size else np.nan
+    avg_cap_modified_filtered = np.mean(filtered_cap_modified) if filtered_cap_modified.size else np.nan
 
     plt.figure(figsize=(10, 6))
-    plt.plot(smoothed_timestamps, smoothed_cap_original, label='Oriģinālā caurlaidspēja (visi paketes)', color='blue')
-    plt.plot(smoothed_timestamps, smoothed_cap_modified, label='Modificētā caurlaidspēja (visi paketes)', color='green')
+    ax = plt.gca()
+    plot_series(ax, smoothed_timestamps, smoothed_cap_original, label='Oriģinālā caurlaidspēja (visi paketes)', color='blue')
+    plot_series(ax, smoothed_timestamps, smoothed_cap_modified, label='Modificētā caurlaidspēja (visi paketes)', color='green')
     plt.axhline(y=avg_cap_original, color='blue', linestyle='dotted', 
                 label=f'Vidējā oriģinālā caurlaidspēja ({avg_cap_original:.2f})')
     plt.axhline(y=avg_cap_modified, color='green', linestyle='dotted', 
@@ -200,12 +242,7 @@ def plot_results(timestamps, original_rssi, modified_rssi, jamming_moments,
                 label=f'Atjaunotā oriģinālā caurlaidspēja ({avg_cap_original_filtered:.2f})')
     plt.axhline(y=avg_cap_modified_filtered, color='green', linestyle='dashdot', 
                 label=f'Atjaunotā modificētā caurlaidspēja ({avg_cap_modified_filtered:.2f})')
-    for i, jm in enumerate(jamming_moments):
-        if isinstance(jm, tuple):
-            start, end = jm
-            plt.axvspan(start, end, color='red', alpha=0.3, label='Traucēšanas periods' if i == 0 else None)
-        else:
-            plt.axvline(x=jm, color='red', linestyle='dashed', label='Traucēšanas brīdis' if i == 0 else None)
+    draw_jamming(ax, jamming_moments)
     plt.title("Caurlaidspēja laika gaitā")
     plt.xlabel("Laiks (s)")
     plt.ylabel("Caurlaidspēja (kbps)")
@@ -216,99 +253,247 @@ def plot_results(timestamps, original_rssi, modified_rssi, jamming_moments,
     plt.close()
 
 def save_data_to_csv(timestamps, original_rssi, modified_rssi, output_filename):
-    data = []
-    for t, orig, mod in zip(timestamps, original_rssi, modified_rssi):
-        orig_cap = calculate_capacity(orig)
-        mod_cap = calculate_capacity(mod)
-        data.append((t, orig, mod, orig_cap, mod_cap))
-    data.sort(key=lambda x: x[0])
-    with open(output_filename, mode='w', newline='') as file:
-        writer = csv.writer(file)
-        writer.writerow(["Laiks (s)", "Oriģinālais RSSI (dBm)", "Modificētais RSSI (dBm)",
-                         "Oriģinālā caurlaidspēja (kbps)", "Modificētā caurlaidspēja (kbps)"])
-        writer.writerows(data)
-
-def main():
-    duration = 120  # Simulācijas garums
-    num_devices = 15
-    jammer_efficiency = 1.0  # 100% DoS paketes noveršana
+    # CSV saderībai: rindas laika secībā, rakstītas pa daļām (bez rindu sarakstu veidošanas atmiņā)
+    timestamps = np.asarray(timestamps, dtype=float)
+    original_rssi = np.asarray(original_rssi, dtype=float)
+    modified_rssi = np.asarray(modified_rssi, dtype=float)
+    export_csv(output_filename,
+               ["Laiks (s)", "Oriģinālais RSSI (dBm)", "Modificētais RSSI (dBm)",
+                "Oriģinālā caurlaidspēja (kbps)", "Modificētā caurlaidspēja (kbps)"],
+               [timestamps, original_rssi, modified_rssi, calculate_capacity(original_rssi), calculate_capacity(modified_rssi)],
+               order=np.argsort(timestamps, kind='stable'))
+
+def save_data_columns(data, directory):
+    # Binārais kolonnu formāts (.npy katrai kolonnai) virtuālā laika rezultātiem
+    columns = {name: np.asarray(data[name], dtype=dtype) for name, dtype in PACKET_SCHEMA}
+    write_columns(directory, columns, labels={'packet_sources': SOURCES.labels(columns['packet_sources'])})
+
+def simulate_virtual(duration, num_devices, jammer_efficiency, seed=None, shards=1):
+    # Virtuālā laika simulācija: tās pašas ierīces, uzbrucējs un aizsargs, bet bez time.sleep un procesiem.
+    # Katra pakete tiek reģistrēta tās nosūtīšanas brīdī simulētajā laikā.
+    # Ierīces ir viena masīvu populācija; ar shards > 1 to trafiks tiek ģenerēts paralēli vairākos procesos.
+    rng, numpy_seed = spawn_streams(seed)
+    fading_seed, population_seed = numpy_seed.spawn(2)
+    fading = NakagamiSampler(m=0.8, omega=0.3, seed=fading_seed)
+    engine = EventEngine()
+    data = {
+        'timestamps': [], 'original_rssi': [], 'modified_rssi': [], 'jamming_moments': [],
+        'dos_timestamps': [], 'dos_rssi': [], 'packet_sources': [],
+    }
+
+    def collect(packet, current_time):
+        data['timestamps'].append(current_time)
+        data['original_rssi'].append(packet.rssi)
+        data['modified_rssi'].append(packet.modified_rssi)
+        data['packet_sources'].append(packet.source)
+        if packet.source == DOS_ATTACKER:
+            data['dos_timestamps'].append(current_time)
+            data['dos_rssi'].append(packet.rssi)
+
+    def collect_batch(times, ids, rssi):
+        data['timestamps'].extend(times.tolist())
+        data['original_rssi'].extend(rssi.tolist())
+        data['modified_rssi'].extend(fading.apply(rssi).tolist())
+        data['packet_sources'].extend(SOURCES.device_codes(ids).tolist())
+
+    defender = Defender(None, jammer_efficiency, rng=rng)
+
+    def defend(packet, current_time):
+        defender.handle_packet(packet, current_time, data['jamming_moments'])
+
+    population = create_device_population(num_devices, seed=population_seed)
+    if shards > 1:
+        # Ierīču paketes neietekmē aizsargu, tāpēc tās var iepriekš ģenerēt paralēli
+        collect_batch(*generate_sharded(population, duration, shards))
+    else:
+        population.start_virtual(engine, collect_batch, until=duration)
+    DosAttacker(None, rng=rng, fading=fading).start_virtual(engine, collect, defend)
+
+    engine.run(until=duration)
+    # Populācija izdod paketes pa laika logiem, tāpēc sakārtojam ierakstus pēc sūtīšanas laika (kolonnas – NumPy masīvi)
+    order = np.argsort(np.asarray(data['timestamps']), kind='stable')
+    for key, dtype in PACKET_SCHEMA:
+        data[key] = np.asarray(data[key], dtype=dtype)[order]
+    logging.info(f"Virtuālā simulācija: {engine.processed_events} notikumi, {num_devices} ierīces, {duration} s simulētā laika, "
+                 f"{defender.jammed_packets.value} traucētas DoS paketes.")
+    return data, defender
+
+def summarize(data, defender):
+    # Viena palaišanas kopsavilkums parametru pārlasei: skaiti, vidējās un atjaunotās vērtības
+    original = np.asarray(data['original_rssi'], dtype=float)
+    capacities = calculate_capacity(np.asarray(data['modified_rssi'], dtype=float))
+    keep = jamming_keep_mask(data['timestamps'], data['packet_sources'], data['jamming_moments'])
+    detected = defender.detected_packets.value
+    jammed = defender.jammed_packets.value
+    return {
+        'packets': len(original),
+        'overwritten': data.get('overwritten', 0),
+        'detected': detected,
+        'jammed': jammed,
+        'jammed_pct': jammed / detected * 100 if detected else 0.0,
+        'mean_rssi': float(np.mean(original)) if original.size else float('nan'),
+        'recovered_rssi': float(np.mean(original[:len(keep)][keep])) if keep.any() else float('nan'),
+        'mean_capacity': float(np.mean(capacities)) if capacities.size else float('nan'),
+        'recovered_capacity': float(np.mean(capacities[:len(keep)][keep])) if keep.any() else float('nan'),
+    }
+
+def run_scenario(duration=120, num_devices=15, jammer_efficiency=1.0, seed=None, shards=1):
+    # Viens virtuālā laika scenārijs bez grafikiem; atgriež kopsavilkumu
+    data, defender = simulate_virtual(duration, num_devices, jammer_efficiency, seed, shards)
+    return summarize(data, defender)
+
+def report_results(data, defender, output_prefix, plot=True):
+    logging.info("Simulācija pabeigta. Uzzīmēju rezultātus un saglabāju datus CSV failā...")
+    if data.get('overwritten'):
+        # Pilnā koplietojamās atmiņas buferī vecākās paketes tika pārrakstītas
+        logging.warning(f"Rezultāti aptver tikai pēdējās {len(data['timestamps'])} paketes: "
+                        f"{data['overwritten']} vecākās pārrakstītas buferī.")
+    if plot:
+        plot_results(data['timestamps'], data['original_rssi'], data['modified_rssi'], data['jamming_moments'],
+                     output_prefix, data['dos_timestamps'], data['dos_rssi'], data['packet_sources'])
+    save_data_to_csv(data['timestamps'], data['original_rssi'], data['modified_rssi'], f"{output_prefix}_data.csv")
 
-    manager = Manager()
-    timestamps = manager.list()
-    original_rssi = manager.list()
-    modified_rssi = manager.list()
-    jamming_moments = manager.list()
-    dos_timestamps = manager.list()
-    dos_rssi = manager.list()
-    packet_sources = manager.list()  # Visas paketes avots
+    total_detected = defender.detected_packets.value
+    total_jammed = defender.jammed_packets.value
+    jammed_percentage = (total_jammed / total_detected) * 100 if total_detected > 0 else 0
+    logging.info(f"Kopā atklātu DoS paketes: {total_detected}")
+    logging.info(f"Kopā traucētu paketes: {total_jammed}")
+    logging.info(f"Traucēto paketes procentuālais īpatsvars: {jammed_percentage:.2f}%")
 
-    queue_main = Queue()
-    queue_def = Queue()
+def simulate_realtime(duration, num_devices, jammer_efficiency, output_prefix, report,
+                      device_shards=1, channel_capacity=1 << 16, channel_policy="block", seed=None):
+    # Reālā laika simulācija procesos. `report(data, defender)` tiek izsaukts, kamēr dati vēl ir
+    # koplietojamajā atmiņā; tā rezultāts tiek atgriezts. `seed` – reproducējami aizsarga lēmumi.
+    # Koplietojamās atmiņas buferi: ieraksti bez Manager starpprocesa izsaucieniem
+    packets = SharedColumns(PACKET_SCHEMA)
+    jamming_moments = SharedColumns(JAMMING_SCHEMA)
+    dos_packets = SharedColumns(DOS_SCHEMA)
+
+    # Publicēšanas/abonēšanas kanāls: ražotāji katru paketi ieraksta vienreiz, abonenti lasa ar saviem kursoriem.
+    # Abonementi tiek izveidoti pirms procesu palaišanas, lai neviena pakete netiktu palaista garām.
+    channel = BroadcastChannel(channel_capacity, policy=channel_policy)
+    receiver = channel.subscribe()
 
     stop_event = Event()
     start_time = time.time()
 
-    devices = [DeviceSimulator(f"Ierīce-{i+1}", queue_main) for i in range(num_devices)]
-    device_processes = [Process(target=device.run, args=(stop_event, start_time)) for device in devices]
+    # Ierīču populācija: viens process uz daļu (shard), nevis viens process uz ierīci
+    population = create_device_population(num_devices)
+    device_processes = [Process(target=run_device_population, args=(shard, channel, stop_event, start_time))
+                        for shard in population.shard(device_shards)]
 
-    attacker = DosAttacker(queue_main, queue_def)
-    attacker_process = Process(target=attacker.run, args=(stop_event,))
+    attacker = DosAttacker(channel)
+    attacker_process = Process(target=attacker.run, args=(stop_event, start_time))
 
-    defender = Defender(queue_def, jammer_efficiency)
-    defender_process = Process(target=defender.run, args=(stop_event, start_time, duration, 
-                                                            timestamps, original_rssi, modified_rssi, jamming_moments))
+    defender = Defender(channel.subscribe(), jammer_efficiency,
+                        rng=spawn_streams(seed)[0] if seed is not None else random)
+    defender_process = Process(target=defender.run, args=(stop_event, start_time, duration, jamming_moments))
 
     for p in device_processes:
         p.start()
     attacker_process.start()
     defender_process.start()
 
+    # Savācējs lasa kanālu pa kopām; katrai paketei saglabājas tās nosūtīšanas laiks.
+    # Paketes simulācijas laikā tiek arī straumētas uz diska binārajā kolonnu formātā.
+    store = ColumnWriter(f"{output_prefix}_data", PACKET_SCHEMA)
+
+    def record(batch):
+        columns = [batch['time'], batch['rssi'], batch['modified_rssi'], batch['source']]
+        packets.extend(columns)
+        store.append(columns)
+        dos = batch[batch['source'] == DOS_ATTACKER]
+        dos_packets.extend([dos['time'], dos['rssi']])
+
     while time.time() - start_time < duration:
-        try:
-            packet = queue_main.get_nowait()
-            current_time = time.time() - start_time
-            timestamps.append(current_time)
-            original_rssi.append(packet.rssi)
-            modified_rssi.append(packet.modified_rssi)
-            packet_sources.append(packet.source)
-            if packet.source == "DoS-Attacker":
-                dos_timestamps.append(current_time)
-                dos_rssi.append(packet.rssi)
-        except Empty:
-            pass
-        time.sleep(0.1)
+        record(receiver.get(timeout=0.1))
 
     stop_event.set()
 
-    for p in device_processes:
+    # Pēc apstāšanās ražotāji publicē atlikušās kopas; savācējs lasa, līdz tie beidz darbu
+    producers = device_processes + [attacker_process]
+    while any(p.is_alive() for p in producers):
+        record(receiver.get(timeout=0.1))
+    for p in producers:
         p.join()
-    attacker_process.join()
     defender_process.join()
-
-    timestamps_local = list(timestamps)
-    original_rssi_local = list(original_rssi)
-    modified_rssi_local = list(modified_rssi)
-    jamming_moments_local = list(jamming_moments)
-    dos_timestamps_local = list(dos_timestamps)
-    dos_rssi_local = list(dos_rssi)
-    packet_sources_local = list(packet_sources)
-
-    queue_main.close()
-    queue_def.close()
-    manager.shutdown()
-
-    logging.info("Simulācija pabeigta. Uzzīmēju rezultātus un saglabāju datus CSV failā...")
+    record(receiver.get())
+    store.labels = {'packet_sources': SOURCES.labels(packets.view('packet_sources'))}
+    store.close()
+    logging.info(f"Savācējs: saņemtas {receiver.summary()}; {len(store)} rindas saglabātas direktorijā {store.directory}.")
+    logging.info(f"Kanāls ({channel_policy}): saražotas {channel.produced}, savāktas {receiver.received_packets}, "
+                 f"nomestas {channel.dropped + receiver.lost}, pārrakstītas buferī {packets.overwritten} paketes.")
+
+    # Rezultāti kā NumPy skati uz koplietojamo atmiņu
+    data = {name: packets.view(name) for name, _ in PACKET_SCHEMA}
+    data.update({name: dos_packets.view(name) for name, _ in DOS_SCHEMA})
+    data['jamming_moments'] = list(zip(jamming_moments.view('start').tolist(), jamming_moments.view('end').tolist()))
+    data['overwritten'] = packets.overwritten
+
+    channel.close()
+
+    try:
+        return report(data, defender)
+    finally:
+        data.clear()
+        for buffer in (packets, jamming_moments, dos_packets):
+            buffer.close()
+
+# Režīmu salīdzinājuma pieļaujamās novirzes (--check)
+CHECK_RATE_TOLERANCE = 0.1  # Atklāto DoS pakešu skaits sekundē: relatīvā starpība starp režīmiem
+CHECK_PCT_BANDS = {1.0: (100.0, 100.0), 0.5: (25.0, 75.0)}  # Efektivitāte -> pieļaujamais traucēto % diapazons
+
+def check_modes(duration=20, num_devices=3, seed=0):
+    # Abi režīmi ar vienu sēklu katrai efektivitātei: atklāto DoS pakešu skaitam sekundē jāsakrīt
+    # CHECK_RATE_TOLERANCE robežās, un abu režīmu traucēto pakešu īpatsvaram jābūt CHECK_PCT_BANDS diapazonā.
+    # 0.5 diapazons ≈ ±3σ binomiālajam sadalījumam pie 40 paketēm (20 s, viena pakete ik pēc 0.5 s).
+    agree = True
+    for efficiency, (low, high) in CHECK_PCT_BANDS.items():
+        virtual = run_scenario(duration, num_devices, jammer_efficiency=efficiency, seed=seed)
+        with tempfile.TemporaryDirectory() as directory:
+            realtime = simulate_realtime(duration, num_devices, efficiency, os.path.join(directory, "check"),
+                                         summarize, seed=seed)
+        for mode, result in (("Virtuālais", virtual), ("Reālā laika", realtime)):
+            logging.info(f"Efektivitāte {efficiency}, {mode} režīms: atklātas {result['detected']} "
+                         f"({result['detected'] / duration:.2f}/s), traucētas {result['jammed']} "
+                         f"({result['jammed_pct']:.2f}%)")
+        virtual_rate = virtual['detected'] / duration
+        realtime_rate = realtime['detected'] / duration
+        if virtual_rate == 0 or abs(realtime_rate - virtual_rate) > CHECK_RATE_TOLERANCE * virtual_rate:
+            logging.error(f"Efektivitāte {efficiency}: atklāto DoS pakešu skaits sekundē nesakrīt "
+                          f"({virtual_rate:.2f}/s un {realtime_rate:.2f}/s, pieļaujams ±{CHECK_RATE_TOLERANCE:.0%}).")
+            agree = False
+        for mode, result in (("virtuālā", virtual), ("reālā laika", realtime)):
+            if not low <= result['jammed_pct'] <= high:
+                logging.error(f"Efektivitāte {efficiency}: {mode} režīma traucēto īpatsvars "
+                              f"{result['jammed_pct']:.2f}% ārpus diapazona [{low:.0f}%; {high:.0f}%].")
+                agree = False
+    if not agree:
+        logging.error("Virtuālā un reālā laika režīma rezultāti nesakrīt.")
+    return agree
+
+def main(virtual=False, duration=120, plot=True):
+    # duration – simulācijas garums sekundēs
+    num_devices = 15
+    device_shards = 1  # Procesu skaits ierīču populācijai (tūkstošiem ierīču var izmantot vairāk)
+    jammer_efficiency = 1.0  # 100% DoS paketes noveršana
+    channel_capacity = 1 << 16  # Ierobežots pakešu kanāls (ierakstu skaits)
+    channel_policy = "block"  # Pilnā kanālā: "block" (ražotāji gaida), "drop-oldest" vai "drop-newest"
     output_prefix = "simulation_results"
-    plot_results(timestamps_local, original_rssi_local, modified_rssi_local, jamming_moments_local,
-                 output_prefix, dos_timestamps_local, dos_rssi_local, packet_sources_local)
-    save_data_to_csv(timestamps_local, original_rssi_local, modified_rssi_local, f"{output_prefix}_data.csv")
 
-    total_detected = defender.detected_packets.value
-    total_jammed = defender.jammed_packets.value
-    jammed_percentage = (total_jammed / total_detected) * 100 if total_detected > 0 else 0
-    logging.info(f"Kopā atklātu DoS paketes: {total_detected}")
-    logging.info(f"Kopā traucētu paketes: {total_jammed}")
-    logging.info(f"Traucēto paketes procentuālais īpatsvars: {jammed_percentage:.2f}%")
+    if virtual:
+        data, defender = simulate_virtual(duration, num_devices, jammer_efficiency)
+        save_data_columns(data, f"{output_prefix}_data")
+        report_results(data, defender, output_prefix, plot)
+        return
+
+    simulate_realtime(duration, num_devices, jammer_efficiency, output_prefix,
+                      lambda data, defender: report_results(data, defender, output_prefix, plot),
+                      device_shards, channel_capacity, channel_policy)
 
 if __name__ == "__main__":
-    main()
+    # --virtual: notikumu dzinēja režīms simulētā laikā (bez reālā laika gaidīšanas); --no-plot: bez grafikiem;
+    # --check: salīdzina virtuālā un reālā laika režīmu (atklāto pakešu skaits sekundē, traucēto īpatsvars)
+    if "--check" in sys.argv[1:]:
+        sys.exit(0 if check_modes() else 1)
+    main(virtual="--virtual" in sys.argv[1:], plot="--no-plot" not in sys.argv[1:])